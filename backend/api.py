@@ -0,0 +1,237 @@
+"""
+Read-only JSON API (v1) for thin clients.
+
+    GET /api/v1                              resources open to the logged-in role
+    GET /api/v1/<role>/<resource>            one page of rows
+    GET /api/v1/<role>/<resource>/<id>       one row
+    GET /api/v1/<role>/dashboard             the role's dashboard data
+
+The same session login as the pages; a role only sees its own resources
+(a worker their own rows, a manager their department, an admin all).
+
+Query arguments:
+
+    fields=a,b,c     only these fields; they become the SELECT list, so
+                     the database never reads or sends the other columns
+                     (sections, for the dashboard)
+    <field>=value    equality filter, for the fields a resource lists
+                     under `filters`
+    after=<token>    next page - the same keyset tokens as the list pages
+    limit=n          page size, 1..PAGE_SIZE_MAX
+    shape=rows       {"fields": [...], "rows": [[...], ...]} instead of
+                     one object per row, so keys aren't repeated
+
+Responses are compact JSON (no whitespace); dates are ISO strings,
+decimals are numbers. A list answers {"data": [...], "next": token or
+null, "limit": n}; "next" is the `after` for the following page.
+"""
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import records
+from pagination import paginate
+
+
+class ApiError(ValueError):
+    """Bad request arguments; the message goes back to the client"""
+
+
+class Resource:
+    """A list of rows: FROM clause, exposed fields and their sort keys
+
+    `fields` maps field name -> SQL expression; `keys` are
+    (field, 'ASC' | 'DESC') with a unique last key; `scope` is the WHERE
+    clause limiting rows to the caller (one %s: worker id or department).
+    """
+
+    def __init__(self, role, name, source, fields, keys, scope=None, filters=(), where=None):
+        self.role = role
+        self.name = name
+        self.source = source
+        self.fields = fields
+        self.keys = [(fields[field], field, direction) for field, direction in keys]
+        self.id_field = keys[-1][0]
+        self.scope = scope
+        self.filters = filters
+        self.where = where
+
+    def describe(self):
+        return {'path': f"/api/v1/{self.role}/{self.name}", 'fields': list(self.fields),
+                'filters': list(self.filters), 'sort': [f"{f} {d}" for _, f, d in self.keys]}
+
+
+def _columns(alias, *names):
+    return {name: f"{alias}.{name}" for name in names}
+
+
+TASK_FIELDS = _columns('t', 'task_id', 'worker_id', 'task_details', 'deadline', 'status', 'assigned_date')
+ATTENDANCE_FIELDS = _columns('a', 'attendance_id', 'worker_id', 'date', 'check_in', 'check_out',
+                             'attendance_value', 'working_hours')
+LEAVE_FIELDS = _columns('lr', 'leave_id', 'worker_id', 'leave_type', 'start_date', 'end_date', 'reason',
+                        'status', 'applied_date', 'approved_by', 'approval_date')
+SALARY_FIELDS = _columns('s', 'salary_id', 'worker_id', 'month', 'base_salary', 'extra_hours',
+                         'bonus_amount', 'total_salary', 'status')
+PERFORMANCE_FIELDS = _columns('p', 'performance_id', 'worker_id', 'month', 'attendance_percentage',
+                              'total_hours', 'manager_feedback')
+# Never `password`
+WORKER_FIELDS = _columns('w', 'worker_id', 'name', 'email', 'contact', 'address', 'department', 'role',
+                         'payment_method', 'status', 'joining_date')
+WORKER_NAME = {'worker_name': 'w.name', 'department': 'w.department'}
+
+RESOURCES = {}
+
+
+def _register(*resources):
+    for resource in resources:
+        RESOURCES[resource.role, resource.name] = resource
+
+
+_register(
+    # ----- Worker: their own rows -----
+    Resource('worker', 'tasks', "FROM TASK t", TASK_FIELDS,
+             keys=[('deadline', 'ASC'), ('task_id', 'ASC')], scope="t.worker_id = %s", filters=('status',)),
+    Resource('worker', 'attendance', "FROM ATTENDANCE a", ATTENDANCE_FIELDS,
+             keys=[('date', 'DESC'), ('attendance_id', 'DESC')], scope="a.worker_id = %s", filters=('date',)),
+    Resource('worker', 'leave', "FROM LEAVE_REQUEST lr", LEAVE_FIELDS,
+             keys=[('applied_date', 'DESC'), ('leave_id', 'DESC')], scope="lr.worker_id = %s",
+             filters=('status', 'leave_type')),
+    Resource('worker', 'salary', "FROM SALARY s", SALARY_FIELDS,
+             keys=[('month', 'DESC'), ('salary_id', 'DESC')], scope="s.worker_id = %s",
+             filters=('month', 'status')),
+    Resource('worker', 'performance', "FROM PERFORMANCE p", PERFORMANCE_FIELDS,
+             keys=[('month', 'DESC'), ('performance_id', 'DESC')], scope="p.worker_id = %s",
+             filters=('month',)),
+
+    # ----- Manager: their department -----
+    Resource('manager', 'team', "FROM WORKER w", WORKER_FIELDS,
+             keys=[('name', 'ASC'), ('worker_id', 'ASC')], scope="w.department = %s",
+             where="w.role = 'worker'", filters=('status',)),
+    Resource('manager', 'tasks', "FROM TASK t JOIN WORKER w ON t.worker_id = w.worker_id",
+             dict(TASK_FIELDS, **WORKER_NAME),
+             keys=[('deadline', 'ASC'), ('task_id', 'ASC')], scope="w.department = %s",
+             filters=('status', 'worker_id')),
+    Resource('manager', 'attendance', "FROM ATTENDANCE a JOIN WORKER w ON a.worker_id = w.worker_id",
+             dict(ATTENDANCE_FIELDS, **WORKER_NAME),
+             keys=[('date', 'DESC'), ('attendance_id', 'DESC')], scope="w.department = %s",
+             filters=('date', 'worker_id')),
+    Resource('manager', 'leave', "FROM LEAVE_REQUEST lr JOIN WORKER w ON lr.worker_id = w.worker_id",
+             dict(LEAVE_FIELDS, **WORKER_NAME),
+             keys=[('applied_date', 'DESC'), ('leave_id', 'DESC')], scope="w.department = %s",
+             filters=('status', 'worker_id')),
+
+    # ----- Admin: everything -----
+    Resource('admin', 'workers', "FROM WORKER w", WORKER_FIELDS,
+             keys=[('department', 'ASC'), ('name', 'ASC'), ('worker_id', 'ASC')],
+             filters=('department', 'role', 'status')),
+    Resource('admin', 'attendance', "FROM ATTENDANCE a JOIN WORKER w ON a.worker_id = w.worker_id",
+             dict(ATTENDANCE_FIELDS, **WORKER_NAME),
+             keys=[('date', 'DESC'), ('attendance_id', 'DESC')], filters=('date', 'worker_id', 'department')),
+    Resource('admin', 'salaries', "FROM SALARY s JOIN WORKER w ON s.worker_id = w.worker_id",
+             dict(SALARY_FIELDS, **WORKER_NAME),
+             keys=[('month', 'DESC'), ('salary_id', 'DESC')], filters=('month', 'status', 'worker_id')),
+    Resource('admin', 'leave', "FROM LEAVE_REQUEST lr JOIN WORKER w ON lr.worker_id = w.worker_id",
+             dict(LEAVE_FIELDS, **WORKER_NAME),
+             keys=[('applied_date', 'DESC'), ('leave_id', 'DESC')], filters=('status', 'worker_id')),
+    Resource('admin', 'substitutes',
+             "FROM SUBSTITUTE_REQUEST sr JOIN WORKER r ON sr.requester_id = r.worker_id "
+             "JOIN WORKER sw ON sr.substitute_id = sw.worker_id",
+             dict(_columns('sr', 'sub_id', 'requester_id', 'substitute_id', 'date', 'hours', 'reason',
+                           'status', 'admin_approved'),
+                  requester_name='r.name', substitute_name='sw.name'),
+             keys=[('date', 'DESC'), ('sub_id', 'DESC')], filters=('status', 'admin_approved')),
+)
+
+
+# ============ QUERIES ============
+
+def parse_fields(raw, available):
+    """Requested field names in order, or all of `available` when not given"""
+    if not raw:
+        return list(available)
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in available]
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(unknown)}; available: {', '.join(available)}")
+    return fields
+
+
+def _select(resource, fields, scope_value, args):
+    """SELECT ... WHERE ... {keyset} for `fields` plus the sort keys, and its params"""
+    selected = list(dict.fromkeys(fields + [field for _, field, _ in resource.keys]))
+    conditions, params = [], []
+    if resource.scope:
+        conditions.append(resource.scope)
+        params.append(scope_value)
+    if resource.where:
+        conditions.append(resource.where)
+    for name in resource.filters:
+        if name in args:
+            conditions.append(f"{resource.fields[name]} = %s")
+            params.append(args[name])
+    columns = ", ".join(f"{resource.fields[f]} AS {f}" for f in selected)
+    return f"SELECT {columns} {resource.source} WHERE {' AND '.join(conditions + ['{keyset}'])}", params
+
+
+def _project(rows, fields):
+    # Row objects would serialize as arrays; the sort keys selected but not asked for go
+    return [{f: row[f] for f in fields} for row in rows]
+
+
+def list_rows(cursor, resource, scope_value, args, limit):
+    """(rows, next token, fields) for one page"""
+    fields = parse_fields(args.get('fields'), resource.fields)
+    sql, params = _select(resource, fields, scope_value, args)
+    page = paginate(cursor, sql, params, resource.keys, token=args.get('after'), limit=limit)
+    return _project(page.items, fields), page.next_token, fields
+
+
+def get_row(cursor, resource, scope_value, item_id, args):
+    """(row or None, fields) for one id"""
+    fields = parse_fields(args.get('fields'), resource.fields)
+    sql, params = _select(resource, fields, scope_value, {})
+    where = f"{resource.fields[resource.id_field]} = %s"
+    cursor.execute(sql.format(keyset=where), tuple(params) + (item_id,))
+    row = records.fetchone(cursor)
+    return (_project([row], fields)[0] if row else None), fields
+
+
+def project_sections(data, raw):
+    """Dashboard dict restricted to the requested top-level sections"""
+    return {name: _mappings(data[name]) for name in parse_fields(raw, data)}
+
+
+def _mappings(value):
+    """Row objects (alone or in a list) as dicts, so they serialize as objects"""
+    if isinstance(value, records.Row):
+        return dict(value)
+    if isinstance(value, list):
+        return [_mappings(item) for item in value]
+    return value
+
+
+# ============ SERIALIZATION ============
+
+def _plain(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    return json.dumps(payload, separators=(',', ':'), default=_plain)
+
+
+def shaped(rows, fields, shape):
+    """{'data': rows} or, for shape=rows, {'fields': [...], 'rows': [[...]]}"""
+    if shape == 'rows':
+        return {'fields': fields, 'rows': [[row[f] for f in fields] for row in rows]}
+    if shape not in (None, '', 'objects'):
+        raise ApiError("shape must be objects or rows")
+    return {'data': rows}
@@ -1,8 +1,8 @@
-from flask import Flask, render_template, request, session, redirect, url_for, jsonify
-import mysql.connector
+from flask import Flask, render_template, request, session, redirect, url_for, jsonify, g, Response, send_file
 import os
 from datetime import datetime, date, timedelta
 import json
+import atexit
 
 # Get the absolute path to templates (one level up)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -13,7 +13,38 @@ app = Flask(__name__,
             template_folder=TEMPLATES_DIR,
             static_folder=STATIC_DIR)
 
-from config import DB_CONFIG, SECRET_KEY
+from config import (DB_CONFIG, SECRET_KEY, DB_POOL_SIZE, DB_POOL_MAX_OVERFLOW,
+                    DB_POOL_TIMEOUT, DB_POOL_PRE_PING, DB_POOL_RECYCLE,
+                    WORKER_CACHE_SIZE, WORKER_CACHE_TTL, PAYROLL_OVERTIME_RATE,
+                    COUNTER_CACHE_SIZE, COUNTER_CACHE_TTL,
+                    INGEST_ENABLED, INGEST_QUEUE_SIZE, INGEST_FLUSH_SIZE,
+                    INGEST_FLUSH_INTERVAL, INGEST_SUBMIT_TIMEOUT, INGEST_JOURNAL_DIR,
+                    KIOSK_API_TOKENS, KIOSK_SYNC_MAX_EVENTS, DB_BACKEND, SQLITE_PATH,
+                    SQL_STATS_ENABLED, SQL_SLOW_QUERY_MS, SQL_N_PLUS_ONE_THRESHOLD, METRICS_TOKEN,
+                    PROFILER_ENABLED, PROFILE_ROUTES, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS,
+                    PROFILE_DIR, PROFILE_KEEP, PROFILE_HEADER,
+                    PRODUCTION_MODE, TEMPLATE_CACHE_DIR, ASSET_BUILD_DIR,
+                    COMPRESSION_ENABLED, COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL,
+                    COMPRESSION_BROTLI_QUALITY, DATA_VERSION_FILE, ETAG_MAX_AGE)
+from db_pool import ConnectionPool, PoolTimeout
+import storage
+from storage import DatabaseError
+from cache import LRUTTLCache
+from pagination import paginate, page_size
+import payroll
+import exports
+import dashboard_data
+import attendance
+import ingest
+import kiosk
+import sqlstats
+import profiler
+import template_cache
+import assets
+import compression
+import versions
+import api
+import records
 app.secret_key = SECRET_KEY
 
 # ============ CUSTOM JINJA2 FILTERS ============
@@ -68,14 +99,316 @@ def date_only_filter(value):
 
 # ============ END OF CUSTOM FILTERS ============
 
+def month_bounds(day=None):
+    """(first day of the month, first day of the next month) as strings"""
+    first = (day or date.today()).replace(day=1)
+    next_first = (first + timedelta(days=32)).replace(day=1)
+    return first.strftime('%Y-%m-%d'), next_first.strftime('%Y-%m-%d')
+
+# Per-request statement timings, slow-query log and N+1 detection
+query_stats = sqlstats.QueryStats(slow_query_ms=SQL_SLOW_QUERY_MS,
+                                  n_plus_one_threshold=SQL_N_PLUS_ONE_THRESHOLD)
+
+db_pool = ConnectionPool(DB_CONFIG,
+                         size=DB_POOL_SIZE,
+                         max_overflow=DB_POOL_MAX_OVERFLOW,
+                         timeout=DB_POOL_TIMEOUT,
+                         pre_ping=DB_POOL_PRE_PING,
+                         recycle=DB_POOL_RECYCLE,
+                         connect=storage.connector(DB_BACKEND, DB_CONFIG,
+                                                   storage.sqlite_path(SQLITE_PATH)),
+                         instrument=query_stats.wrap if SQL_STATS_ENABLED else None)
+
 def get_db_connection():
-    """Connect to XAMPP MySQL database"""
+    """Check out a pooled connection to the configured database"""
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except mysql.connector.Error as err:
+        conn = db_pool.get()
+    except (*DatabaseError, PoolTimeout) as err:
         print(f"❌ Database Connection Error: {err}")
         return None
+    # Remember it so teardown can hand it back if the handler doesn't
+    g.setdefault('db_connections', []).append(conn)
+    return conn
+
+@app.teardown_appcontext
+def release_db_connections(exc):
+    """Return every connection checked out during the request to the pool"""
+    for conn in g.pop('db_connections', []):
+        conn.close()
+
+# ----- Pool Stats -----
+@app.route('/admin/pool-stats')
+def pool_stats():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(db_pool.stats())
+
+# ============ SQL INSTRUMENTATION ============
+@app.before_request
+def begin_sql_trace():
+    if SQL_STATS_ENABLED:
+        query_stats.begin(request.url_rule.rule if request.url_rule else 'unmatched')
+
+@app.teardown_request
+def end_sql_trace(exc):
+    if SQL_STATS_ENABLED:
+        query_stats.end()
+
+# ============ PROFILING ============
+request_profiler = profiler.Profiler(os.path.join(os.path.dirname(os.path.abspath(__file__)), PROFILE_DIR),
+                                     enabled=PROFILER_ENABLED,
+                                     routes=PROFILE_ROUTES,
+                                     sample_rate=PROFILE_SAMPLE_RATE,
+                                     interval_ms=PROFILE_INTERVAL_MS,
+                                     keep=PROFILE_KEEP,
+                                     header=PROFILE_HEADER)
+
+@app.before_request
+def start_profile():
+    if request_profiler.wanted(request.endpoint, request.headers, session.get('role') == 'admin'):
+        request_profiler.start(request.endpoint)
+
+@app.teardown_request
+def stop_profile(exc):
+    request_profiler.stop()
+
+# ----- Profiler Settings -----
+@app.route('/admin/profiler', methods=['GET', 'POST'])
+def profiler_settings():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            if 'enabled' in data:
+                request_profiler.enabled = bool(data['enabled'])
+            if 'routes' in data:
+                request_profiler.routes = set(data['routes'])
+            if 'sample_rate' in data:
+                request_profiler.sample_rate = min(1.0, max(0.0, float(data['sample_rate'])))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'routes must be a list, sample_rate a number'}), 400
+    return jsonify({'settings': request_profiler.settings(),
+                    'recent': request_profiler.recent()})
+
+# ============ TEMPLATES ============
+# Filters are registered above, so every template compiles here
+template_cache.configure(app,
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), TEMPLATE_CACHE_DIR)
+                         if TEMPLATE_CACHE_DIR else None,
+                         production=PRODUCTION_MODE)
+template_timings = template_cache.TemplateTimings()
+template_timings.connect(app)
+if PRODUCTION_MODE:
+    template_timings.precompile(app.jinja_env)
+
+# ----- Template Stats -----
+@app.route('/admin/template-stats')
+def template_stats():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(template_timings.summary(app.jinja_env))
+
+# ============ STATIC ASSETS ============
+static_assets = assets.Assets(STATIC_DIR, os.path.join(STATIC_DIR, ASSET_BUILD_DIR),
+                              check_sources=not PRODUCTION_MODE)
+
+@app.template_global('asset_url')
+def asset_url(filename):
+    """Fingerprinted URL for a static/ file, plain /static/ URL if not built"""
+    path = static_assets.fingerprinted(filename)
+    if path is None:
+        return url_for('static', filename=filename)
+    return url_for('fingerprinted_asset', filename=path)
+
+# ----- Fingerprinted Asset -----
+@app.route('/assets/<path:filename>')
+def fingerprinted_asset(filename):
+    found = static_assets.lookup(filename, request.accept_encodings)
+    if found is None:
+        return jsonify({'error': 'Not found'}), 404
+    path, encoding, etag, mimetype = found
+    response = send_file(path, mimetype=mimetype, etag=False, conditional=False)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = assets.IMMUTABLE
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+# ============ RESPONSE COMPRESSION ============
+response_compressor = compression.ResponseCompressor(enabled=COMPRESSION_ENABLED,
+                                                     min_size=COMPRESSION_MIN_SIZE,
+                                                     gzip_level=COMPRESSION_GZIP_LEVEL,
+                                                     brotli_quality=COMPRESSION_BROTLI_QUALITY)
+
+@app.after_request
+def compress_response(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    return response_compressor.compress(response, request.accept_encodings, route)
+
+# ----- Compression Stats -----
+@app.route('/admin/compression-stats')
+def compression_stats():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(response_compressor.summary())
+
+# ----- SQL Stats -----
+@app.route('/admin/sql-stats')
+def sql_stats():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(query_stats.summary())
+
+# ----- Prometheus Metrics -----
+@app.route('/metrics')
+def metrics():
+    token = request.headers.get('Authorization', '')
+    is_scraper = METRICS_TOKEN and token == f"Bearer {METRICS_TOKEN}"
+    is_admin = session.get('role') == 'admin'
+    if not (is_scraper or is_admin):
+        return jsonify({'error': 'Unauthorized'}), 401
+    body = query_stats.render_prometheus()
+    body += "\n".join(sqlstats.gauges([], 'app_db_pool', db_pool.stats(), "Connection pool")) + "\n"
+    body += response_compressor.render_prometheus()
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+# ============ CURRENT USER ============
+worker_cache = LRUTTLCache(maxsize=WORKER_CACHE_SIZE, ttl=WORKER_CACHE_TTL)
+
+def get_worker(worker_id, db=None):
+    """Get a WORKER row by id, served from the worker cache when possible"""
+    try:
+        worker_id = int(worker_id)
+    except (TypeError, ValueError):
+        return None
+    version = cache_version(f"worker:{worker_id}")
+    worker = worker_cache.get(worker_id, version)
+    if worker is None:
+        if db is None:
+            db = get_db_connection()
+        cursor = db.cursor()
+        cursor.execute("SELECT worker_id, name, email, contact, address, department, role, "
+                       "payment_method, status, joining_date FROM WORKER WHERE worker_id=%s",
+                       (worker_id,))
+        worker = records.fetchone(cursor)
+        cursor.close()
+        if worker is None:
+            return None
+        worker_cache.set(worker_id, worker, version)
+    return worker
+
+def current_user(db=None):
+    """WORKER row of the logged-in user, loaded once per request"""
+    if 'current_user' not in g:
+        g.current_user = get_worker(session['user_id'], db)
+    return g.current_user
+
+def invalidate_worker(worker_id):
+    """Drop a cached WORKER row after it has been changed"""
+    worker_cache.invalidate(int(worker_id))
+    if 'current_user' in g and g.current_user and g.current_user['worker_id'] == int(worker_id):
+        g.pop('current_user')
+    bump_versions(worker_id)
+
+# Dashboard counters, keyed by scope (global or department) and day
+counter_cache = LRUTTLCache(maxsize=COUNTER_CACHE_SIZE, ttl=COUNTER_CACHE_TTL)
+
+def invalidate_counters(department=None, workers=()):
+    """Drop today's global counters (and a department's) after a write that changes them
+
+    Bumps the page versions of `workers` when the write touched only
+    their rows, else the department's (with neither, everything).
+    """
+    today = date.today().strftime('%Y-%m-%d')
+    counter_cache.invalidate(dashboard_data.counter_key(today))
+    if department:
+        counter_cache.invalidate(dashboard_data.counter_key(today, department))
+    if workers:
+        for worker_id in workers:
+            bump_versions(worker_id)
+    else:
+        bump_versions(department=department)
+
+# Data versions behind the dashboards' ETags (see versions.py)
+data_versions = versions.DataVersions(os.path.join(os.path.dirname(os.path.abspath(__file__)), DATA_VERSION_FILE),
+                                      max_age=ETAG_MAX_AGE)
+release = versions.release_token([os.path.abspath(__file__), TEMPLATES_DIR])
+
+def bump_versions(worker_id=None, department=None):
+    """Mark a worker's and/or a department's data changed; with neither, everything"""
+    scopes = ['global']
+    if worker_id is not None:
+        scopes.append(f"worker:{int(worker_id)}")
+        if department is None:
+            department = (get_worker(worker_id) or {}).get('department')
+    if department:
+        scopes.append(f"dept:{department}")
+    if worker_id is None and not department:
+        scopes.append('all')
+    data_versions.bump(*scopes)
+
+def cache_version(scope):
+    """Version an in-process cache entry built from `scope` is stored with
+
+    Bumps reach every process, so a process that didn't make the write
+    still misses, rather than serve a stale entry under a fresh ETag.
+    """
+    return data_versions.get('all'), data_versions.get(scope)
+
+def not_modified(*scopes):
+    """304 response if the browser's copy of this page is still current, else None"""
+    g.page_etag = data_versions.etag(scopes, session.get('user_id'), request.full_path,
+                                     date.today().isoformat(), release)
+    if request.if_none_match.contains_weak(g.page_etag):
+        return Response(status=304)
+    return None
+
+@app.after_request
+def tag_page(response):
+    """Send the ETag of a versioned page so the next refresh can be a 304"""
+    etag = g.get('page_etag')
+    if etag and response.status_code in (200, 304):
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Cookie')
+    return response
+
+# ----- Cache Stats -----
+@app.route('/admin/cache-stats')
+def cache_stats():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify({'worker_cache': worker_cache.stats(),
+                    'counter_cache': counter_cache.stats(),
+                    'data_versions': data_versions.stats()})
+
+# ============ ATTENDANCE INGEST ============
+# Optional write-behind mode for check-in/check-out bursts (see ingest.py),
+# started by create_app() in the process that serves the requests
+ingestor = None
+
+def start_ingestor(worker_slot=None):
+    """Start this process's ingest queue; preforked worker N > 0 journals to journal/worker-N"""
+    global ingestor
+    journal_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), INGEST_JOURNAL_DIR)
+    if worker_slot:
+        journal_dir = os.path.join(journal_dir, f"worker-{worker_slot}")
+    ingestor = ingest.Ingestor(db_pool, journal_dir,
+                               queue_size=INGEST_QUEUE_SIZE,
+                               flush_size=INGEST_FLUSH_SIZE,
+                               flush_interval=INGEST_FLUSH_INTERVAL,
+                               submit_timeout=INGEST_SUBMIT_TIMEOUT,
+                               on_flush=lambda: (counter_cache.clear(), bump_versions())).start()
+    atexit.register(ingestor.stop)
+
+# ----- Ingest Stats -----
+@app.route('/admin/ingest-stats')
+def ingest_stats():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    return jsonify(ingestor.stats() if ingestor else {'enabled': False})
 
 # ============ LOGIN ============
 
@@ -90,10 +423,10 @@ def login():
         password = request.form['password']
         
         db = get_db_connection()
-        cursor = db.cursor(dictionary=True, buffered=True)
-        cursor.execute("SELECT * FROM WORKER WHERE email = %s AND password = %s", 
+        cursor = db.cursor(buffered=True)
+        cursor.execute("SELECT worker_id, name, role FROM WORKER WHERE email = %s AND password = %s",
                       (email, password))
-        user = cursor.fetchone()
+        user = records.fetchone(cursor)
         cursor.close()
         db.close()
         
@@ -138,18 +471,19 @@ def signup():
             sql = """
             INSERT INTO WORKER (name, email, password, contact, address, 
                               department, role, payment_method, status, joining_date)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'Active', CURDATE())
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'Active', %s)
             """
             
             cursor.execute(sql, (name, email, password, contact, address,
-                               department, role, payment))
+                               department, role, payment, date.today()))
             db.commit()
             cursor.close()
             db.close()
+            invalidate_counters(department)
             
             return redirect('/login')
             
-        except mysql.connector.Error:
+        except DatabaseError:
             cursor.close()
             db.close()
             return render_template('signup.html', error="Email already exists!")
@@ -162,6 +496,155 @@ def logout():
     session.clear()
     return redirect('/login')
 
+# ============ KIOSK API ============
+# ----- Offline kiosk batch sync -----
+@app.route('/api/kiosk/attendance/sync', methods=['POST'])
+def kiosk_attendance_sync():
+    kiosk_name = KIOSK_API_TOKENS.get(request.headers.get('X-Kiosk-Token', ''))
+    if not kiosk_name:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    payload = request.get_json(silent=True)
+    events = payload.get('events') if isinstance(payload, dict) else None
+    if not isinstance(events, list):
+        return jsonify({'error': 'Body must be {"events": [...]}'}), 400
+    if len(events) > KIOSK_SYNC_MAX_EVENTS:
+        return jsonify({'error': f'At most {KIOSK_SYNC_MAX_EVENTS} events per sync'}), 413
+    
+    db = get_db_connection()
+    if db is None:
+        return jsonify({'error': 'Database unavailable'}), 503
+    try:
+        results = kiosk.sync(db, kiosk_name, events)
+    except DatabaseError as err:
+        db.close()
+        return jsonify({'error': str(err)}), 500
+    db.close()
+    
+    applied = sum(1 for r in results if r['status'] == 'applied')
+    if applied:
+        counter_cache.clear()
+        bump_versions()
+    
+    return jsonify({'kiosk': kiosk_name,
+                    'received': len(events),
+                    'applied': applied,
+                    'results': results})
+
+# ============ JSON API (v1) ============
+# Read-only, for thin clients (see api.py)
+API_ROLES = ('worker', 'manager', 'admin')
+
+def api_response(payload, status=200):
+    return Response(api.dumps(payload), status=status, mimetype='application/json')
+
+def api_caller():
+    """(value for the resources' scope clause, data version scope) of the logged-in user"""
+    if session['role'] == 'worker':
+        return session['user_id'], f"worker:{session['user_id']}"
+    if session['role'] == 'manager':
+        department = current_user()['department']
+        return department, f"dept:{department}"
+    return None, 'global'
+
+# ----- API Index -----
+@app.route('/api/v1')
+def api_index():
+    if 'user_id' not in session:
+        return api_response({'error': 'Not logged in'}, 401)
+    role = session['role']
+    resources = [resource.describe() for resource in api.RESOURCES.values() if resource.role == role]
+    resources.append({'path': f"/api/v1/{role}/dashboard"})
+    return api_response({'version': 1, 'role': role, 'resources': resources})
+
+# ----- API Dashboard -----
+@app.route('/api/v1/<role>/dashboard')
+def api_dashboard(role):
+    if role not in API_ROLES:
+        return api_response({'error': 'Not found'}, 404)
+    if 'user_id' not in session or session['role'] != role:
+        return api_response({'error': 'Unauthorized'}, 401)
+    
+    scope_value, version_scope = api_caller()
+    cached = not_modified(version_scope)
+    if cached:
+        return cached
+    
+    db = get_db_connection()
+    cursor = db.cursor()
+    today = date.today().strftime('%Y-%m-%d')
+    if role == 'worker':
+        data = dashboard_data.worker_dashboard(cursor, scope_value, today)
+    elif role == 'manager':
+        data = dashboard_data.manager_dashboard(cursor, scope_value, today, counter_cache,
+                                                cache_version(version_scope))
+    else:
+        data = dashboard_data.admin_dashboard(cursor, today, counter_cache, cache_version('global'))
+    cursor.close()
+    db.close()
+    
+    try:
+        return api_response({'data': api.project_sections(data, request.args.get('fields'))})
+    except api.ApiError as err:
+        return api_response({'error': str(err)}, 400)
+
+# ----- API List -----
+@app.route('/api/v1/<role>/<name>')
+def api_list(role, name):
+    resource = api.RESOURCES.get((role, name))
+    if resource is None:
+        return api_response({'error': 'Not found'}, 404)
+    if 'user_id' not in session or session['role'] != role:
+        return api_response({'error': 'Unauthorized'}, 401)
+    
+    scope_value, version_scope = api_caller()
+    cached = not_modified(version_scope)
+    if cached:
+        return cached
+    
+    limit = page_size(request.args.get('limit'))
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        rows, next_token, fields = api.list_rows(cursor, resource, scope_value, request.args, limit)
+        payload = api.shaped(rows, fields, request.args.get('shape'))
+    except api.ApiError as err:
+        return api_response({'error': str(err)}, 400)
+    finally:
+        cursor.close()
+        db.close()
+    
+    payload.update(next=next_token, limit=limit)
+    return api_response(payload)
+
+# ----- API Item -----
+@app.route('/api/v1/<role>/<name>/<int:item_id>')
+def api_item(role, name, item_id):
+    resource = api.RESOURCES.get((role, name))
+    if resource is None:
+        return api_response({'error': 'Not found'}, 404)
+    if 'user_id' not in session or session['role'] != role:
+        return api_response({'error': 'Unauthorized'}, 401)
+    
+    scope_value, version_scope = api_caller()
+    cached = not_modified(version_scope)
+    if cached:
+        return cached
+    
+    db = get_db_connection()
+    cursor = db.cursor()
+    try:
+        row, _ = api.get_row(cursor, resource, scope_value, item_id, request.args)
+    except api.ApiError as err:
+        return api_response({'error': str(err)}, 400)
+    finally:
+        cursor.close()
+        db.close()
+    
+    if row is None:
+        return api_response({'error': f"{resource.name} {item_id} not found"}, 404)
+    return api_response({'data': row})
+
 # ============ WORKER ROUTES ============
 # ----- Worker Dashboard -----
 @app.route('/worker/dashboard')
@@ -169,44 +652,27 @@ def worker_dashboard():
     if 'user_id' not in session or session['role'] != 'worker':
         return redirect('/login')
     
+    cached = not_modified(f"worker:{session['user_id']}")
+    if cached:
+        return cached
+    
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get worker data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    worker = cursor.fetchone()
+    worker = current_user(db)
     
-    # Today's attendance
+    # Today's attendance, upcoming tasks and latest salary in one round trip
     today = date.today().strftime('%Y-%m-%d')
-    cursor.execute("SELECT * FROM ATTENDANCE WHERE worker_id=%s AND date=%s", 
-                   (session['user_id'], today))
-    attendance = cursor.fetchone()
-    
-    # Recent tasks (5 tasks)
-    cursor.execute("""
-        SELECT * FROM TASK 
-        WHERE worker_id=%s 
-        ORDER BY deadline LIMIT 5
-    """, (session['user_id'],))
-    tasks = cursor.fetchall()
-    
-    # Recent salary record
-    cursor.execute("""
-        SELECT * FROM SALARY 
-        WHERE worker_id=%s 
-        ORDER BY month DESC LIMIT 1
-    """, (session['user_id'],))
-    latest_salary = cursor.fetchone()
+    data = dashboard_data.worker_dashboard(cursor, session['user_id'], today)
     
     cursor.close()
     db.close()
     
     return render_template('worker/dashboard.html', 
                          worker=worker,
-                         attendance=attendance,
-                         tasks=tasks,
-                         latest_salary=latest_salary,
-                         today=today)
+                         today=today,
+                         **data)
 
 # ----- Worker Profile -----
 @app.route('/worker/profile')
@@ -214,12 +680,7 @@ def worker_profile():
     if 'user_id' not in session or session['role'] != 'worker':
         return redirect('/login')
     
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    worker = cursor.fetchone()
-    cursor.close()
-    db.close()
+    worker = current_user()
     
     return render_template('worker/profile.html', worker=worker)
 
@@ -237,6 +698,7 @@ def update_profile():
     cursor.execute("UPDATE WORKER SET contact=%s, address=%s WHERE worker_id=%s", 
                    (contact, address, session['user_id']))
     db.commit()
+    invalidate_worker(session['user_id'])
     cursor.close()
     db.close()
     
@@ -256,11 +718,11 @@ def change_password():
         return redirect('/worker/profile?error=password_mismatch')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Verify current password
     cursor.execute("SELECT password FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    worker = cursor.fetchone()
+    worker = records.fetchone(cursor)
     
     if worker['password'] != current_password:
         cursor.close()
@@ -271,6 +733,7 @@ def change_password():
     cursor.execute("UPDATE WORKER SET password=%s WHERE worker_id=%s", 
                    (new_password, session['user_id']))
     db.commit()
+    invalidate_worker(session['user_id'])
     
     cursor.close()
     db.close()
@@ -284,23 +747,36 @@ def worker_tasks():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    worker = cursor.fetchone()
+    worker = current_user(db)
     
-    cursor.execute("SELECT * FROM TASK WHERE worker_id=%s ORDER BY deadline", (session['user_id'],))
-    tasks = cursor.fetchall()
+    page = paginate(cursor, """
+        SELECT task_id, worker_id, task_details, deadline, status, assigned_date
+        FROM TASK WHERE worker_id=%s AND {keyset}
+    """, (session['user_id'],),
+        keys=[('deadline', 'deadline', 'ASC'), ('task_id', 'task_id', 'ASC')],
+        token=request.args.get('after'), limit=page_size(request.args.get('limit')))
+    
+    # Counts cover every task, not just this page
+    cursor.execute("""
+        SELECT status, COUNT(*) as count 
+        FROM TASK WHERE worker_id=%s 
+        GROUP BY status
+    """, (session['user_id'],))
+    task_counts = {row['status']: row['count'] for row in records.fetchall(cursor)}
     
     cursor.close()
     db.close()
     
     return render_template('worker/tasks.html', 
                          worker=worker,
-                         tasks=tasks,
-                         total_tasks=len(tasks),
-                         completed_tasks=len([t for t in tasks if t['status'] == 'Completed']),
-                         pending_tasks=len([t for t in tasks if t['status'] == 'Pending']))
+                         tasks=page.items,
+                         next_token=page.next_token,
+                         task_counts=task_counts,
+                         total_tasks=sum(task_counts.values()),
+                         completed_tasks=task_counts.get('Completed', 0),
+                         pending_tasks=task_counts.get('Pending', 0))
 
 # ----- Mark Task Complete -----
 @app.route('/worker/task/<int:task_id>/complete', methods=['POST'])
@@ -315,6 +791,10 @@ def complete_task(task_id):
     db.commit()
     cursor.close()
     db.close()
+    # pending_tasks is one of the department's cached counters
+    department = current_user()['department']
+    invalidate_counters(department)
+    bump_versions(session['user_id'], department)
     
     return redirect('/worker/tasks')
 
@@ -338,6 +818,9 @@ def update_task_status(task_id):
     
     cursor.close()
     db.close()
+    department = current_user()['department']
+    invalidate_counters(department)
+    bump_versions(session['user_id'], department)
     
     return jsonify({'success': True})
 
@@ -348,21 +831,22 @@ def get_task_details(task_id):
         return jsonify({'error': 'Not logged in'}), 401
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     cursor.execute("""
-        SELECT t.*, w.name as assigned_by 
+        SELECT t.task_id, t.worker_id, t.task_details, t.deadline, t.status, t.assigned_date,
+               w.name as assigned_by
         FROM TASK t
         LEFT JOIN WORKER w ON t.worker_id = w.worker_id
         WHERE t.task_id = %s AND t.worker_id = %s
     """, (task_id, session['user_id']))
-    task = cursor.fetchone()
+    task = records.fetchone(cursor)
     
     cursor.close()
     db.close()
     
     if task:
-        return jsonify(task)
+        return jsonify(dict(task))
     else:
         return jsonify({'error': 'Task not found'}), 404
 
@@ -373,41 +857,43 @@ def worker_attendance():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get worker data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    worker = cursor.fetchone()
+    worker = current_user(db)
     
     # Today's attendance
     today = date.today().strftime('%Y-%m-%d')
-    cursor.execute("SELECT * FROM ATTENDANCE WHERE worker_id=%s AND date=%s", 
+    cursor.execute("SELECT attendance_id, worker_id, date, check_in, check_out, attendance_value, "
+                   "working_hours FROM ATTENDANCE WHERE worker_id=%s AND date=%s",
                    (session['user_id'], today))
-    today_attendance = cursor.fetchone()
+    today_attendance = records.fetchone(cursor)
     
     # Attendance history (last 30 days)
     cursor.execute("""
-        SELECT * FROM ATTENDANCE 
+        SELECT attendance_id, worker_id, date, check_in, check_out, attendance_value,
+               working_hours
+        FROM ATTENDANCE 
         WHERE worker_id = %s 
         ORDER BY date DESC 
         LIMIT 30
     """, (session['user_id'],))
-    attendance_history = cursor.fetchall()
+    attendance_history = records.fetchall(cursor)
     
-    # Monthly summary
+    # Monthly summary (from the per-worker-per-day rollup)
     cursor.execute("""
         SELECT 
-            DATE_FORMAT(date, '%Y-%m') as month,
+            month,
             COUNT(*) as total_days,
             SUM(attendance_value) as attendance_days,
             AVG(working_hours) as avg_hours
-        FROM ATTENDANCE 
+        FROM ATTENDANCE_WORKER_DAY 
         WHERE worker_id = %s 
-        GROUP BY DATE_FORMAT(date, '%Y-%m')
+        GROUP BY month
         ORDER BY month DESC
         LIMIT 6
     """, (session['user_id'],))
-    monthly_summary = cursor.fetchall()
+    monthly_summary = records.fetchall(cursor)
     
     cursor.close()
     db.close()
@@ -428,26 +914,26 @@ def check_in():
     today = date.today().strftime('%Y-%m-%d')
     current_time = datetime.now().strftime('%H:%M:%S')
     
+    if ingestor:
+        try:
+            ingestor.submit('check_in', session['user_id'], today, current_time)
+        except ingest.IngestBusy:
+            return "Too many check-ins right now, please try again", 503
+        return redirect('/worker/dashboard?queued=check_in')
+    
     db = get_db_connection()
     cursor = db.cursor()
     
-    # Check if already checked in
-    cursor.execute("SELECT * FROM ATTENDANCE WHERE worker_id=%s AND date=%s", 
-                   (session['user_id'], today))
-    if cursor.fetchone():
+    # One atomic insert - a repeated submit hits the (worker_id, date) key
+    if not attendance.check_in(cursor, session['user_id'], today, current_time):
         cursor.close()
         db.close()
         return redirect('/worker/dashboard?error=already_checked_in')
-    
-    # Insert check-in (0.5 attendance)
-    sql = """
-    INSERT INTO ATTENDANCE (worker_id, date, check_in, attendance_value)
-    VALUES (%s, %s, %s, 0.5)
-    """
-    cursor.execute(sql, (session['user_id'], today, current_time))
     db.commit()
     cursor.close()
     db.close()
+    invalidate_counters(current_user()['department'])
+    bump_versions(session['user_id'])
     
     return redirect('/worker/dashboard')
 
@@ -460,49 +946,29 @@ def check_out():
     today = date.today().strftime('%Y-%m-%d')
     current_time = datetime.now().strftime('%H:%M:%S')
     
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    if ingestor:
+        try:
+            ingestor.submit('check_out', session['user_id'], today, current_time)
+        except ingest.IngestBusy:
+            return "Too many check-outs right now, please try again", 503
+        return redirect('/worker/dashboard?queued=check_out')
     
-    # Get check-in time
-    cursor.execute("SELECT check_in FROM ATTENDANCE WHERE worker_id=%s AND date=%s", 
-                   (session['user_id'], today))
-    check_in_record = cursor.fetchone()
+    db = get_db_connection()
+    cursor = db.cursor()
     
-    if not check_in_record:
+    # One atomic update, working hours computed from check_in in SQL
+    if not attendance.check_out(cursor, session['user_id'], today, current_time):
+        status = attendance.day_status(cursor, session['user_id'], today)
         cursor.close()
         db.close()
-        return redirect('/worker/dashboard?error=not_checked_in')
-    
-    # Calculate working hours - SIMPLE WAY
-    # Get check_in as string first
-    check_in_str = str(check_in_record['check_in'])
-    
-    # Parse check_in time (handle timedelta by extracting hours/minutes/seconds)
-    if isinstance(check_in_record['check_in'], timedelta):
-        td = check_in_record['check_in']
-        check_in_seconds = td.seconds
-        check_in_hours = check_in_seconds // 3600
-        check_in_minutes = (check_in_seconds % 3600) // 60
-        check_in_secs = check_in_seconds % 60
-        check_in_time = datetime.strptime(f"{check_in_hours:02d}:{check_in_minutes:02d}:{check_in_secs:02d}", '%H:%M:%S')
-    else:
-        check_in_time = datetime.strptime(check_in_str, '%H:%M:%S')
-    
-    check_out_time = datetime.strptime(current_time, '%H:%M:%S')
-    working_hours = (check_out_time - check_in_time).seconds / 3600
-    
-    # Update check-out with working hours
-    sql = """
-    UPDATE ATTENDANCE 
-    SET check_out=%s, attendance_value=1.0, working_hours=%s
-    WHERE worker_id=%s AND date=%s
-    """
-    cursor.execute(sql, (current_time, round(working_hours, 2), 
-                         session['user_id'], today))
+        if status == 'absent':
+            return redirect('/worker/dashboard?error=not_checked_in')
+        return redirect('/worker/dashboard?error=already_checked_out')
     db.commit()
     
     cursor.close()
     db.close()
+    bump_versions(session['user_id'])
     
     return redirect('/worker/dashboard')
 
@@ -513,31 +979,32 @@ def worker_substitute():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get worker data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    worker = cursor.fetchone()
+    worker = current_user(db)
     
     # Get substitute requests made by this worker
     cursor.execute("""
-        SELECT sr.*, w.name as substitute_name, w.department 
+        SELECT sr.sub_id, sr.requester_id, sr.substitute_id, sr.date, sr.hours, sr.reason,
+               sr.status, sr.admin_approved, w.name as substitute_name, w.department 
         FROM SUBSTITUTE_REQUEST sr
         LEFT JOIN WORKER w ON sr.substitute_id = w.worker_id
         WHERE sr.requester_id = %s 
         ORDER BY date DESC
     """, (session['user_id'],))
-    my_requests = cursor.fetchall()
+    my_requests = records.fetchall(cursor)
     
     # Get requests where this worker is the substitute
     cursor.execute("""
-        SELECT sr.*, w.name as requester_name, w.department 
+        SELECT sr.sub_id, sr.requester_id, sr.substitute_id, sr.date, sr.hours, sr.reason,
+               sr.status, sr.admin_approved, w.name as requester_name, w.department 
         FROM SUBSTITUTE_REQUEST sr
         JOIN WORKER w ON sr.requester_id = w.worker_id
         WHERE sr.substitute_id = %s 
         ORDER BY date DESC
     """, (session['user_id'],))
-    substitute_for = cursor.fetchall()
+    substitute_for = records.fetchall(cursor)
     
     # Get available substitutes (same department, active, not self)
     cursor.execute("""
@@ -549,7 +1016,7 @@ def worker_substitute():
         AND role = 'worker'
         ORDER BY name
     """, (worker['department'], session['user_id']))
-    available_substitutes = cursor.fetchall()
+    available_substitutes = records.fetchall(cursor)
     
     cursor.close()
     db.close()
@@ -588,9 +1055,10 @@ def submit_substitute_request():
         
         cursor.close()
         db.close()
+        bump_versions(session['user_id'])
         
         return redirect('/worker/substitute?success=true')
-    except mysql.connector.Error as err:
+    except DatabaseError as err:
         cursor.close()
         db.close()
         return redirect(f'/worker/substitute?error={str(err)}')
@@ -606,17 +1074,19 @@ def accept_substitute_request(request_id):
     
     # Check if this worker is the substitute
     cursor.execute("""
-        SELECT * FROM SUBSTITUTE_REQUEST 
+        SELECT requester_id, substitute_id FROM SUBSTITUTE_REQUEST 
         WHERE sub_id = %s AND substitute_id = %s
     """, (request_id, session['user_id']))
+    sub_request = cursor.fetchone()
     
-    if cursor.fetchone():
+    if sub_request:
         cursor.execute("""
             UPDATE SUBSTITUTE_REQUEST 
             SET status = 'Accepted' 
             WHERE sub_id = %s
         """, (request_id,))
         db.commit()
+        invalidate_counters(workers=sub_request)
     
     cursor.close()
     db.close()
@@ -630,19 +1100,20 @@ def worker_leave():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get worker data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    worker = cursor.fetchone()
+    worker = current_user(db)
     
     # Get worker's leave requests
-    cursor.execute("""
-        SELECT * FROM LEAVE_REQUEST 
-        WHERE worker_id = %s 
-        ORDER BY applied_date DESC
-    """, (session['user_id'],))
-    leave_requests = cursor.fetchall()
+    page = paginate(cursor, """
+        SELECT leave_id, worker_id, leave_type, start_date, end_date, reason, status,
+               applied_date, approved_by, approval_date
+        FROM LEAVE_REQUEST 
+        WHERE worker_id = %s AND {keyset}
+    """, (session['user_id'],),
+        keys=[('applied_date', 'applied_date', 'DESC'), ('leave_id', 'leave_id', 'DESC')],
+        token=request.args.get('after'), limit=page_size(request.args.get('limit')))
     
     # Calculate leave balance
     # For now, use placeholder values
@@ -654,14 +1125,15 @@ def worker_leave():
     }
     
     # Calculate actual taken leaves
+    year_start = date.today().replace(month=1, day=1)
     cursor.execute("""
         SELECT COUNT(*) as taken 
         FROM LEAVE_REQUEST 
         WHERE worker_id = %s 
         AND status = 'Approved'
-        AND YEAR(start_date) = YEAR(CURDATE())
-    """, (session['user_id'],))
-    taken_data = cursor.fetchone()
+        AND start_date >= %s AND start_date < %s
+    """, (session['user_id'], year_start, year_start.replace(year=year_start.year + 1)))
+    taken_data = records.fetchone(cursor)
     leave_balance['taken_this_year'] = taken_data['taken'] if taken_data else 0
     
     cursor.close()
@@ -670,7 +1142,8 @@ def worker_leave():
     return render_template('worker/leave.html', 
                          worker=worker,
                          leave_balance=leave_balance,
-                         leave_requests=leave_requests)
+                         leave_requests=page.items,
+                         next_token=page.next_token)
 
 # ----- Submit Leave Request -----
 @app.route('/worker/leave/request', methods=['POST'])
@@ -704,17 +1177,19 @@ def submit_leave_request():
     
     # Check leave balance (simplified - you can enhance this)
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Check if worker has active leave overlapping with requested dates
     cursor.execute("""
-        SELECT * FROM LEAVE_REQUEST 
+        SELECT leave_id, worker_id, leave_type, start_date, end_date, reason, status,
+               applied_date, approved_by, approval_date
+        FROM LEAVE_REQUEST 
         WHERE worker_id = %s 
         AND status = 'Approved'
         AND ((start_date BETWEEN %s AND %s) OR (end_date BETWEEN %s AND %s))
     """, (session['user_id'], start_date, end_date, start_date, end_date))
     
-    if cursor.fetchone():
+    if records.fetchone(cursor):
         cursor.close()
         db.close()
         return redirect('/worker/leave?error=overlapping_leave')
@@ -724,17 +1199,21 @@ def submit_leave_request():
         sql = """
         INSERT INTO LEAVE_REQUEST 
         (worker_id, leave_type, start_date, end_date, reason, status, applied_date)
-        VALUES (%s, %s, %s, %s, %s, 'Pending', CURDATE())
+        VALUES (%s, %s, %s, %s, %s, 'Pending', %s)
         """
         
-        cursor.execute(sql, (session['user_id'], leave_type, start_date, end_date, reason))
+        cursor.execute(sql, (session['user_id'], leave_type, start_date, end_date, reason,
+                             date.today()))
         db.commit()
+        department = current_user(db)['department']
+        invalidate_counters(department)
+        bump_versions(session['user_id'], department)
         
         cursor.close()
         db.close()
         
         return redirect('/worker/leave?success=true&type=' + leave_type)
-    except mysql.connector.Error as err:
+    except DatabaseError as err:
         cursor.close()
         db.close()
         return redirect(f'/worker/leave?error={str(err)}')
@@ -746,35 +1225,54 @@ def worker_salary():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get worker data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    worker = cursor.fetchone()
+    worker = current_user(db)
     
     # Get salary records
+    page = paginate(cursor, """
+        SELECT salary_id, worker_id, month, base_salary, extra_hours, bonus_amount,
+               total_salary, status
+        FROM SALARY 
+        WHERE worker_id=%s AND {keyset}
+    """, (session['user_id'],),
+        keys=[('month', 'month', 'DESC'), ('salary_id', 'salary_id', 'DESC')],
+        token=request.args.get('after'), limit=page_size(request.args.get('limit')))
+    
+    # Calculate summary over the whole history
     cursor.execute("""
-        SELECT * FROM SALARY 
-        WHERE worker_id=%s 
-        ORDER BY month DESC
+        SELECT 
+            COUNT(*) as record_count,
+            COALESCE(SUM(total_salary), 0) as total_earned,
+            COALESCE(AVG(COALESCE(total_salary, 0)), 0) as avg_salary,
+            COALESCE(SUM(bonus_amount), 0) as total_bonus,
+            COALESCE(SUM(extra_hours), 0) as total_extra_hours,
+            COALESCE(SUM(status = 'Paid'), 0) as paid_count,
+            COALESCE(SUM(status = 'Pending'), 0) as pending_count
+        FROM SALARY 
+        WHERE worker_id=%s
     """, (session['user_id'],))
-    salaries = cursor.fetchall()
-    
-    # Calculate summary
-    total_earned = sum(salary['total_salary'] or 0 for salary in salaries)
-    avg_salary = total_earned / len(salaries) if salaries else 0
+    salary_summary = records.fetchone(cursor)
     
     # Current month
     current_month = datetime.now().strftime('%Y-%m')
+    cursor.execute("SELECT salary_id, worker_id, month, base_salary, extra_hours, bonus_amount, "
+                   "total_salary, status FROM SALARY WHERE worker_id=%s AND month=%s",
+                   (session['user_id'], current_month))
+    current_salary = records.fetchone(cursor)
     
     cursor.close()
     db.close()
     
     return render_template('worker/salary.html', 
                          worker=worker,
-                         salaries=salaries,
-                         total_earned=total_earned,
-                         avg_salary=avg_salary,
+                         salaries=page.items,
+                         next_token=page.next_token,
+                         salary_summary=salary_summary,
+                         current_salary=current_salary,
+                         total_earned=salary_summary['total_earned'],
+                         avg_salary=salary_summary['avg_salary'],
                          current_month=current_month)
 
 # ----- Worker Performance Page -----
@@ -784,19 +1282,20 @@ def worker_performance():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get worker data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    worker = cursor.fetchone()
+    worker = current_user(db)
     
     # Get performance records
     cursor.execute("""
-        SELECT * FROM PERFORMANCE 
+        SELECT performance_id, worker_id, month, attendance_percentage, total_hours,
+               manager_feedback
+        FROM PERFORMANCE 
         WHERE worker_id=%s 
         ORDER BY month DESC
     """, (session['user_id'],))
-    performances = cursor.fetchall()
+    performances = records.fetchall(cursor)
     
     # Current month stats
     current_month = datetime.now().strftime('%Y-%m')
@@ -806,11 +1305,11 @@ def worker_performance():
             SUM(attendance_value) as total_days,
             AVG(working_hours) as avg_hours,
             SUM(working_hours) as total_hours
-        FROM ATTENDANCE 
+        FROM ATTENDANCE_WORKER_DAY 
         WHERE worker_id = %s 
-        AND DATE_FORMAT(date, '%Y-%m') = %s
+        AND month = %s
     """, (session['user_id'], current_month))
-    current_stats = cursor.fetchone()
+    current_stats = records.fetchone(cursor)
     
     cursor.close()
     db.close()
@@ -834,52 +1333,26 @@ def admin_dashboard():
     if 'user_id' not in session or session['role'] != 'admin':
         return redirect('/login')
     
+    cached = not_modified('global')
+    if cached:
+        return cached
+    
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get admin data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    admin = cursor.fetchone()
+    admin = current_user(db)
     
-    # Get total counts
-    cursor.execute("SELECT COUNT(*) as total FROM WORKER WHERE role='worker'")
-    total_workers = cursor.fetchone()['total']
-    
-    cursor.execute("SELECT COUNT(*) as total FROM WORKER WHERE role='manager'")
-    total_managers = cursor.fetchone()['total']
-    
-    cursor.execute("SELECT COUNT(*) as total FROM ATTENDANCE WHERE date=CURDATE()")
-    today_attendance = cursor.fetchone()['total']
-    
-    # Get pending approvals
-    cursor.execute("SELECT COUNT(*) as total FROM SUBSTITUTE_REQUEST WHERE admin_approved=FALSE AND status='Accepted'")
-    pending_substitutes = cursor.fetchone()['total']
-    
-    cursor.execute("SELECT COUNT(*) as total FROM SALARY WHERE status='Pending'")
-    pending_salaries = cursor.fetchone()['total']
-    
-    # Recent activity
-    cursor.execute("""
-        SELECT w.name, a.date, a.check_in, a.check_out 
-        FROM ATTENDANCE a
-        JOIN WORKER w ON a.worker_id = w.worker_id
-        WHERE a.date = CURDATE()
-        ORDER BY a.check_in DESC
-        LIMIT 5
-    """)
-    recent_attendance = cursor.fetchall()
+    # Counters and today's activity in one round trip
+    today = date.today().strftime('%Y-%m-%d')
+    data = dashboard_data.admin_dashboard(cursor, today, counter_cache, cache_version('global'))
     
     cursor.close()
     db.close()
     
     return render_template('admin/dashboard.html',
                          admin=admin,
-                         total_workers=total_workers,
-                         total_managers=total_managers,
-                         today_attendance=today_attendance,
-                         pending_substitutes=pending_substitutes,
-                         pending_salaries=pending_salaries,
-                         recent_attendance=recent_attendance)
+                         **data)
 
 # ----- Admin Profile -----
 @app.route('/admin/profile')
@@ -887,12 +1360,7 @@ def admin_profile():
     if 'user_id' not in session or session['role'] != 'admin':
         return redirect('/login')
     
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    admin = cursor.fetchone()
-    cursor.close()
-    db.close()
+    admin = current_user()
     
     return render_template('admin/profile.html', admin=admin)
 
@@ -910,6 +1378,7 @@ def update_admin_profile():
     cursor.execute("UPDATE WORKER SET contact=%s, address=%s WHERE worker_id=%s", 
                    (contact, address, session['user_id']))
     db.commit()
+    invalidate_worker(session['user_id'])
     cursor.close()
     db.close()
     
@@ -929,11 +1398,11 @@ def change_admin_password():
         return redirect('/admin/profile?error=password_mismatch')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Verify current password
     cursor.execute("SELECT password FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    admin = cursor.fetchone()
+    admin = records.fetchone(cursor)
     
     if admin['password'] != current_password:
         cursor.close()
@@ -944,6 +1413,7 @@ def change_admin_password():
     cursor.execute("UPDATE WORKER SET password=%s WHERE worker_id=%s", 
                    (new_password, session['user_id']))
     db.commit()
+    invalidate_worker(session['user_id'])
     
     cursor.close()
     db.close()
@@ -957,29 +1427,44 @@ def all_workers():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get admin data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    admin = cursor.fetchone()
-    
-    # Get all workers with their departments
-    cursor.execute("""
-        SELECT w.*, 
-               (SELECT COUNT(*) FROM ATTENDANCE a WHERE a.worker_id = w.worker_id AND MONTH(a.date) = MONTH(CURDATE())) as attendance_days,
-               (SELECT SUM(a.working_hours) FROM ATTENDANCE a WHERE a.worker_id = w.worker_id AND MONTH(a.date) = MONTH(CURDATE())) as total_hours
+    admin = current_user(db)
+    
+    # Get all workers with this month's attendance, aggregated in one pass
+    month_start, next_month = month_bounds()
+    page = paginate(cursor, """
+        SELECT w.worker_id, w.name, w.email, w.contact, w.address, w.department, w.role,
+               w.payment_method, w.status, w.joining_date, 
+               COALESCE(m.attendance_days, 0) as attendance_days,
+               m.total_hours
         FROM WORKER w
-        WHERE w.role IN ('worker', 'manager')
-        ORDER BY w.department, w.name
-    """)
-    workers = cursor.fetchall()
+        LEFT JOIN (
+            SELECT worker_id,
+                   COUNT(*) as attendance_days,
+                   SUM(working_hours) as total_hours
+            FROM ATTENDANCE
+            WHERE date >= %s AND date < %s
+            GROUP BY worker_id
+        ) m ON m.worker_id = w.worker_id
+        WHERE w.role IN ('worker', 'manager') AND {keyset}
+    """, (month_start, next_month),
+        keys=[('w.department', 'department', 'ASC'), ('w.name', 'name', 'ASC'),
+              ('w.worker_id', 'worker_id', 'ASC')],
+        token=request.args.get('after'), limit=page_size(request.args.get('limit')))
+    
+    cursor.execute("SELECT COUNT(*) as total FROM WORKER WHERE role IN ('worker', 'manager')")
+    total_workers = records.fetchone(cursor)['total']
     
     cursor.close()
     db.close()
     
     return render_template('admin/all_workers.html',
                          admin=admin,
-                         workers=workers)
+                         workers=page.items,
+                         next_token=page.next_token,
+                         total_workers=total_workers)
 
 # ----- View Single Worker Details -----
 @app.route('/admin/worker/<int:worker_id>')
@@ -988,15 +1473,13 @@ def view_worker_details(worker_id):
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get admin data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    admin = cursor.fetchone()
+    admin = current_user(db)
     
     # Get worker details
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (worker_id,))
-    worker = cursor.fetchone()
+    worker = get_worker(worker_id, db)
     
     if not worker:
         cursor.close()
@@ -1005,36 +1488,43 @@ def view_worker_details(worker_id):
     
     # Get worker attendance (last 30 days)
     cursor.execute("""
-        SELECT * FROM ATTENDANCE 
+        SELECT attendance_id, worker_id, date, check_in, check_out, attendance_value,
+               working_hours
+        FROM ATTENDANCE 
         WHERE worker_id = %s 
         ORDER BY date DESC 
         LIMIT 30
     """, (worker_id,))
-    attendance = cursor.fetchall()
+    attendance = records.fetchall(cursor)
     
     # Get worker tasks
     cursor.execute("""
-        SELECT * FROM TASK 
+        SELECT task_id, worker_id, task_details, deadline, status, assigned_date
+        FROM TASK 
         WHERE worker_id = %s 
         ORDER BY deadline
     """, (worker_id,))
-    tasks = cursor.fetchall()
+    tasks = records.fetchall(cursor)
     
     # Get worker salary records
     cursor.execute("""
-        SELECT * FROM SALARY 
+        SELECT salary_id, worker_id, month, base_salary, extra_hours, bonus_amount,
+               total_salary, status
+        FROM SALARY 
         WHERE worker_id = %s 
         ORDER BY month DESC
     """, (worker_id,))
-    salaries = cursor.fetchall()
+    salaries = records.fetchall(cursor)
     
     # Get worker performance
     cursor.execute("""
-        SELECT * FROM PERFORMANCE 
+        SELECT performance_id, worker_id, month, attendance_percentage, total_hours,
+               manager_feedback
+        FROM PERFORMANCE 
         WHERE worker_id = %s 
         ORDER BY month DESC
     """, (worker_id,))
-    performances = cursor.fetchall()
+    performances = records.fetchall(cursor)
     
     cursor.close()
     db.close()
@@ -1061,9 +1551,12 @@ def update_worker_status(worker_id):
     db = get_db_connection()
     cursor = db.cursor()
     
+    worker = get_worker(worker_id, db)
     cursor.execute("UPDATE WORKER SET status=%s WHERE worker_id=%s", 
                    (new_status, worker_id))
     db.commit()
+    invalidate_worker(worker_id)
+    invalidate_counters(worker['department'] if worker else None)
     
     cursor.close()
     db.close()
@@ -1077,48 +1570,64 @@ def attendance_reports():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get admin data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    admin = cursor.fetchone()
+    admin = current_user(db)
     
     # Get date range from query params
     start_date = request.args.get('start_date', (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
     end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
     
-    # Get department-wise attendance summary
+    # Get department-wise attendance summary (from the rollup tables)
     cursor.execute("""
         SELECT 
             w.department,
-            COUNT(DISTINCT w.worker_id) as total_workers,
-            COUNT(DISTINCT a.worker_id) as workers_present,
-            SUM(a.attendance_value) as total_attendance_days,
-            AVG(a.working_hours) as avg_hours,
-            MIN(a.date) as earliest_date,
-            MAX(a.date) as latest_date
-        FROM WORKER w
-        LEFT JOIN ATTENDANCE a ON w.worker_id = a.worker_id 
-            AND a.date BETWEEN %s AND %s
-        WHERE w.role = 'worker'
-        GROUP BY w.department
+            w.total_workers,
+            COALESCE(p.workers_present, 0) as workers_present,
+            d.total_attendance_days,
+            d.avg_hours,
+            d.earliest_date,
+            d.latest_date
+        FROM (
+            SELECT department, COUNT(*) as total_workers
+            FROM WORKER
+            WHERE role = 'worker'
+            GROUP BY department
+        ) w
+        LEFT JOIN (
+            SELECT department,
+                   SUM(attendance_total) as total_attendance_days,
+                   SUM(hours_total) / NULLIF(SUM(hours_count), 0) as avg_hours,
+                   MIN(date) as earliest_date,
+                   MAX(date) as latest_date
+            FROM ATTENDANCE_DEPT_DAY
+            WHERE role = 'worker' AND date BETWEEN %s AND %s
+            GROUP BY department
+        ) d ON d.department = w.department
+        LEFT JOIN (
+            SELECT department, COUNT(DISTINCT worker_id) as workers_present
+            FROM ATTENDANCE_WORKER_DAY
+            WHERE role = 'worker' AND date BETWEEN %s AND %s
+            GROUP BY department
+        ) p ON p.department = w.department
         ORDER BY w.department
-    """, (start_date, end_date))
-    department_summary = cursor.fetchall()
+    """, (start_date, end_date, start_date, end_date))
+    department_summary = records.fetchall(cursor)
     
     # Get daily attendance count
     cursor.execute("""
         SELECT 
             date,
-            COUNT(*) as total_checkins,
-            SUM(attendance_value) as total_attendance,
-            AVG(working_hours) as avg_hours
-        FROM ATTENDANCE
+            SUM(checkins) as total_checkins,
+            SUM(attendance_total) as total_attendance,
+            SUM(hours_total) / NULLIF(SUM(hours_count), 0) as avg_hours
+        FROM ATTENDANCE_DEPT_DAY
         WHERE date BETWEEN %s AND %s
         GROUP BY date
         ORDER BY date DESC
     """, (start_date, end_date))
-    daily_summary = cursor.fetchall()
+    daily_summary = records.fetchall(cursor)
     
     cursor.close()
     db.close()
@@ -1130,6 +1639,74 @@ def attendance_reports():
                          start_date=start_date,
                          end_date=end_date)
 
+# ----- Attendance Export (CSV / JSONL stream) -----
+@app.route('/admin/attendance/export')
+def export_attendance():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return redirect('/login')
+    
+    start_date = request.args.get('start_date', (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'))
+    end_date = request.args.get('end_date', datetime.now().strftime('%Y-%m-%d'))
+    export_format = request.args.get('format', 'csv')
+    use_gzip = request.args.get('gzip') == '1'
+    
+    try:
+        datetime.strptime(start_date, '%Y-%m-%d')
+        datetime.strptime(end_date, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    if export_format not in exports.EXPORT_FORMATS:
+        return jsonify({'error': 'Format must be csv or jsonl'}), 400
+    
+    to_chunks, mimetype = exports.EXPORT_FORMATS[export_format]
+    
+    # The stream outlives the request, so it takes its own connection
+    # straight from the pool instead of the per-request one - checked out
+    # here, so a busy or unreachable database is a 503, not a cut-off file
+    try:
+        db = db_pool.get()
+    except (*DatabaseError, PoolTimeout) as err:
+        print(f"❌ Database Connection Error: {err}")
+        return jsonify({'error': 'Database unavailable'}), 503
+    try:
+        cursor = db.cursor()
+    except DatabaseError as err:
+        db.close(discard=True)
+        print(f"❌ Database Connection Error: {err}")
+        return jsonify({'error': 'Database unavailable'}), 503
+    stream = {'finished': False}
+    
+    def generate():
+        chunks = to_chunks(exports.attendance_batches(cursor, start_date, end_date))
+        if use_gzip:
+            chunks = exports.gzip_chunks(chunks)
+        yield from chunks
+        stream['finished'] = True
+    
+    def release():
+        # Runs when the response is closed, even if the stream never
+        # started. A client that disconnects mid-download leaves rows
+        # unread: mysql-connector won't close that cursor, and the
+        # connection can't be reused, so it is closed rather than pooled
+        try:
+            cursor.close()
+        except DatabaseError as err:
+            print(f"⚠️  Attendance export aborted, cursor not closed: {err}")
+        finally:
+            db.close(discard=not stream['finished'])
+    
+    filename = f"attendance_{start_date}_{end_date}.{export_format}"
+    if use_gzip:
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    
+    response = Response(generate(), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no',
+    })
+    response.call_on_close(release)
+    return response
+
 # ----- Salary Management -----
 @app.route('/admin/salary_management')
 def salary_management():
@@ -1137,28 +1714,48 @@ def salary_management():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get admin data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    admin = cursor.fetchone()
+    admin = current_user(db)
     
     # Get month from query params (default current month)
     month = request.args.get('month', datetime.now().strftime('%Y-%m'))
     
-    # Get all salary records for the month
-    cursor.execute("""
-        SELECT s.*, w.name, w.department, w.contact
+    limit = page_size(request.args.get('limit'))
+    
+    # Get salary records for the month, one page at a time
+    salaries = paginate(cursor, """
+        SELECT s.salary_id, s.worker_id, s.month, s.base_salary, s.extra_hours, s.bonus_amount,
+               s.total_salary, s.status, w.name, w.department, w.contact
         FROM SALARY s
         JOIN WORKER w ON s.worker_id = w.worker_id
-        WHERE s.month = %s
-        ORDER BY w.department, w.name
+        WHERE s.month = %s AND {keyset}
+    """, (month,),
+        keys=[('w.department', 'department', 'ASC'), ('w.name', 'name', 'ASC'),
+              ('s.salary_id', 'salary_id', 'ASC')],
+        token=request.args.get('after'), limit=limit)
+    
+    # Totals for the whole month
+    cursor.execute("""
+        SELECT 
+            COUNT(*) as record_count,
+            COALESCE(SUM(base_salary), 0) as total_base,
+            COALESCE(SUM(bonus_amount), 0) as total_bonus,
+            COALESCE(SUM(total_salary), 0) as total_salary,
+            COALESCE(AVG(COALESCE(total_salary, 0)), 0) as avg_salary,
+            COALESCE(SUM(status = 'Draft'), 0) as draft_count,
+            COALESCE(SUM(status = 'Finalized'), 0) as finalized_count,
+            COALESCE(SUM(status = 'Paid'), 0) as paid_count
+        FROM SALARY
+        WHERE month = %s
     """, (month,))
-    salaries = cursor.fetchall()
+    salary_summary = records.fetchone(cursor)
     
     # Get workers without salary records for this month
-    cursor.execute("""
-        SELECT w.*
+    workers_without_salary = paginate(cursor, """
+        SELECT w.worker_id, w.name, w.email, w.contact, w.address, w.department, w.role,
+               w.payment_method, w.status, w.joining_date
         FROM WORKER w
         WHERE w.role = 'worker' 
         AND w.status = 'Active'
@@ -1167,17 +1764,22 @@ def salary_management():
             WHERE s.worker_id = w.worker_id 
             AND s.month = %s
         )
-        ORDER BY w.department, w.name
-    """, (month,))
-    workers_without_salary = cursor.fetchall()
+        AND {keyset}
+    """, (month,),
+        keys=[('w.department', 'department', 'ASC'), ('w.name', 'name', 'ASC'),
+              ('w.worker_id', 'worker_id', 'ASC')],
+        token=request.args.get('missing_after'), limit=limit)
     
     cursor.close()
     db.close()
     
     return render_template('admin/salary_management.html',
                          admin=admin,
-                         salaries=salaries,
-                         workers_without_salary=workers_without_salary,
+                         salaries=salaries.items,
+                         next_token=salaries.next_token,
+                         salary_summary=salary_summary,
+                         workers_without_salary=workers_without_salary.items,
+                         missing_next_token=workers_without_salary.next_token,
                          current_month=month)
 
 # ----- Create Salary Record -----
@@ -1191,8 +1793,8 @@ def create_salary():
     base_salary = float(request.form.get('base_salary', 0))
     extra_hours = int(request.form.get('extra_hours', 0))
     
-    # Calculate bonus (50 per extra hour)
-    bonus_amount = extra_hours * 50
+    # Calculate bonus (per extra hour)
+    bonus_amount = extra_hours * PAYROLL_OVERTIME_RATE
     total_salary = base_salary + bonus_amount
     
     db = get_db_connection()
@@ -1208,9 +1810,10 @@ def create_salary():
         
         cursor.close()
         db.close()
+        bump_versions(worker_id)
         
         return redirect(f'/admin/salary_management?month={month}&success=true')
-    except mysql.connector.Error as err:
+    except DatabaseError as err:
         cursor.close()
         db.close()
         return redirect(f'/admin/salary_management?month={month}&error={str(err)}')
@@ -1231,13 +1834,57 @@ def update_salary_status(salary_id):
     
     cursor.execute("UPDATE SALARY SET status=%s WHERE salary_id=%s", 
                    (new_status, salary_id))
+    cursor.execute("SELECT worker_id FROM SALARY WHERE salary_id=%s", (salary_id,))
+    salary = cursor.fetchone()
     db.commit()
+    invalidate_counters(workers=salary or ())
     
     cursor.close()
     db.close()
     
     return jsonify({'success': True, 'new_status': new_status})
 
+# ----- Run Payroll For A Month -----
+@app.route('/admin/payroll/run', methods=['POST'])
+def run_payroll():
+    if 'user_id' not in session or session['role'] != 'admin':
+        return redirect('/login')
+    
+    month = request.form.get('month', datetime.now().strftime('%Y-%m'))
+    
+    db = get_db_connection()
+    try:
+        result = payroll.run_payroll(db, month)
+    except (ValueError, *DatabaseError) as err:
+        db.close()
+        return redirect(f'/admin/salary_management?month={month}&error={str(err)}')
+    db.close()
+    invalidate_counters()
+    
+    return redirect(f"/admin/salary_management?month={month}&success=payroll_run&created={result['created']}")
+
+# ----- Move A Whole Payroll Run To Finalized / Paid -----
+@app.route('/admin/payroll/<month>/status', methods=['POST'])
+def update_payroll_status(month):
+    if 'user_id' not in session or session['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    new_status = request.form.get('status')
+    
+    if new_status not in payroll.NEXT_STATUS:
+        return jsonify({'error': 'Invalid status'}), 400
+    
+    db = get_db_connection()
+    try:
+        updated = payroll.set_run_status(db, month, new_status)
+    except ValueError as err:
+        db.close()
+        return jsonify({'error': str(err)}), 400
+    db.close()
+    invalidate_counters()
+    
+    return jsonify({'success': True, 'new_status': new_status, 'updated': updated})
+
 # ----- Approve Substitutes -----
 @app.route('/admin/approve_substitutes')
 def approve_substitutes():
@@ -1245,16 +1892,16 @@ def approve_substitutes():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get admin data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    admin = cursor.fetchone()
+    admin = current_user(db)
     
     # Get all substitute requests that are accepted by substitute but need admin approval
     cursor.execute("""
         SELECT 
-            sr.*,
+            sr.sub_id, sr.requester_id, sr.substitute_id, sr.date, sr.hours, sr.reason,
+            sr.status, sr.admin_approved,
             r.name as requester_name,
             r.department as requester_dept,
             s.name as substitute_name,
@@ -1266,12 +1913,13 @@ def approve_substitutes():
         AND sr.admin_approved = FALSE
         ORDER BY sr.date DESC
     """)
-    pending_requests = cursor.fetchall()
+    pending_requests = records.fetchall(cursor)
     
     # Get recently approved requests
     cursor.execute("""
         SELECT 
-            sr.*,
+            sr.sub_id, sr.requester_id, sr.substitute_id, sr.date, sr.hours, sr.reason,
+            sr.status, sr.admin_approved,
             r.name as requester_name,
             s.name as substitute_name
         FROM SUBSTITUTE_REQUEST sr
@@ -1281,7 +1929,7 @@ def approve_substitutes():
         ORDER BY sr.date DESC
         LIMIT 10
     """)
-    approved_requests = cursor.fetchall()
+    approved_requests = records.fetchall(cursor)
     
     cursor.close()
     db.close()
@@ -1303,6 +1951,10 @@ def handle_substitute_approval(request_id, action):
     db = get_db_connection()
     cursor = db.cursor()
     
+    cursor.execute("SELECT requester_id, substitute_id FROM SUBSTITUTE_REQUEST WHERE sub_id = %s",
+                   (request_id,))
+    sub_request = cursor.fetchone()
+    
     if action == 'approve':
         cursor.execute("""
             UPDATE SUBSTITUTE_REQUEST 
@@ -1319,6 +1971,7 @@ def handle_substitute_approval(request_id, action):
     db.commit()
     cursor.close()
     db.close()
+    invalidate_counters(workers=sub_request or ())
     
     return redirect('/admin/approve_substitutes?success=true')
 # Add these routes after your existing admin routes
@@ -1330,15 +1983,15 @@ def admin_approve_leave():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get admin data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    admin = cursor.fetchone()
+    admin = current_user(db)
     
-    # Get all pending leave requests with worker details
-    cursor.execute("""
-        SELECT lr.*, 
+    # Get pending leave requests with worker details, one page at a time
+    pending = paginate(cursor, """
+        SELECT lr.leave_id, lr.worker_id, lr.leave_type, lr.start_date, lr.end_date, lr.reason,
+               lr.status, lr.applied_date, lr.approved_by, lr.approval_date, 
                w.name as worker_name, 
                w.department,
                w.worker_id,
@@ -1347,14 +2000,18 @@ def admin_approve_leave():
         FROM LEAVE_REQUEST lr
         JOIN WORKER w ON lr.worker_id = w.worker_id
         LEFT JOIN WORKER a ON lr.approved_by = a.worker_id
-        WHERE lr.status = 'Pending'
-        ORDER BY lr.applied_date DESC
-    """)
-    pending_requests = cursor.fetchall()
+        WHERE lr.status = 'Pending' AND {keyset}
+    """, (),
+        keys=[('lr.applied_date', 'applied_date', 'DESC'), ('lr.leave_id', 'leave_id', 'DESC')],
+        token=request.args.get('after'), limit=page_size(request.args.get('limit')))
+    
+    cursor.execute("SELECT COUNT(*) as total FROM LEAVE_REQUEST WHERE status = 'Pending'")
+    pending_total = records.fetchone(cursor)['total']
     
     # Get recently processed leave requests
     cursor.execute("""
-        SELECT lr.*, 
+        SELECT lr.leave_id, lr.worker_id, lr.leave_type, lr.start_date, lr.end_date, lr.reason,
+               lr.status, lr.applied_date, lr.approved_by, lr.approval_date, 
                w.name as worker_name, 
                w.department,
                a.name as approved_by_name
@@ -1365,14 +2022,16 @@ def admin_approve_leave():
         ORDER BY lr.approval_date DESC
         LIMIT 10
     """)
-    processed_requests = cursor.fetchall()
+    processed_requests = records.fetchall(cursor)
     
     cursor.close()
     db.close()
     
     return render_template('admin/approve_leave.html',
                          admin=admin,
-                         pending_requests=pending_requests,
+                         pending_requests=pending.items,
+                         next_token=pending.next_token,
+                         pending_total=pending_total,
                          processed_requests=processed_requests)
 
 # ----- Approve Leave Request -----
@@ -1390,16 +2049,28 @@ def approve_leave_request(leave_id):
             UPDATE LEAVE_REQUEST 
             SET status = 'Approved', 
                 approved_by = %s, 
-                approval_date = CURDATE()
+                approval_date = %s
             WHERE leave_id = %s
-        """, (session['user_id'], leave_id))
+        """, (session['user_id'], date.today(), leave_id))
+        
+        cursor.execute("""
+            SELECT lr.worker_id, w.department FROM LEAVE_REQUEST lr
+            JOIN WORKER w ON lr.worker_id = w.worker_id
+            WHERE lr.leave_id = %s
+        """, (leave_id,))
+        leave_worker = cursor.fetchone()
         
         db.commit()
         cursor.close()
         db.close()
+        if leave_worker:
+            invalidate_counters(leave_worker[1])
+            bump_versions(leave_worker[0], leave_worker[1])
+        else:
+            invalidate_counters()
         
         return redirect('/admin/approve_leave?success=approved')
-    except mysql.connector.Error as err:
+    except DatabaseError as err:
         cursor.close()
         db.close()
         return redirect(f'/admin/approve_leave?error={str(err)}')
@@ -1419,16 +2090,28 @@ def reject_leave_request(leave_id):
             UPDATE LEAVE_REQUEST 
             SET status = 'Rejected', 
                 approved_by = %s, 
-                approval_date = CURDATE()
+                approval_date = %s
             WHERE leave_id = %s
-        """, (session['user_id'], leave_id))
+        """, (session['user_id'], date.today(), leave_id))
+        
+        cursor.execute("""
+            SELECT lr.worker_id, w.department FROM LEAVE_REQUEST lr
+            JOIN WORKER w ON lr.worker_id = w.worker_id
+            WHERE lr.leave_id = %s
+        """, (leave_id,))
+        leave_worker = cursor.fetchone()
         
         db.commit()
         cursor.close()
         db.close()
+        if leave_worker:
+            invalidate_counters(leave_worker[1])
+            bump_versions(leave_worker[0], leave_worker[1])
+        else:
+            invalidate_counters()
         
         return redirect('/admin/approve_leave?success=rejected')
-    except mysql.connector.Error as err:
+    except DatabaseError as err:
         cursor.close()
         db.close()
         return redirect(f'/admin/approve_leave?error={str(err)}')
@@ -1442,97 +2125,31 @@ def manager_dashboard():
     if 'user_id' not in session or session['role'] != 'manager':
         return redirect('/login')
     
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    
     # Get manager data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    manager = cursor.fetchone()
+    manager = current_user()
     
     if not manager:
         session.clear()
         return redirect('/login')
     
-    # Get manager's team (workers in same department)
-    cursor.execute("""
-        SELECT COUNT(*) as team_count 
-        FROM WORKER 
-        WHERE department = %s AND role = 'worker' AND status = 'Active'
-    """, (manager['department'],))
-    team_stats = cursor.fetchone()
-    
-    # Get pending tasks in manager's department
-    cursor.execute("""
-        SELECT COUNT(*) as pending_tasks
-        FROM TASK t
-        JOIN WORKER w ON t.worker_id = w.worker_id
-        WHERE w.department = %s AND t.status IN ('Pending', 'In Progress')
-    """, (manager['department'],))
-    task_stats = cursor.fetchone()
-    
-    # Get today's attendance for team
-    cursor.execute("""
-        SELECT COUNT(DISTINCT w.worker_id) as today_present
-        FROM ATTENDANCE a
-        JOIN WORKER w ON a.worker_id = w.worker_id
-        WHERE w.department = %s AND a.date = CURDATE() AND a.attendance_value >= 0.5
-    """, (manager['department'],))
-    attendance_stats = cursor.fetchone()
-    
-    # Get pending leave requests
-    cursor.execute("""
-        SELECT COUNT(*) as pending_leaves
-        FROM LEAVE_REQUEST lr
-        JOIN WORKER w ON lr.worker_id = w.worker_id
-        WHERE w.department = %s AND lr.status = 'Pending'
-    """, (manager['department'],))
-    leave_stats = cursor.fetchone()
+    cached = not_modified(f"dept:{manager['department']}", f"worker:{session['user_id']}")
+    if cached:
+        return cached
     
-    # Recent team activity (tasks)
-    cursor.execute("""
-        SELECT w.name, t.task_details, t.status, t.deadline
-        FROM TASK t
-        JOIN WORKER w ON t.worker_id = w.worker_id
-        WHERE w.department = %s
-        ORDER BY t.deadline ASC
-        LIMIT 5
-    """, (manager['department'],))
-    recent_tasks = cursor.fetchall()
-    
-    # Today's attendance
-    cursor.execute("""
-        SELECT w.name, a.date, a.check_in, a.check_out
-        FROM ATTENDANCE a
-        JOIN WORKER w ON a.worker_id = w.worker_id
-        WHERE w.department = %s AND a.date = CURDATE()
-        ORDER BY a.check_in DESC
-        LIMIT 5
-    """, (manager['department'],))
-    today_attendance = cursor.fetchall()
+    db = get_db_connection()
+    cursor = db.cursor()
     
-    # Recent leave requests
-    cursor.execute("""
-        SELECT lr.*, w.name as worker_name
-        FROM LEAVE_REQUEST lr
-        JOIN WORKER w ON lr.worker_id = w.worker_id
-        WHERE w.department = %s
-        ORDER BY lr.applied_date DESC
-        LIMIT 5
-    """, (manager['department'],))
-    recent_leaves = cursor.fetchall()
+    # Team counters and recent activity in one round trip
+    today = date.today().strftime('%Y-%m-%d')
+    data = dashboard_data.manager_dashboard(cursor, manager['department'], today, counter_cache,
+                                            cache_version(f"dept:{manager['department']}"))
     
     cursor.close()
     db.close()
     
     return render_template('manager/dashboard.html',
                          manager=manager,
-                         team_count=team_stats['team_count'] if team_stats else 0,
-                         pending_tasks=task_stats['pending_tasks'] if task_stats else 0,
-                         today_present=attendance_stats['today_present'] if attendance_stats else 0,
-                         pending_leaves=leave_stats['pending_leaves'] if leave_stats else 0,
-                         recent_tasks=recent_tasks,
-                         today_attendance=today_attendance,
-                         recent_leaves=recent_leaves)
+                         **data)
 
 # ----- Manager Profile -----
 @app.route('/manager/profile')
@@ -1540,12 +2157,7 @@ def manager_profile():
     if 'user_id' not in session or session['role'] != 'manager':
         return redirect('/login')
     
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    manager = cursor.fetchone()
-    cursor.close()
-    db.close()
+    manager = current_user()
     
     return render_template('manager/profile.html', manager=manager)
 
@@ -1563,6 +2175,7 @@ def update_manager_profile():
     cursor.execute("UPDATE WORKER SET contact=%s, address=%s WHERE worker_id=%s", 
                    (contact, address, session['user_id']))
     db.commit()
+    invalidate_worker(session['user_id'])
     cursor.close()
     db.close()
     
@@ -1582,11 +2195,11 @@ def change_manager_password():
         return redirect('/manager/profile?error=password_mismatch')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Verify current password
     cursor.execute("SELECT password FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    manager = cursor.fetchone()
+    manager = records.fetchone(cursor)
     
     if manager['password'] != current_password:
         cursor.close()
@@ -1597,6 +2210,7 @@ def change_manager_password():
     cursor.execute("UPDATE WORKER SET password=%s WHERE worker_id=%s", 
                    (new_password, session['user_id']))
     db.commit()
+    invalidate_worker(session['user_id'])
     
     cursor.close()
     db.close()
@@ -1609,25 +2223,44 @@ def team_view():
     if 'user_id' not in session or session['role'] != 'manager':
         return redirect('/login')
     
-    db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
-    
     # Get manager data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    manager = cursor.fetchone()
+    manager = current_user()
+    
+    cached = not_modified(f"dept:{manager['department']}", f"worker:{session['user_id']}")
+    if cached:
+        return cached
     
-    # Get team members (workers in same department)
+    db = get_db_connection()
+    cursor = db.cursor()
+    
+    # Get team members (workers in same department) with their open tasks
+    # and today's attendance, each aggregated once for the whole team
+    today = date.today().strftime('%Y-%m-%d')
     cursor.execute("""
-        SELECT w.*, 
-               (SELECT COUNT(*) FROM TASK t WHERE t.worker_id = w.worker_id AND t.status != 'Completed') as pending_tasks,
-               (SELECT COUNT(*) FROM ATTENDANCE a WHERE a.worker_id = w.worker_id AND a.date = CURDATE() AND a.attendance_value >= 0.5) as today_attended
+        SELECT w.worker_id, w.name, w.email, w.contact, w.address, w.department, w.role,
+               w.payment_method, w.status, w.joining_date, 
+               COALESCE(t.pending_tasks, 0) as pending_tasks,
+               COALESCE(a.today_attended, 0) as today_attended
         FROM WORKER w
+        LEFT JOIN (
+            SELECT t.worker_id, COUNT(*) as pending_tasks
+            FROM TASK t
+            JOIN WORKER tw ON t.worker_id = tw.worker_id
+            WHERE tw.department = %s AND t.status != 'Completed'
+            GROUP BY t.worker_id
+        ) t ON t.worker_id = w.worker_id
+        LEFT JOIN (
+            SELECT worker_id, COUNT(*) as today_attended
+            FROM ATTENDANCE
+            WHERE date = %s AND attendance_value >= 0.5
+            GROUP BY worker_id
+        ) a ON a.worker_id = w.worker_id
         WHERE w.department = %s 
         AND w.role = 'worker'
         AND w.status = 'Active'
         ORDER BY w.name
-    """, (manager['department'],))
-    team_members = cursor.fetchall()
+    """, (manager['department'], today, manager['department']))
+    team_members = records.fetchall(cursor)
     
     # Get team statistics
     cursor.execute("""
@@ -1639,7 +2272,7 @@ def team_view():
         FROM WORKER
         WHERE department = %s AND role = 'worker'
     """, (manager['department'],))
-    team_stats = cursor.fetchone()
+    team_stats = records.fetchone(cursor)
     
     # Get department task statistics
     cursor.execute("""
@@ -1651,23 +2284,23 @@ def team_view():
         WHERE w.department = %s
         GROUP BY t.status
     """, (manager['department'],))
-    task_stats = cursor.fetchall()
+    task_stats = records.fetchall(cursor)
     
     # Get department attendance summary for current month
+    # (every rollup check-in is at least 0.5 attendance)
+    month_start, _ = month_bounds()
     cursor.execute("""
         SELECT 
-            DATE_FORMAT(a.date, '%Y-%m-%d') as date,
-            COUNT(*) as present_count
-        FROM ATTENDANCE a
-        JOIN WORKER w ON a.worker_id = w.worker_id
-        WHERE w.department = %s 
-        AND DATE_FORMAT(a.date, '%Y-%m') = DATE_FORMAT(CURDATE(), '%Y-%m')
-        AND a.attendance_value >= 0.5
-        GROUP BY a.date
-        ORDER BY a.date DESC
+            date,
+            SUM(checkins) as present_count
+        FROM ATTENDANCE_DEPT_DAY
+        WHERE department = %s 
+        AND date >= %s
+        GROUP BY date
+        ORDER BY date DESC
         LIMIT 10
-    """, (manager['department'],))
-    attendance_data = cursor.fetchall()
+    """, (manager['department'], month_start))
+    attendance_data = records.fetchall(cursor)
     
     cursor.close()
     db.close()
@@ -1686,11 +2319,10 @@ def assign_tasks():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get manager data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    manager = cursor.fetchone()
+    manager = current_user(db)
     
     # Get team members for task assignment
     cursor.execute("""
@@ -1701,17 +2333,18 @@ def assign_tasks():
         AND status = 'Active'
         ORDER BY name
     """, (manager['department'],))
-    team_members = cursor.fetchall()
+    team_members = records.fetchall(cursor)
     
     # Get existing tasks for manager's team
     cursor.execute("""
-        SELECT t.*, w.name as worker_name
+        SELECT t.task_id, t.worker_id, t.task_details, t.deadline, t.status, t.assigned_date,
+               w.name as worker_name
         FROM TASK t
         JOIN WORKER w ON t.worker_id = w.worker_id
         WHERE w.department = %s
         ORDER BY t.deadline ASC
     """, (manager['department'],))
-    existing_tasks = cursor.fetchall()
+    existing_tasks = records.fetchall(cursor)
     
     cursor.close()
     db.close()
@@ -1739,29 +2372,28 @@ def assign_new_task():
     
     try:
         # Verify worker is in manager's department
-        cursor.execute("SELECT department FROM WORKER WHERE worker_id=%s", (worker_id,))
-        worker = cursor.fetchone()
-        
-        cursor.execute("SELECT department FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-        manager = cursor.fetchone()
+        worker = get_worker(worker_id, db)
+        manager = current_user(db)
         
-        if not worker or worker[0] != manager[0]:
+        if not worker or worker['department'] != manager['department']:
             cursor.close()
             db.close()
             return redirect('/manager/assign_tasks?error=unauthorized')
         
         sql = """
         INSERT INTO TASK (worker_id, task_details, deadline, status, assigned_date)
-        VALUES (%s, %s, %s, 'Pending', CURDATE())
+        VALUES (%s, %s, %s, 'Pending', %s)
         """
-        cursor.execute(sql, (worker_id, task_details, deadline))
+        cursor.execute(sql, (worker_id, task_details, deadline, date.today()))
         db.commit()
+        invalidate_counters(manager['department'])
+        bump_versions(worker_id, manager['department'])
         
         cursor.close()
         db.close()
         
         return redirect('/manager/assign_tasks?success=true')
-    except mysql.connector.Error as err:
+    except DatabaseError as err:
         cursor.close()
         db.close()
         return redirect(f'/manager/assign_tasks?error={str(err)}')
@@ -1783,24 +2415,24 @@ def update_task_status_manager(task_id):
     try:
         # Verify task belongs to manager's department
         cursor.execute("""
-            SELECT w.department 
+            SELECT w.department, t.worker_id 
             FROM TASK t
             JOIN WORKER w ON t.worker_id = w.worker_id
             WHERE t.task_id = %s
         """, (task_id,))
         task_dept = cursor.fetchone()
+        manager = current_user(db)
         
-        cursor.execute("SELECT department FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-        manager_dept = cursor.fetchone()
-        
-        if task_dept and manager_dept and task_dept[0] == manager_dept[0]:
+        if task_dept and manager and task_dept[0] == manager['department']:
             cursor.execute("UPDATE TASK SET status=%s WHERE task_id=%s", (status, task_id))
             db.commit()
+            invalidate_counters(manager['department'])
+            bump_versions(task_dept[1], manager['department'])
             success = True
         else:
             success = False
     
-    except mysql.connector.Error:
+    except DatabaseError:
         success = False
     
     cursor.close()
@@ -1823,24 +2455,24 @@ def delete_task_manager(task_id):
     try:
         # Verify task belongs to manager's department
         cursor.execute("""
-            SELECT w.department 
+            SELECT w.department, t.worker_id 
             FROM TASK t
             JOIN WORKER w ON t.worker_id = w.worker_id
             WHERE t.task_id = %s
         """, (task_id,))
         task_dept = cursor.fetchone()
+        manager = current_user(db)
         
-        cursor.execute("SELECT department FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-        manager_dept = cursor.fetchone()
-        
-        if task_dept and manager_dept and task_dept[0] == manager_dept[0]:
+        if task_dept and manager and task_dept[0] == manager['department']:
             cursor.execute("DELETE FROM TASK WHERE task_id=%s", (task_id,))
             db.commit()
+            invalidate_counters(manager['department'])
+            bump_versions(task_dept[1], manager['department'])
             success = True
         else:
             success = False
     
-    except mysql.connector.Error:
+    except DatabaseError:
         success = False
     
     cursor.close()
@@ -1860,32 +2492,33 @@ def manager_feedback():
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     # Get manager data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    manager = cursor.fetchone()
+    manager = current_user(db)
     
     # Get team members for feedback
     cursor.execute("""
-        SELECT w.*
+        SELECT w.worker_id, w.name, w.email, w.contact, w.address, w.department, w.role,
+               w.payment_method, w.status, w.joining_date
         FROM WORKER w
         WHERE w.department = %s 
         AND w.role = 'worker'
         AND w.status = 'Active'
         ORDER BY w.name
     """, (manager['department'],))
-    team_members = cursor.fetchall()
+    team_members = records.fetchall(cursor)
     
     # Get existing performance feedback
     cursor.execute("""
-        SELECT p.*, w.name as worker_name
+        SELECT p.performance_id, p.worker_id, p.month, p.attendance_percentage, p.total_hours,
+               p.manager_feedback, w.name as worker_name
         FROM PERFORMANCE p
         JOIN WORKER w ON p.worker_id = w.worker_id
         WHERE w.department = %s
         ORDER BY p.month DESC
     """, (manager['department'],))
-    existing_feedback = cursor.fetchall()
+    existing_feedback = records.fetchall(cursor)
     
     # Get current month and year for default selection
     current_month = datetime.now().strftime('%Y-%m')
@@ -1913,15 +2546,12 @@ def submit_feedback():
         return redirect('/manager/feedback?error=missing_fields')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True)
+    cursor = db.cursor()
     
     try:
         # Verify worker is in manager's department
-        cursor.execute("SELECT department FROM WORKER WHERE worker_id=%s", (worker_id,))
-        worker = cursor.fetchone()
-        
-        cursor.execute("SELECT department FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-        manager = cursor.fetchone()
+        worker = get_worker(worker_id, db)
+        manager = current_user(db)
         
         if not worker or worker['department'] != manager['department']:
             cursor.close()
@@ -1930,10 +2560,12 @@ def submit_feedback():
         
         # Check if performance record exists for this month
         cursor.execute("""
-            SELECT * FROM PERFORMANCE 
+            SELECT performance_id, worker_id, month, attendance_percentage, total_hours,
+                   manager_feedback
+            FROM PERFORMANCE 
             WHERE worker_id = %s AND month = %s
         """, (worker_id, month))
-        existing = cursor.fetchone()
+        existing = records.fetchone(cursor)
         
         if existing:
             # Update existing record
@@ -1949,11 +2581,11 @@ def submit_feedback():
                 SELECT 
                     AVG(attendance_value) * 100 as attendance_percentage,
                     SUM(working_hours) as total_hours
-                FROM ATTENDANCE
+                FROM ATTENDANCE_WORKER_DAY
                 WHERE worker_id = %s 
-                AND DATE_FORMAT(date, '%Y-%m') = %s
+                AND month = %s
             """, (worker_id, month))
-            stats = cursor.fetchone()
+            stats = records.fetchone(cursor)
             
             sql = """
             INSERT INTO PERFORMANCE (worker_id, month, attendance_percentage, total_hours, manager_feedback)
@@ -1967,9 +2599,10 @@ def submit_feedback():
         db.commit()
         cursor.close()
         db.close()
+        bump_versions(worker_id)
         
         return redirect('/manager/feedback?success=true')
-    except mysql.connector.Error as err:
+    except DatabaseError as err:
         cursor.close()
         db.close()
         return redirect(f'/manager/feedback?error={str(err)}')
@@ -1981,15 +2614,13 @@ def manager_view_worker(worker_id):
         return redirect('/login')
     
     db = get_db_connection()
-    cursor = db.cursor(dictionary=True, buffered=True)
+    cursor = db.cursor(buffered=True)
     
     # Get manager data
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (session['user_id'],))
-    manager = cursor.fetchone()
+    manager = current_user(db)
     
     # Get worker details
-    cursor.execute("SELECT * FROM WORKER WHERE worker_id=%s", (worker_id,))
-    worker = cursor.fetchone()
+    worker = get_worker(worker_id, db)
     
     # Verify worker is in manager's department
     if not worker or worker['department'] != manager['department']:
@@ -1999,37 +2630,44 @@ def manager_view_worker(worker_id):
     
     # Get worker attendance (last 30 days)
     cursor.execute("""
-        SELECT * FROM ATTENDANCE 
+        SELECT attendance_id, worker_id, date, check_in, check_out, attendance_value,
+               working_hours
+        FROM ATTENDANCE 
         WHERE worker_id = %s 
         ORDER BY date DESC 
         LIMIT 30
     """, (worker_id,))
-    attendance = cursor.fetchall()
+    attendance = records.fetchall(cursor)
     
     # Get worker tasks
     cursor.execute("""
-        SELECT * FROM TASK 
+        SELECT task_id, worker_id, task_details, deadline, status, assigned_date
+        FROM TASK 
         WHERE worker_id = %s 
         ORDER BY deadline
     """, (worker_id,))
-    tasks = cursor.fetchall()
+    tasks = records.fetchall(cursor)
     
     # Get worker performance
     cursor.execute("""
-        SELECT * FROM PERFORMANCE 
+        SELECT performance_id, worker_id, month, attendance_percentage, total_hours,
+               manager_feedback
+        FROM PERFORMANCE 
         WHERE worker_id = %s 
         ORDER BY month DESC
     """, (worker_id,))
-    performances = cursor.fetchall()
+    performances = records.fetchall(cursor)
     
     # Get worker leave requests
     cursor.execute("""
-        SELECT * FROM LEAVE_REQUEST 
+        SELECT leave_id, worker_id, leave_type, start_date, end_date, reason, status,
+               applied_date, approved_by, approval_date
+        FROM LEAVE_REQUEST 
         WHERE worker_id = %s 
         ORDER BY start_date DESC
         LIMIT 10
     """, (worker_id,))
-    leave_requests = cursor.fetchall()
+    leave_requests = records.fetchall(cursor)
     
     # ADD THIS SECTION: Get team statistics
     cursor.execute("""
@@ -2041,7 +2679,7 @@ def manager_view_worker(worker_id):
         FROM WORKER
         WHERE department = %s AND role = 'worker'
     """, (manager['department'],))
-    team_stats = cursor.fetchone()
+    team_stats = records.fetchone(cursor)
     
     cursor.close()
     db.close()
@@ -2054,14 +2692,53 @@ def manager_view_worker(worker_id):
                          performances=performances,
                          leave_requests=leave_requests,
                          team_stats=team_stats)  
+
+# ============ APP FACTORY ============
+def create_app(worker_slot=None):
+    """The app, ready to serve requests in this process
+
+    `python app.py` calls it once; server.py calls it in every preforked
+    worker after the fork, with the worker's slot (0..workers-1).
+    """
+    if INGEST_ENABLED and ingestor is None:
+        start_ingestor(worker_slot)
+    return app
+
+def shutdown():
+    """Flush the ingest queue and close idle connections (a worker exiting)"""
+    if ingestor:
+        ingestor.stop()
+    db_pool.dispose()
+
+def reset_after_fork():
+    """A forked child starts with no connections, cached rows or ingest thread of its parent's"""
+    global ingestor
+    db_pool.forget()
+    worker_cache.clear()
+    counter_cache.clear()
+    ingestor = None
+
+os.register_at_fork(after_in_child=reset_after_fork)
+
 # ============ RUN APP ============
 if __name__ == '__main__':
+    create_app()
     print("\n" + "="*60)
     print(" SMART LABOUR MANAGEMENT SYSTEM")
     print("="*60)
     
     print(f"\n📁 Templates folder: {TEMPLATES_DIR}")
     print(f"📁 Static folder: {STATIC_DIR}")
+    print(f"🗄️  Database: {DB_BACKEND} "
+          f"({storage.sqlite_path(SQLITE_PATH) if DB_BACKEND == 'sqlite' else DB_CONFIG['database']})")
+    built = static_assets.stats()
+    print(f"🎨 Static assets: {built['assets']} fingerprinted, "
+          f"{built['precompressed']['gzip']} gzip / {built['precompressed']['br']} brotli variants"
+          if built['assets'] else "🎨 Static assets: not built, serving /static/ (python assets.py build)")
+    if PRODUCTION_MODE:
+        compiled = template_timings.summary(app.jinja_env)
+        print(f"⚡ Production mode: {len(compiled['templates'])} templates precompiled "
+              f"in {compiled['compile_total_ms']:.0f}ms")
     
     print("\n🎨 Custom Jinja2 Filters Loaded:")
     print("   • currency: Format as ৳1,234.56")
@@ -2111,10 +2788,24 @@ if __name__ == '__main__':
     print("   • /worker/task/<id>                 - Get task details")
     print("   • /admin/worker/<id>/update-status  - Update worker status")
     print("   • /admin/salary/<id>/update-status  - Update salary status")
+    print("   • /admin/payroll/run                - Run payroll for a month")
+    print("   • /admin/payroll/<month>/status     - Finalize / pay a whole month")
+    print("   • /admin/attendance/export          - Stream attendance as CSV/JSONL")
+    print("   • /admin/pool-stats                 - DB connection pool stats")
+    print("   • /admin/cache-stats                - Worker/counter cache hit/miss stats")
+    print("   • /admin/ingest-stats               - Write-behind attendance queue stats")
+    print("   • /admin/sql-stats                  - Heaviest SQL statements, N+1 reports")
+    print("   • /admin/profiler                   - Request profiler settings and recent profiles")
+    print("   • /admin/template-stats             - Template compile and render times")
+    print("   • /assets/<fingerprinted path>      - Built static files, immutable + precompressed")
+    print("   • /admin/compression-stats          - Response compression ratio and CPU per route")
+    print("   • /metrics                          - Prometheus metrics (admin or METRICS_TOKEN)")
+    print("   • /api/kiosk/attendance/sync        - Batch attendance sync for kiosks")
+    print("   • /api/v1                           - Read-only JSON API (fields=, after=, shape=rows)")
     print("   • /manager/task/<id>/update-status  - Update task (manager)")
     
     print("\n" + "="*60)
-    print("🌐 Server starting on http://localhost:5000")
+    print("🌐 Server starting on http://localhost:5000 (development server; production: python server.py)")
     print("="*60 + "\n")
     
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    app.run(debug=not PRODUCTION_MODE, port=5000)
\ No newline at end of file
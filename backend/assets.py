@@ -0,0 +1,236 @@
+"""
+Fingerprinted, precompressed static assets.
+
+Flask's static handler serves static/css/style.css under the same URL
+every release, so browsers revalidate it on every page. The build step
+copies every file under static/ into ASSET_BUILD_DIR with a content hash
+in its name, plus .gz and .br variants when they are worth it:
+
+    python assets.py build     # after changing anything under static/
+    python assets.py clean     # drop files the current manifest no longer names
+
+    static/css/style.css -> static/build/css/style.3f2a9c01b7de.css
+                                         css/style.3f2a9c01b7de.css.gz
+                                         css/style.3f2a9c01b7de.css.br
+                            static/build/manifest.json
+
+Templates link through {{ asset_url('css/style.css') }}, which gives the
+fingerprinted /assets/... URL from the manifest, or the plain /static/
+URL for a file the manifest doesn't have (not built yet, or edited since
+the last build while not in PRODUCTION_MODE). A fingerprinted URL never
+changes content, so /assets/ answers with a one-year immutable
+Cache-Control and an ETag, and sends the best precompressed variant the
+client accepts, or the plain file when there is none.
+
+Brotli variants need the optional `brotli` package (pip install
+Brotli==1.1.0, not in requirements.txt); without it the build writes
+gzip only. A build leaves the files of earlier builds in place so pages
+rendered before a deploy can still load their assets; run clean later.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:          # optional: gzip variants only
+    brotli = None
+
+MANIFEST = 'manifest.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Preferred first when the client accepts both equally
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+# Already compressed, a variant would not be smaller
+SKIP_COMPRESS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.woff', '.woff2',
+                 '.zip', '.gz', '.br'}
+
+# A variant is only kept when it saves at least this much
+MIN_SAVING = 0.05
+
+
+def fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _compressors():
+    if brotli is not None:
+        yield 'br', lambda data: brotli.compress(data, quality=11)
+    yield 'gzip', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ============ BUILD ============
+
+def build(static_dir, build_dir):
+    """Fingerprint and precompress everything under static_dir; returns the manifest"""
+    build_dir = os.path.abspath(build_dir)
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs
+                         if not d.startswith('.') and os.path.abspath(os.path.join(root, d)) != build_dir)
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            source = os.path.join(root, name)
+            rel = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            digest = fingerprint(data)
+            stem, ext = os.path.splitext(rel)
+            target = f"{stem}.{digest}{ext}"
+            out = os.path.join(build_dir, target)
+            if not os.path.exists(out):
+                _write(out, data)
+
+            variants = {}
+            if data and ext.lower() not in SKIP_COMPRESS:
+                for encoding, compress in _compressors():
+                    blob = compress(data)
+                    if len(blob) <= len(data) * (1 - MIN_SAVING):
+                        _write(out + ENCODINGS[encoding], blob)
+                        variants[encoding] = len(blob)
+            manifest[rel] = {'path': target, 'etag': digest, 'size': len(data), 'encodings': variants}
+
+    _write(os.path.join(build_dir, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    return manifest
+
+
+def clean(build_dir):
+    """Remove built files the current manifest doesn't reference; returns how many"""
+    with open(os.path.join(build_dir, MANIFEST)) as f:
+        manifest = json.load(f)
+    keep = {MANIFEST}
+    for entry in manifest.values():
+        keep.add(entry['path'])
+        keep.update(entry['path'] + ENCODINGS[e] for e in entry['encodings'])
+    removed = 0
+    for root, dirs, files in os.walk(build_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.relpath(path, build_dir).replace(os.sep, '/') not in keep:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+# ============ SERVE ============
+
+class Assets:
+    """Manifest lookups for asset_url() and the /assets/ route"""
+
+    def __init__(self, static_dir, build_dir, check_sources=False):
+        self.static_dir = static_dir
+        self.build_dir = build_dir
+        # Outside production, notice rebuilds and files edited since the build
+        self.check_sources = check_sources
+        self._manifest = {}
+        self._served = {}          # fingerprinted path -> manifest entry
+        self._mtime = None
+        self.load()
+
+    def load(self):
+        path = os.path.join(self.build_dir, MANIFEST)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            mtime, manifest = None, {}
+        self._manifest = manifest
+        self._served = {entry['path']: entry for entry in manifest.values()}
+        self._mtime = mtime
+
+    def fingerprinted(self, filename):
+        """Built path for a static/ filename, or None to serve it from /static/"""
+        if self.check_sources:
+            try:
+                mtime = os.path.getmtime(os.path.join(self.build_dir, MANIFEST))
+            except OSError:
+                mtime = None
+            if mtime != self._mtime:
+                self.load()
+        entry = self._manifest.get(filename)
+        if entry is None:
+            return None
+        if self.check_sources:
+            try:
+                if os.path.getmtime(os.path.join(self.static_dir, filename)) > self._mtime:
+                    return None
+            except OSError:
+                return None
+        return entry['path']
+
+    def lookup(self, path, accept_encodings):
+        """(file, content encoding or None, etag, mimetype) for a built path, or None
+
+        `accept_encodings` is werkzeug's request.accept_encodings.
+        """
+        entry = self._served.get(path)
+        if entry is None:
+            return None
+        best, best_quality = None, 0
+        for encoding in ENCODINGS:
+            quality = accept_encodings.quality(encoding)
+            if encoding in entry['encodings'] and quality > best_quality:
+                best, best_quality = encoding, quality
+        file = os.path.join(self.build_dir, *path.split('/'))
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if best is None:
+            return file, None, entry['etag'], mimetype
+        # Each representation gets its own ETag
+        return file + ENCODINGS[best], best, f"{entry['etag']}-{best}", mimetype
+
+    def stats(self):
+        return {
+            'build_dir': self.build_dir,
+            'assets': len(self._manifest),
+            'precompressed': {encoding: sum(encoding in e['encodings'] for e in self._manifest.values())
+                              for encoding in ENCODINGS},
+            'brotli_available': brotli is not None,
+        }
+
+
+def main(argv=None):
+    from config import ASSET_BUILD_DIR
+    static_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+    build_dir = os.path.join(static_dir, ASSET_BUILD_DIR)
+
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed static assets")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help=f"fingerprint and compress static/ into static/{ASSET_BUILD_DIR}")
+    sub.add_parser('clean', help="remove files from earlier builds")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        manifest = build(static_dir, build_dir)
+        for rel, entry in sorted(manifest.items()):
+            sizes = ", ".join(f"{enc} {size:,}B" for enc, size in entry['encodings'].items())
+            print(f"   • {rel} -> {entry['path']} ({entry['size']:,}B{', ' + sizes if sizes else ''})")
+        if brotli is None:
+            print("⚠️  brotli is not installed, wrote gzip variants only")
+        print(f"✅ Built {len(manifest)} assets into {build_dir}")
+    else:
+        try:
+            removed = clean(build_dir)
+        except OSError:
+            print(f"❌ No manifest in {build_dir}, run 'python assets.py build' first")
+            return 1
+        print(f"✅ Removed {removed} old files")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
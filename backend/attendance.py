@@ -0,0 +1,120 @@
+"""
+Attendance writes: one atomic statement each for check-in and check-out.
+
+ATTENDANCE has a unique (worker_id, date) key (migration 0004), so:
+
+check-in   an INSERT that skips the key conflict (skip_duplicates) -
+           the first submit of the day creates the 0.5 row, any repeat
+           (double click, two tabs, a retrying kiosk) hits the key and
+           changes nothing. Any other error still raises.
+check-out  a single UPDATE that only matches a row with no check-out yet
+           and computes working_hours from check_in in SQL. Repeats
+           match nothing, so the first check-out time is kept.
+
+Both return whether they changed a row. The rollup tables are kept in
+step by triggers on ATTENDANCE (see rollups.py), so a check-in or a
+check-out is one round trip.
+
+check_in_many / check_out_many apply a whole batch of events with one
+multi-row statement each, with the same idempotent semantics. They are
+used by the write-behind ingestor (ingest.py).
+
+The statements differ per backend (storage.py) only in the conflict
+clause, the time arithmetic and MySQL's UPDATE ... JOIN vs SQLite's
+UPDATE ... FROM.
+"""
+from storage import dialect_of, hours_between, skip_duplicates
+
+ATTENDANCE_KEY = ['worker_id', 'date']
+
+CHECK_IN_SQL = {
+    dialect: f"""
+    INSERT INTO ATTENDANCE (worker_id, date, check_in, attendance_value)
+    VALUES (%s, %s, %s, 0.5)
+    {skip_duplicates(dialect, ATTENDANCE_KEY)}
+"""
+    for dialect in ('mysql', 'sqlite')
+}
+
+# Hours wrap around midnight the same way the old timedelta.seconds did
+CHECK_OUT_SQL = {
+    dialect: f"""
+    UPDATE ATTENDANCE
+    SET check_out = %s,
+        attendance_value = 1.0,
+        working_hours = {hours_between('%s', 'check_in', dialect)}
+    WHERE worker_id = %s AND date = %s AND check_out IS NULL
+"""
+    for dialect in ('mysql', 'sqlite')
+}
+
+
+def check_in(cursor, worker_id, day, time):
+    """Record a check-in; False if the worker already checked in on `day`"""
+    cursor.execute(CHECK_IN_SQL[dialect_of(cursor)], (worker_id, day, time))
+    return cursor.rowcount == 1
+
+
+def check_out(cursor, worker_id, day, time):
+    """Record a check-out; False if there is no open check-in on `day`"""
+    cursor.execute(CHECK_OUT_SQL[dialect_of(cursor)], (time, time, worker_id, day))
+    return cursor.rowcount == 1
+
+
+def day_status(cursor, worker_id, day):
+    """'absent', 'checked_in' or 'checked_out' - only needed to explain a no-op"""
+    cursor.execute("SELECT check_out FROM ATTENDANCE WHERE worker_id = %s AND date = %s",
+                   (worker_id, day))
+    row = cursor.fetchone()
+    if row is None:
+        return 'absent'
+    check_out = row['check_out'] if isinstance(row, dict) else row[0]
+    return 'checked_in' if check_out is None else 'checked_out'
+
+
+def check_in_many(cursor, events):
+    """Multi-row check-in for [(worker_id, day, time)]; returns rows inserted"""
+    if not events:
+        return 0
+    cursor.execute(
+        "INSERT INTO ATTENDANCE (worker_id, date, check_in, attendance_value) VALUES "
+        + ", ".join(["(%s, %s, %s, 0.5)"] * len(events))
+        + " " + skip_duplicates(dialect_of(cursor), ATTENDANCE_KEY),
+        tuple(value for event in events for value in event))
+    return cursor.rowcount
+
+
+def check_out_many(cursor, events):
+    """Multi-row check-out for [(worker_id, day, time)]; returns rows updated
+
+    If a worker has several check-outs for the same day in one batch only
+    one of them is applied, like repeated single check-outs.
+    """
+    if not events:
+        return 0
+    params = tuple(value for event in events for value in event)
+    if dialect_of(cursor) == 'sqlite':
+        # One check-out per (worker_id, date), like the MySQL JOIN
+        rows = " UNION ALL ".join(["SELECT %s as worker_id, %s as date, %s as check_out"] * len(events))
+        cursor.execute(f"""
+            UPDATE ATTENDANCE
+            SET check_out = v.check_out,
+                attendance_value = 1.0,
+                working_hours = {hours_between('v.check_out', 'ATTENDANCE.check_in', 'sqlite')}
+            FROM (SELECT worker_id, date, MIN(check_out) as check_out FROM ({rows}) GROUP BY worker_id, date) v
+            WHERE v.worker_id = ATTENDANCE.worker_id AND v.date = ATTENDANCE.date
+              AND ATTENDANCE.check_out IS NULL
+        """, params)
+        return cursor.rowcount
+
+    rows = " UNION ALL ".join(
+        ["SELECT %s as worker_id, CAST(%s AS DATE) as date, CAST(%s AS TIME) as check_out"] * len(events))
+    cursor.execute(f"""
+        UPDATE ATTENDANCE a
+        JOIN ({rows}) v ON v.worker_id = a.worker_id AND v.date = a.date
+        SET a.check_out = v.check_out,
+            a.attendance_value = 1.0,
+            a.working_hours = {hours_between('v.check_out', 'a.check_in', 'mysql')}
+        WHERE a.check_out IS NULL
+    """, params)
+    return cursor.rowcount
@@ -0,0 +1,147 @@
+"""
+Check-in / check-out under concurrent double submits.
+
+Many threads check the same workers in and out at once, every worker
+being submitted by several threads (double clicks, two tabs). Runs the
+old SELECT-then-write path and the atomic statements from attendance.py
+and prints latency, duplicate ATTENDANCE rows and rollup drift.
+
+The old path is run with the (worker_id, date) key dropped, as it was
+before migration 0004 - with the key in place its races turn into
+IntegrityErrors instead of duplicate rows.
+
+    python benchmarks/bench_attendance_writes.py --workers 500 --threads 32 --submits 3
+"""
+import argparse
+import threading
+import time
+from datetime import date, datetime, timedelta
+from statistics import median
+
+from common import connect, fresh_database, percentile
+
+import attendance
+
+
+def old_check_in(cursor, worker_id, day, now):
+    cursor.execute("SELECT * FROM ATTENDANCE WHERE worker_id=%s AND date=%s", (worker_id, day))
+    if cursor.fetchone():
+        return False
+    cursor.execute("""
+        INSERT INTO ATTENDANCE (worker_id, date, check_in, attendance_value)
+        VALUES (%s, %s, %s, 0.5)
+    """, (worker_id, day, now))
+    return True
+
+
+def old_check_out(cursor, worker_id, day, now):
+    cursor.execute("SELECT check_in FROM ATTENDANCE WHERE worker_id=%s AND date=%s", (worker_id, day))
+    row = cursor.fetchone()
+    cursor.fetchall()
+    if not row:
+        return False
+    check_in = datetime.strptime(str(row[0]).rjust(8, '0'), '%H:%M:%S')
+    hours = (datetime.strptime(now, '%H:%M:%S') - check_in).seconds / 3600
+    cursor.execute("""
+        UPDATE ATTENDANCE SET check_out=%s, attendance_value=1.0, working_hours=%s
+        WHERE worker_id=%s AND date=%s
+    """, (now, round(hours, 2), worker_id, day))
+    return True
+
+
+PATHS = {
+    'before': (old_check_in, old_check_out),
+    'after': (attendance.check_in, attendance.check_out),
+}
+
+
+def hammer(path, worker_ids, threads, submits):
+    """Every worker checks in then out `submits` times, spread over `threads`"""
+    check_in, check_out = PATHS[path]
+    day = date.today().strftime('%Y-%m-%d')
+    jobs = [worker_id for worker_id in worker_ids for _ in range(submits)]
+    samples = {'check_in': [], 'check_out': []}
+    errors = [0]
+    lock = threading.Lock()
+
+    def run(slice_):
+        db = connect()
+        cursor = db.cursor()
+        local = {'check_in': [], 'check_out': []}
+        for name, fn, clock in (('check_in', check_in, '08:00:00'), ('check_out', check_out, '17:30:00')):
+            for worker_id in slice_:
+                started = time.perf_counter()
+                try:
+                    fn(cursor, worker_id, day, clock)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    with lock:
+                        errors[0] += 1
+                local[name].append((time.perf_counter() - started) * 1000)
+        cursor.close()
+        db.close()
+        with lock:
+            for name in samples:
+                samples[name].extend(local[name])
+
+    workers = [threading.Thread(target=run, args=(jobs[i::threads],)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return samples, errors[0], time.perf_counter() - started
+
+
+def verify(db):
+    cursor = db.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM (
+            SELECT worker_id, date FROM ATTENDANCE GROUP BY worker_id, date HAVING COUNT(*) > 1
+        ) d
+    """)
+    duplicates = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM ATTENDANCE")
+    rows = cursor.fetchone()[0]
+    cursor.execute("SELECT COALESCE(SUM(checkins), 0) FROM ATTENDANCE_DEPT_DAY")
+    checkins = cursor.fetchone()[0]
+    cursor.close()
+    return duplicates, rows, checkins
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--submits', type=int, default=3, help="times each worker submits each form")
+    args = parser.parse_args()
+
+    print(f"{'path':<7} {'ops/s':>8} {'in p50':>8} {'in p95':>8} {'out p50':>8} {'out p95':>8} "
+          f"{'errors':>7} {'rows':>6} {'dupes':>6} {'rollup':>7}")
+    for path in ('before', 'after'):
+        db = fresh_database()
+        cursor = db.cursor()
+        cursor.executemany("""
+            INSERT INTO WORKER (name, email, password, department, role, status, joining_date)
+            VALUES (%s, %s, 'bench', 'Construction', 'worker', 'Active', %s)
+        """, [(f"Worker {i}", f"worker{i}@bench.local", date.today() - timedelta(days=30))
+              for i in range(args.workers)])
+        if path == 'before':
+            cursor.execute("ALTER TABLE ATTENDANCE DROP INDEX uq_attendance_worker_date")
+        db.commit()
+        cursor.execute("SELECT worker_id FROM WORKER")
+        worker_ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+
+        samples, errors, elapsed = hammer(path, worker_ids, args.threads, args.submits)
+        duplicates, rows, checkins = verify(db)
+        ops = (len(samples['check_in']) + len(samples['check_out'])) / elapsed
+        print(f"{path:<7} {ops:>8.0f} {median(samples['check_in']):>6.1f}ms {percentile(samples['check_in'], 95):>6.1f}ms "
+              f"{median(samples['check_out']):>6.1f}ms {percentile(samples['check_out'], 95):>6.1f}ms "
+              f"{errors:>7} {rows:>6} {duplicates:>6} {checkins - rows:>+7}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
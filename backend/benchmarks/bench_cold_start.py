@@ -0,0 +1,134 @@
+"""
+First-request latency of a fresh process, with and without precompiled templates.
+
+Seeds the scratch database once, then starts a new Python process per
+run, imports the app and requests every page from bench_routes.py once
+(the cold request) and then --repeat more times (warm). Runs:
+
+    lazy          templates compiled on first render, no bytecode cache
+    cold cache    PRODUCTION_MODE, precompiled from source at startup
+    warm cache    PRODUCTION_MODE, precompiled from the bytecode cache
+                  the previous run left on disk (a second process)
+
+and reports import time, the cold/warm latency per page and their ratio.
+
+    python benchmarks/bench_cold_start.py --backend sqlite
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from statistics import median
+
+from bench_routes import build_routes, login, pick_ids
+from common import (BACKEND_DIR, BENCH_DATABASE, BENCH_SQLITE_PATH, connect, fresh_database,
+                    fresh_sqlite, seed)
+
+import config
+import storage
+
+CACHE_DIR = os.path.join(BACKEND_DIR, 'template_cache_bench')
+
+RUNS = [
+    ('lazy', {'PRODUCTION_MODE': False, 'TEMPLATE_CACHE_DIR': None}),
+    ('cold cache', {'PRODUCTION_MODE': True, 'TEMPLATE_CACHE_DIR': CACHE_DIR}),
+    ('warm cache', {'PRODUCTION_MODE': True, 'TEMPLATE_CACHE_DIR': CACHE_DIR}),
+]
+
+
+def child(settings, ids, repeat):
+    """Runs in the fresh process: import the app, time every page cold then warm"""
+    for key, value in settings.items():
+        setattr(config, key, value)
+    config.DB_CONFIG['database'] = BENCH_DATABASE
+    config.SQLITE_PATH = BENCH_SQLITE_PATH
+
+    started = time.perf_counter()
+    import app as app_module
+    import_ms = (time.perf_counter() - started) * 1000
+    app_module.app.config['TESTING'] = True
+    app_module.app.config['PROPAGATE_EXCEPTIONS'] = False
+
+    client = app_module.app.test_client()
+    pages = {}
+    for name, role, method, path, form in build_routes(ids):
+        if method != 'GET':
+            continue
+        login(client, ids, role)
+        samples = []
+        for _ in range(repeat + 1):
+            started = time.perf_counter()
+            response = client.get(path)
+            response.get_data()
+            samples.append((time.perf_counter() - started) * 1000)
+            response.close()
+        pages[name] = {'cold_ms': round(samples[0], 2), 'warm_ms': round(median(samples[1:]), 2),
+                       'status': response.status_code}
+    return {'import_ms': round(import_ms, 1), 'pages': pages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', default=config.DB_BACKEND, choices=('mysql', 'sqlite'))
+    parser.add_argument('--workers', type=int, default=500)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--skip-seed', action='store_true')
+    parser.add_argument('--output', default='bench_cold_start.json')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        request = json.loads(args.child)
+        print(json.dumps(child(request['settings'], request['ids'], args.repeat)))
+        return
+
+    if args.skip_seed:
+        db = storage.SQLiteConnection(BENCH_SQLITE_PATH) if args.backend == 'sqlite' else connect()
+    else:
+        db = fresh_sqlite() if args.backend == 'sqlite' else fresh_database()
+        seed(db, args.workers, args.days, seed=args.seed)
+    ids = pick_ids(db)
+    db.close()
+
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    results = {}
+    for name, settings in RUNS:
+        request = json.dumps({'settings': dict(settings, DB_BACKEND=args.backend), 'ids': ids},
+                             default=str)
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', request,
+                              '--repeat', str(args.repeat)],
+                             cwd=BACKEND_DIR, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"❌ {name} run failed:\n{out.stderr}")
+            return
+        results[name] = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"✅ {name}: imported in {results[name]['import_ms']:.0f}ms")
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    print(f"\n{'page':<24}" + "".join(f" {name + ' cold':>16} {name + ' warm':>16}" for name, _ in RUNS))
+    for page in results['lazy']['pages']:
+        line = f"{page:<24}"
+        for name, _ in RUNS:
+            r = results[name]['pages'][page]
+            line += f" {r['cold_ms']:>14.1f}ms {r['warm_ms']:>14.1f}ms"
+        print(line)
+    print()
+    for name, _ in RUNS:
+        pages = results[name]['pages'].values()
+        cold = sum(p['cold_ms'] for p in pages)
+        warm = sum(p['warm_ms'] for p in pages)
+        print(f"   {name:<11} import {results[name]['import_ms']:>7.0f}ms   first requests {cold:>8.1f}ms"
+              f"   warm {warm:>8.1f}ms   cold/warm {cold / warm if warm else 0:.2f}x")
+
+    with open(args.output, 'w') as f:
+        json.dump({'backend': args.backend, 'repeat': args.repeat, 'results': results}, f, indent=2)
+    print(f"\n✅ Saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Dashboards: one query per card vs one batched round trip.
+
+Runs the old per-card queries one after another and the dashboard_data
+batches against the scratch database, and prints the number of round
+trips plus median / p95 for each dashboard. Use --latency-ms to add a
+simulated network delay per round trip (e.g. a database on another host).
+
+    python benchmarks/bench_dashboards.py --workers 2000 --days 90 --latency-ms 1
+"""
+import argparse
+import time
+from datetime import date
+from statistics import median
+
+from common import fresh_database, percentile, seed
+
+import dashboard_data
+
+ROUND_TRIPS = [0]
+
+
+class CountingCursor:
+    """Dictionary cursor that counts execute() calls (one per round trip)"""
+
+    def __init__(self, cursor, latency):
+        self._cursor = cursor
+        self._latency = latency
+
+    def execute(self, sql, params=(), multi=False):
+        ROUND_TRIPS[0] += 1
+        if self._latency:
+            time.sleep(self._latency)
+        return self._cursor.execute(sql, params, multi=multi)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def run_sequential(cursor, statements):
+    results = []
+    for sql, params in statements:
+        cursor.execute(sql, params)
+        results.append(cursor.fetchall())
+    return results
+
+
+def worker_before(cursor, worker_id, department, today):
+    return run_sequential(cursor, [
+        ("SELECT * FROM WORKER WHERE worker_id=%s", (worker_id,)),
+        (dashboard_data.WORKER_ATTENDANCE_SQL, (worker_id, today)),
+        (dashboard_data.WORKER_TASKS_SQL, (worker_id,)),
+        (dashboard_data.WORKER_LATEST_SALARY_SQL, (worker_id,)),
+    ])
+
+
+def manager_before(cursor, worker_id, department, today):
+    return run_sequential(cursor, [
+        ("SELECT * FROM WORKER WHERE worker_id=%s", (worker_id,)),
+        ("SELECT COUNT(*) as team_count FROM WORKER WHERE department = %s AND role = 'worker' AND status = 'Active'",
+         (department,)),
+        ("""SELECT COUNT(*) as pending_tasks FROM TASK t JOIN WORKER w ON t.worker_id = w.worker_id
+            WHERE w.department = %s AND t.status IN ('Pending', 'In Progress')""", (department,)),
+        ("""SELECT COUNT(DISTINCT w.worker_id) as today_present FROM ATTENDANCE a JOIN WORKER w ON a.worker_id = w.worker_id
+            WHERE w.department = %s AND a.date = %s AND a.attendance_value >= 0.5""", (department, today)),
+        ("""SELECT COUNT(*) as pending_leaves FROM LEAVE_REQUEST lr JOIN WORKER w ON lr.worker_id = w.worker_id
+            WHERE w.department = %s AND lr.status = 'Pending'""", (department,)),
+        (dashboard_data.MANAGER_RECENT_TASKS_SQL, (department,)),
+        (dashboard_data.MANAGER_TODAY_ATTENDANCE_SQL, (department, today)),
+        (dashboard_data.MANAGER_RECENT_LEAVES_SQL, (department,)),
+    ])
+
+
+def admin_before(cursor, worker_id, department, today):
+    return run_sequential(cursor, [
+        ("SELECT * FROM WORKER WHERE worker_id=%s", (worker_id,)),
+        ("SELECT COUNT(*) as total FROM WORKER WHERE role='worker'", ()),
+        ("SELECT COUNT(*) as total FROM WORKER WHERE role='manager'", ()),
+        ("SELECT COUNT(*) as total FROM ATTENDANCE WHERE date=%s", (today,)),
+        ("SELECT COUNT(*) as total FROM SUBSTITUTE_REQUEST WHERE admin_approved=FALSE AND status='Accepted'", ()),
+        ("SELECT COUNT(*) as total FROM SALARY WHERE status='Pending'", ()),
+        (dashboard_data.ADMIN_RECENT_ATTENDANCE_SQL, (today,)),
+    ])
+
+
+# The user row comes from the worker cache in the app, so the batched
+# versions do not fetch it
+CASES = [
+    ('worker', worker_before,
+     lambda cursor, worker_id, department, today: dashboard_data.worker_dashboard(cursor, worker_id, today)),
+    ('manager', manager_before,
+     lambda cursor, worker_id, department, today: dashboard_data.manager_dashboard(cursor, department, today)),
+    ('admin', admin_before,
+     lambda cursor, worker_id, department, today: dashboard_data.admin_dashboard(cursor, today)),
+]
+
+
+def measure(cursor, fn, args, repeat):
+    samples = []
+    ROUND_TRIPS[0] = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(cursor, *args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples, ROUND_TRIPS[0] // repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help="simulated network latency added to every round trip")
+    args = parser.parse_args()
+
+    db = fresh_database()
+    ids = seed(db, args.workers, args.days)
+    cursor = CountingCursor(db.cursor(dictionary=True), args.latency_ms / 1000)
+    today = date.today().strftime('%Y-%m-%d')
+    dashboard_args = (ids[1], 'Construction', today)
+
+    print(f"{'dashboard':<10} {'trips before':>12} {'trips after':>11} {'before p50':>11} {'before p95':>11} "
+          f"{'after p50':>10} {'after p95':>10}")
+    for name, before_fn, after_fn in CASES:
+        before, before_trips = measure(cursor, before_fn, dashboard_args, args.repeat)
+        after, after_trips = measure(cursor, after_fn, dashboard_args, args.repeat)
+        print(f"{name:<10} {before_trips:>12} {after_trips:>11} {median(before):>9.1f}ms {percentile(before, 95):>9.1f}ms "
+              f"{median(after):>8.1f}ms {percentile(after, 95):>8.1f}ms")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
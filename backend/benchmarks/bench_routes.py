@@ -0,0 +1,281 @@
+"""
+Every route in app.py against a seeded scratch database.
+
+Seeds the scratch database at the requested scale, then drives every page
+and POST route through the Flask test client, logged in as the role the
+route expects. For each route it reports latency percentiles, SQL
+statements and InnoDB rows read per request (from SHOW GLOBAL STATUS
+deltas, so run it against a MySQL nobody else is using). Results are
+saved as JSON; --compare prints the change against an earlier run.
+
+    python benchmarks/bench_routes.py --workers 2000 --days 180 --output before.json
+    python benchmarks/bench_routes.py --skip-seed --compare before.json --output after.json
+"""
+import argparse
+import json
+import subprocess
+import time
+from datetime import date, datetime, timedelta
+from statistics import mean, median
+
+from common import BENCH_DATABASE, connect, fresh_database, percentile, seed
+
+import config
+
+STATUS_VARIABLES = ('Questions', 'Innodb_rows_read')
+
+
+def server_status(monitor):
+    cursor = monitor.cursor()
+    cursor.execute("SHOW GLOBAL STATUS WHERE Variable_name IN (%s, %s)", STATUS_VARIABLES)
+    values = {name: int(value) for name, value in cursor.fetchall()}
+    cursor.close()
+    return values
+
+
+def pick_ids(db):
+    """Ids of seeded rows the parametrised routes need"""
+    cursor = db.cursor()
+
+    def one(sql, params=()):
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+        cursor.fetchall()
+        return row[0] if row else 0
+
+    ids = {
+        'admin': one("SELECT worker_id FROM WORKER WHERE role = 'admin' LIMIT 1"),
+        'manager': one("SELECT worker_id FROM WORKER WHERE role = 'manager' ORDER BY worker_id LIMIT 1"),
+    }
+    ids['department'] = one("SELECT department FROM WORKER WHERE worker_id = %s", (ids['manager'],))
+    ids['worker'] = one("""SELECT worker_id FROM WORKER WHERE role = 'worker' AND department = %s
+                           ORDER BY worker_id LIMIT 1""", (ids['department'],))
+    ids['other_worker'] = one("""SELECT worker_id FROM WORKER WHERE role = 'worker' AND department = %s
+                                 AND worker_id > %s ORDER BY worker_id LIMIT 1""", (ids['department'], ids['worker']))
+    ids['task'] = one("SELECT task_id FROM TASK WHERE worker_id = %s LIMIT 1", (ids['worker'],))
+    ids['leave'] = one("SELECT leave_id FROM LEAVE_REQUEST WHERE status = 'Pending' LIMIT 1")
+    ids['salary'] = one("SELECT salary_id FROM SALARY LIMIT 1")
+    cursor.close()
+    return ids
+
+
+def build_routes(ids):
+    """(name, role, method, path, form) - form may be a callable of the iteration"""
+    today = date.today()
+    month = today.strftime('%Y-%m')
+    last_month = (today.replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+    week_ago = (today - timedelta(days=7)).strftime('%Y-%m-%d')
+    next_week = (today + timedelta(days=7)).strftime('%Y-%m-%d')
+    w, m, t = ids['worker'], ids['other_worker'], ids['task']
+    profile = {'contact': '0123456789', 'address': 'Bench Street', 'current_password': 'bench'}
+    password = {'current_password': 'bench', 'new_password': 'bench', 'confirm_password': 'bench'}
+
+    return [
+        # ----- Public -----
+        ('index', None, 'GET', '/', None),
+        ('login page', None, 'GET', '/login', None),
+        ('signup page', None, 'GET', '/signup', None),
+        ('login', None, 'POST', '/login', {'email': 'worker1@bench.local', 'password': 'bench'}),
+        ('signup', None, 'POST', '/signup', lambda i: {
+            'name': f"Bench Signup {i}", 'email': f"signup{time.time_ns()}@bench.local",
+            'password': 'bench', 'confirm_password': 'bench', 'department': ids['department']}),
+        ('kiosk sync (50 events)', None, 'KIOSK', '/api/kiosk/attendance/sync', lambda i: {'events': [
+            {'event_id': f"bench-{time.time_ns()}-{n}", 'type': 'check_in', 'worker_id': w + n,
+             'timestamp': f"{today.isoformat()}T08:00:00"} for n in range(50)]}),
+
+        # ----- Worker -----
+        ('worker dashboard', 'worker', 'GET', '/worker/dashboard', None),
+        ('worker profile', 'worker', 'GET', '/worker/profile', None),
+        ('worker tasks', 'worker', 'GET', '/worker/tasks', None),
+        ('worker task detail', 'worker', 'GET', f'/worker/task/{t}', None),
+        ('worker attendance', 'worker', 'GET', '/worker/attendance', None),
+        ('worker substitute', 'worker', 'GET', '/worker/substitute', None),
+        ('worker leave', 'worker', 'GET', '/worker/leave', None),
+        ('worker salary', 'worker', 'GET', '/worker/salary', None),
+        ('worker performance', 'worker', 'GET', '/worker/performance', None),
+        ('check-in', 'worker', 'POST', '/worker/attendance/checkin', {}),
+        ('check-out', 'worker', 'POST', '/worker/attendance/checkout', {}),
+        ('task status', 'worker', 'POST', f'/worker/task/{t}/update-status', {'status': 'In Progress'}),
+        ('task complete', 'worker', 'POST', f'/worker/task/{t}/complete', {}),
+        ('substitute request', 'worker', 'POST', '/worker/substitute/request',
+         {'substitute_id': m, 'date': next_week, 'hours': 4, 'reason': 'Bench'}),
+        ('substitute accept', 'worker', 'POST', '/worker/substitute/accept/1', {}),
+        ('leave request', 'worker', 'POST', '/worker/leave/request',
+         {'leave_type': 'Casual', 'start_date': next_week, 'end_date': next_week, 'reason': 'Bench'}),
+        ('worker profile update', 'worker', 'POST', '/worker/profile/update', profile),
+        ('worker password', 'worker', 'POST', '/worker/profile/change-password', password),
+
+        # ----- Admin -----
+        ('admin dashboard', 'admin', 'GET', '/admin/dashboard', None),
+        ('admin profile', 'admin', 'GET', '/admin/profile', None),
+        ('all workers', 'admin', 'GET', '/admin/all_workers', None),
+        ('worker details', 'admin', 'GET', f'/admin/worker/{w}', None),
+        ('attendance reports', 'admin', 'GET', '/admin/attendance_reports', None),
+        ('attendance export (7 days)', 'admin', 'GET',
+         f'/admin/attendance/export?start_date={week_ago}&end_date={today}&format=csv', None),
+        ('salary management', 'admin', 'GET', f'/admin/salary_management?month={last_month}', None),
+        ('approve substitutes', 'admin', 'GET', '/admin/approve_substitutes', None),
+        ('approve leave', 'admin', 'GET', '/admin/approve_leave', None),
+        ('pool stats', 'admin', 'GET', '/admin/pool-stats', None),
+        ('cache stats', 'admin', 'GET', '/admin/cache-stats', None),
+        ('ingest stats', 'admin', 'GET', '/admin/ingest-stats', None),
+        ('worker status', 'admin', 'POST', f'/admin/worker/{m}/update-status', {'status': 'Active'}),
+        ('salary create', 'admin', 'POST', '/admin/salary/create',
+         {'worker_id': w, 'month': month, 'base_salary': 25000, 'extra_hours': 0}),
+        ('salary status', 'admin', 'POST', f"/admin/salary/{ids['salary']}/update-status", {'status': 'Paid'}),
+        ('payroll run', 'admin', 'POST', '/admin/payroll/run', {'month': month}),
+        ('payroll status', 'admin', 'POST', f'/admin/payroll/{month}/status', {'status': 'Finalized'}),
+        ('substitute approve', 'admin', 'POST', '/admin/substitute/1/approve', {}),
+        ('leave approve', 'admin', 'POST', f"/admin/leave/{ids['leave']}/approve", {}),
+        ('leave reject', 'admin', 'POST', f"/admin/leave/{ids['leave']}/reject", {}),
+        ('admin profile update', 'admin', 'POST', '/admin/profile/update', profile),
+        ('admin password', 'admin', 'POST', '/admin/profile/change-password', password),
+
+        # ----- Manager -----
+        ('manager dashboard', 'manager', 'GET', '/manager/dashboard', None),
+        ('manager profile', 'manager', 'GET', '/manager/profile', None),
+        ('team view', 'manager', 'GET', '/manager/team_view', None),
+        ('assign tasks', 'manager', 'GET', '/manager/assign_tasks', None),
+        ('feedback', 'manager', 'GET', '/manager/feedback', None),
+        ('manager worker details', 'manager', 'GET', f'/manager/worker/{w}', None),
+        ('task assign', 'manager', 'POST', '/manager/task/assign',
+         {'worker_id': w, 'task_details': 'Bench task', 'deadline': next_week}),
+        ('manager task status', 'manager', 'POST', f'/manager/task/{t}/update-status', {'status': 'Pending'}),
+        ('feedback submit', 'manager', 'POST', '/manager/feedback/submit',
+         {'worker_id': w, 'month': month, 'feedback': 'Bench feedback'}),
+        ('manager profile update', 'manager', 'POST', '/manager/profile/update', profile),
+        ('manager password', 'manager', 'POST', '/manager/profile/change-password', password),
+        # deletes once, then measures the "not found" path
+        ('manager task delete', 'manager', 'POST', f'/manager/task/{t}/delete', {}),
+        ('logout', 'worker', 'GET', '/logout', None),
+    ]
+
+
+def login(client, ids, role):
+    with client.session_transaction() as sess:
+        sess.clear()
+        if role:
+            sess['user_id'] = ids[role]
+            sess['role'] = role
+            sess['name'] = f"Bench {role}"
+
+
+def run_route(client, monitor, route, repeat):
+    name, role, method, path, form = route
+    samples, statuses = [], {}
+    before = server_status(monitor)
+    for i in range(repeat):
+        data = form(i) if callable(form) else form
+        started = time.perf_counter()
+        if method == 'GET':
+            response = client.get(path)
+        elif method == 'KIOSK':
+            response = client.post(path, json=data, headers={'X-Kiosk-Token': 'bench'})
+        else:
+            response = client.post(path, data=data)
+        response.get_data()    # drain streamed bodies
+        samples.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        response.close()
+    after = server_status(monitor)
+    return {
+        'route': name,
+        'method': 'POST' if method == 'KIOSK' else method,
+        'path': path,
+        'requests': repeat,
+        'p50_ms': round(median(samples), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'mean_ms': round(mean(samples), 3),
+        # the second SHOW STATUS counts as one Question
+        'queries_per_request': round((after['Questions'] - before['Questions'] - 1) / repeat, 2),
+        'rows_read_per_request': round((after['Innodb_rows_read'] - before['Innodb_rows_read']) / repeat, 1),
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    old = {r['route']: r for r in (baseline or {}).get('results', [])}
+    print(f"{'route':<28} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8} {'rows read':>10}"
+          + (f" {'p50 vs base':>12} {'queries vs base':>16}" if old else ""))
+    for r in results:
+        line = (f"{r['route']:<28} {r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms {r['p99_ms']:>6.1f}ms "
+                f"{r['queries_per_request']:>8} {r['rows_read_per_request']:>10}")
+        base = old.get(r['route'])
+        if base:
+            ratio = r['p50_ms'] / base['p50_ms'] if base['p50_ms'] else 0
+            line += f" {ratio:>11.2f}x {r['queries_per_request'] - base['queries_per_request']:>+16.2f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=1000)
+    parser.add_argument('--departments', type=int, default=8)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--tasks', type=int, default=3, help="tasks per worker")
+    parser.add_argument('--leaves', type=int, default=2, help="leave requests per worker")
+    parser.add_argument('--salary-months', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-seed', action='store_true', help="reuse the existing scratch database")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--only', help="run routes whose name contains this text")
+    parser.add_argument('--output', default='bench_routes.json')
+    parser.add_argument('--compare', help="earlier JSON result to compare against")
+    args = parser.parse_args()
+
+    scale = {k: getattr(args, k) for k in ('workers', 'departments', 'days', 'tasks',
+                                            'leaves', 'salary_months', 'seed')}
+    if args.skip_seed:
+        db = connect()
+    else:
+        db = fresh_database()
+        seeded = time.perf_counter()
+        seed(db, args.workers, args.days, seed=args.seed, departments=args.departments,
+             tasks=args.tasks, leaves=args.leaves, salary_months=args.salary_months)
+        print(f"🌱 Seeded {BENCH_DATABASE} in {time.perf_counter() - seeded:.1f}s")
+    ids = pick_ids(db)
+    db.close()
+
+    # Point the app at the scratch database before it builds its pool
+    config.DB_CONFIG['database'] = BENCH_DATABASE
+    config.KIOSK_API_TOKENS['bench'] = 'bench-kiosk'
+    import app as app_module
+    app_module.app.config['TESTING'] = True
+    client = app_module.app.test_client()
+    monitor = connect()
+    monitor.autocommit = True
+
+    results = []
+    for route in build_routes(ids):
+        if args.only and args.only not in route[0]:
+            continue
+        login(client, ids, route[1])
+        results.append(run_route(client, monitor, route, args.repeat))
+    monitor.close()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    with open(args.output, 'w') as f:
+        json.dump({'commit': git_commit(),
+                   'recorded_at': datetime.now().isoformat(timespec='seconds'),
+                   'scale': scale,
+                   'repeat': args.repeat,
+                   'results': results}, f, indent=2)
+    print(f"\n✅ Saved {len(results)} routes to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
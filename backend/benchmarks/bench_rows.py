@@ -0,0 +1,111 @@
+"""
+Result rows: dictionary cursor + SELECT * vs plain cursor + records.Row.
+
+Seeds the scratch database with `--rows` workers, attendance and tasks,
+then reads `--rows` rows of WORKER, ATTENDANCE and TASK three ways:
+
+    dict     SELECT * through cursor(dictionary=True), as the handlers did
+    row      the explicit column list through a plain cursor and
+             records.fetchall(), as they do now
+    tuple    the explicit column list, bare tuples (the floor)
+
+and prints, per table and way, the median fetch time and rows/s, the
+memory the result list keeps (tracemalloc, measured in a separate run so
+it doesn't slow the timings) and the garbage collections the fetch set
+off.
+
+    python benchmarks/bench_rows.py --rows 100000
+    python benchmarks/bench_rows.py --backend mysql
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from statistics import median
+
+from common import fresh_database, fresh_sqlite, seed
+
+import records
+
+TABLES = {
+    'WORKER': "worker_id",
+    'ATTENDANCE': "attendance_id",
+    'TASK': "task_id",
+}
+
+
+def queries(table, order_by):
+    star = f"SELECT * FROM {table} ORDER BY {order_by} LIMIT %s"
+    explicit = (f"SELECT {', '.join(records.TABLE_COLUMNS[table])} FROM {table} "
+                f"ORDER BY {order_by} LIMIT %s")
+    return star, explicit
+
+
+def fetch(db, way, star, explicit, rows):
+    if way == 'dict':
+        cursor = db.cursor(dictionary=True)
+        cursor.execute(star, (rows,))
+        result = cursor.fetchall()
+    else:
+        cursor = db.cursor()
+        cursor.execute(explicit, (rows,))
+        result = records.fetchall(cursor) if way == 'row' else cursor.fetchall()
+    cursor.close()
+    return result
+
+
+def collections():
+    return sum(generation['collections'] for generation in gc.get_stats())
+
+
+def measure(db, way, star, explicit, rows, repeat):
+    samples, gcs, count = [], [], 0
+    for _ in range(repeat):
+        before = collections()
+        started = time.perf_counter()
+        result = fetch(db, way, star, explicit, rows)
+        samples.append(time.perf_counter() - started)
+        gcs.append(collections() - before)
+        count = len(result)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = fetch(db, way, star, explicit, rows)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {'rows': count, 'seconds': median(samples), 'gcs': median(gcs),
+            'retained': retained - baseline, 'peak': peak - baseline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    args = parser.parse_args()
+
+    db = fresh_sqlite() if args.backend == 'sqlite' else fresh_database()
+    # one attendance day per worker is ~90% present, so two days cover --rows
+    seed(db, args.rows, 2, tasks=1)
+
+    print(f"{'table':<11} {'way':<6} {'rows':>7} {'p50':>9} {'rows/s':>11} {'retained':>10} "
+          f"{'B/row':>6} {'peak':>10} {'gcs':>4}")
+    for table, order_by in TABLES.items():
+        star, explicit = queries(table, order_by)
+        results = {}
+        for way in ('dict', 'row', 'tuple'):
+            r = results[way] = measure(db, way, star, explicit, args.rows, args.repeat)
+            print(f"{table:<11} {way:<6} {r['rows']:>7} {r['seconds'] * 1000:>7.1f}ms "
+                  f"{r['rows'] / r['seconds']:>11,.0f} {r['retained'] / 2**20:>8.1f}MB "
+                  f"{r['retained'] / max(r['rows'], 1):>6.0f} {r['peak'] / 2**20:>8.1f}MB {r['gcs']:>4.0f}")
+        d, r = results['dict'], results['row']
+        print(f"{'':<11} row vs dict: {d['seconds'] / r['seconds']:.2f}x faster, "
+              f"{d['retained'] / max(r['retained'], 1):.2f}x less memory")
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""
+Throughput of server.py as worker processes are added.
+
+Seeds the scratch database once, then for each --workers count starts
+`python server.py` (PRODUCTION_MODE, no recycling) on a free port and
+drives it for --seconds from --clients load processes, each keeping
+--connections keep-alive connections busy with the read pages of
+bench_routes.py, logged in as a worker, a manager and an admin.
+Reports requests/s, the speedup over one worker and the latency.
+
+    python benchmarks/bench_server.py --backend sqlite --workers 1 2 4 8 --threads 4
+
+The load processes run on the same host and compete with the workers
+for CPU, so give the box more cores than --workers or run the clients
+elsewhere; on one core there is nothing to scale onto.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from statistics import median
+
+from bench_routes import build_routes, pick_ids
+from common import (BACKEND_DIR, BENCH_DATABASE, BENCH_SQLITE_PATH, connect, fresh_database,
+                    fresh_sqlite, percentile, seed)
+
+import config
+import storage
+
+# bench_routes.py pages the load cycles through
+PAGES = ['worker dashboard', 'worker tasks', 'worker attendance', 'manager dashboard', 'team view',
+         'admin dashboard', 'all workers', 'attendance reports']
+LOGINS = {'worker': 'worker9@bench.local', 'manager': 'worker0@bench.local', 'admin': 'admin@bench.local'}
+
+
+def serve(settings, argv):
+    """Runs as the server process: point config at the scratch database, start server.py"""
+    for key, value in settings.items():
+        setattr(config, key, value)
+    config.DB_CONFIG['database'] = BENCH_DATABASE
+    config.SQLITE_PATH = BENCH_SQLITE_PATH
+    sys.path.insert(0, BACKEND_DIR)
+    import server
+    return server.main(argv)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/login')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def log_in(port, role):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/login', body=f"email={LOGINS[role]}&password=bench",
+                 headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.getheader('Set-Cookie').split(';', 1)[0]
+
+
+def client(port, pages, seconds, connections, start_at, out):
+    """One load process: `connections` keep-alive connections served round-robin"""
+    cookies = {role: log_in(port, role) for role in LOGINS}
+    conns = [http.client.HTTPConnection('127.0.0.1', port, timeout=60) for _ in range(connections)]
+    while time.time() < start_at:
+        time.sleep(0.01)
+    deadline = time.monotonic() + seconds
+    latencies, errors, i = [], 0, 0
+    while time.monotonic() < deadline:
+        role, path = pages[i % len(pages)]
+        conn = conns[i % connections]
+        i += 1
+        started = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Cookie': cookies[role]})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+            if response.will_close:
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    out.put({'latencies': latencies, 'errors': errors})
+
+
+def drive(port, pages, args):
+    out = multiprocessing.Queue()
+    start_at = time.time() + 2
+    procs = [multiprocessing.Process(target=client, args=(port, pages, args.seconds, args.connections,
+                                                          start_at, out))
+             for _ in range(args.clients)]
+    for p in procs:
+        p.start()
+    results = [out.get() for _ in procs]
+    for p in procs:
+        p.join()
+    latencies = [ms for r in results for ms in r['latencies']]
+    return {'requests': len(latencies), 'errors': sum(r['errors'] for r in results),
+            'rps': len(latencies) / args.seconds,
+            'p50_ms': median(latencies) if latencies else 0,
+            'p95_ms': percentile(latencies, 95) if latencies else 0}
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', default=config.DB_BACKEND, choices=('mysql', 'sqlite'))
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1))))
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=max(2, cores))
+    parser.add_argument('--connections', type=int, default=4, help="per load process")
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed-workers', type=int, default=500)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--skip-seed', action='store_true')
+    parser.add_argument('--output', default='bench_server.json')
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        request = json.loads(args.serve)
+        sys.exit(serve(request['settings'], request['argv']))
+
+    if args.skip_seed:
+        db = storage.SQLiteConnection(BENCH_SQLITE_PATH) if args.backend == 'sqlite' else connect()
+    else:
+        db = fresh_sqlite() if args.backend == 'sqlite' else fresh_database()
+        seed(db, args.seed_workers, args.days)
+    ids = pick_ids(db)
+    db.close()
+    routes = {name: (role, path) for name, role, method, path, form in build_routes(ids)}
+    pages = [routes[name] for name in PAGES]
+
+    settings = {'DB_BACKEND': args.backend, 'PRODUCTION_MODE': True}
+    print(f"{'workers':>7} {'threads':>7} {'req/s':>9} {'speedup':>8} {'per worker':>10} "
+          f"{'p50':>9} {'p95':>9} {'errors':>7}")
+    results = []
+    for workers in args.workers:
+        port = free_port()
+        argv = ['--port', str(port), '--workers', str(workers), '--threads', str(args.threads),
+                '--max-requests', '0', '--preload']
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve',
+                                 json.dumps({'settings': settings, 'argv': argv})],
+                                cwd=BACKEND_DIR, stdout=subprocess.DEVNULL)
+        try:
+            if not wait_ready(port):
+                print(f"❌ Server with {workers} workers did not start")
+                return
+            r = drive(port, pages, args)
+        finally:
+            proc.terminate()
+            proc.wait(60)
+        r.update(workers=workers, threads=args.threads)
+        results.append(r)
+        base = results[0]['rps'] / results[0]['workers']
+        speedup = r['rps'] / results[0]['rps'] if results[0]['rps'] else 0
+        print(f"{workers:>7} {args.threads:>7} {r['rps']:>9.1f} {speedup:>7.2f}x "
+              f"{r['rps'] / workers / base if base else 0:>9.0%} "
+              f"{r['p50_ms']:>7.1f}ms {r['p95_ms']:>7.1f}ms {r['errors']:>7}")
+
+    with open(args.output, 'w') as f:
+        json.dump({'backend': args.backend, 'cores': cores, 'clients': args.clients,
+                   'connections': args.connections, 'seconds': args.seconds, 'results': results}, f, indent=2)
+    print(f"\n✅ Saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
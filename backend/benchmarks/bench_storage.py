@@ -0,0 +1,172 @@
+"""
+The same routes on MySQL and on SQLite (WAL).
+
+Seeds the same deterministic dataset into the MySQL scratch database and
+a scratch SQLite file, then drives every route from bench_routes.py
+through the Flask test client against each backend in turn, swapping the
+app's connection pool in between. Reports latency per route for both and
+the SQLite/MySQL ratio, then a mixed read/write run from several threads
+at once (check-ins and check-outs against dashboards and lists) to show
+how each engine holds up with concurrent writers.
+
+    python benchmarks/bench_storage.py --workers 1000 --days 90
+    python benchmarks/bench_storage.py --backends sqlite    # no MySQL server needed
+"""
+import argparse
+import json
+import threading
+import time
+from statistics import median
+
+from bench_routes import build_routes, login, pick_ids
+from common import (BENCH_DATABASE, BENCH_SQLITE_PATH, fresh_database, fresh_sqlite,
+                    percentile, seed)
+
+import config
+import storage
+
+# bench_routes.py routes the mixed run reads between writes
+MIX_READS = ['worker dashboard', 'worker attendance', 'manager dashboard', 'team view',
+             'admin dashboard', 'attendance reports']
+
+
+def time_route(client, ids, route, repeat):
+    name, role, method, path, form = route
+    login(client, ids, role)
+    samples, statuses = [], {}
+    for i in range(repeat):
+        data = form(i) if callable(form) else form
+        started = time.perf_counter()
+        if method == 'GET':
+            response = client.get(path)
+        elif method == 'KIOSK':
+            response = client.post(path, json=data, headers={'X-Kiosk-Token': 'bench'})
+        else:
+            response = client.post(path, data=data)
+        response.get_data()
+        samples.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        response.close()
+    return {'p50_ms': round(median(samples), 3),
+            'p95_ms': round(percentile(samples, 95), 3),
+            'statuses': {str(code): count for code, count in sorted(statuses.items())}}
+
+
+def concurrent_mix(app, ids, routes, threads, seconds):
+    """Every thread alternates a check-in/check-out with the MIX_READS pages"""
+    reads = [r for r in routes if r[0] in MIX_READS]
+    writes = [r for r in routes if r[0] in ('check-in', 'check-out')]
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def run(n):
+        client = app.test_client()
+        i = 0
+        while time.perf_counter() < deadline:
+            route = writes[i % len(writes)] if i % 4 == 0 else reads[(i + n) % len(reads)]
+            name, role, method, path, form = route
+            login(client, ids, role)
+            response = client.get(path) if method == 'GET' else client.post(path, data=form or {})
+            response.get_data()
+            with lock:
+                counts['writes' if method == 'POST' else 'reads'] += 1
+                counts['errors'] += response.status_code >= 500
+            response.close()
+            i += 1
+
+    workers = [threading.Thread(target=run, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return dict(counts, requests_per_s=round((counts['reads'] + counts['writes']) / seconds, 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backends', default='mysql,sqlite')
+    parser.add_argument('--workers', type=int, default=1000)
+    parser.add_argument('--departments', type=int, default=8)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--leaves', type=int, default=2)
+    parser.add_argument('--salary-months', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--only', help="run routes whose name contains this text")
+    parser.add_argument('--threads', type=int, default=8, help="threads for the mixed run (0 to skip)")
+    parser.add_argument('--seconds', type=float, default=10, help="length of the mixed run")
+    parser.add_argument('--output', default='bench_storage.json')
+    args = parser.parse_args()
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+
+    # Seed every backend first, so the app is imported once
+    seeded_ids = {}
+    for backend in backends:
+        db = fresh_database() if backend == 'mysql' else fresh_sqlite()
+        started = time.perf_counter()
+        seed(db, args.workers, args.days, seed=args.seed, departments=args.departments,
+             leaves=args.leaves, salary_months=args.salary_months)
+        print(f"🌱 Seeded {backend} in {time.perf_counter() - started:.1f}s")
+        seeded_ids[backend] = pick_ids(db)
+        db.close()
+
+    config.DB_CONFIG['database'] = BENCH_DATABASE
+    config.KIOSK_API_TOKENS['bench'] = 'bench-kiosk'
+    import app as app_module
+    from db_pool import ConnectionPool
+    app_module.app.config['TESTING'] = True
+    app_module.app.config['PROPAGATE_EXCEPTIONS'] = False    # count 500s instead of stopping
+
+    results = {}
+    for backend in backends:
+        ids = seeded_ids[backend]
+        app_module.db_pool.dispose()
+        app_module.db_pool = ConnectionPool(
+            config.DB_CONFIG, size=config.DB_POOL_SIZE, max_overflow=config.DB_POOL_MAX_OVERFLOW,
+            timeout=config.DB_POOL_TIMEOUT,
+            connect=storage.connector(backend, config.DB_CONFIG, BENCH_SQLITE_PATH))
+        app_module.worker_cache.clear()
+        app_module.counter_cache.clear()
+
+        client = app_module.app.test_client()
+        routes = build_routes(ids)
+        per_route = {}
+        for route in routes:
+            if args.only and args.only not in route[0]:
+                continue
+            per_route[route[0]] = time_route(client, ids, route, args.repeat)
+        mix = concurrent_mix(app_module.app, ids, routes, args.threads, args.seconds) if args.threads else None
+        results[backend] = {'routes': per_route, 'mix': mix}
+        print(f"✅ {backend}: {len(per_route)} routes")
+
+    names = list(next(iter(results.values()))['routes'])
+    print(f"\n{'route':<28}" + "".join(f" {b + ' p50':>14} {b + ' p95':>14}" for b in backends)
+          + (f" {'sqlite/mysql':>13}" if len(backends) == 2 else ""))
+    for name in names:
+        line = f"{name:<28}"
+        for backend in backends:
+            r = results[backend]['routes'][name]
+            bad = any(code.startswith('5') for code in r['statuses'])
+            line += f" {r['p50_ms']:>12.1f}ms {r['p95_ms']:>12.1f}ms" + (" ⚠️ 5xx" if bad else "")
+        if set(backends) == {'mysql', 'sqlite'}:
+            mysql_p50 = results['mysql']['routes'][name]['p50_ms']
+            ratio = results['sqlite']['routes'][name]['p50_ms'] / mysql_p50 if mysql_p50 else 0
+            line += f" {ratio:>12.2f}x"
+        print(line)
+
+    if args.threads:
+        print(f"\nMixed run, {args.threads} threads for {args.seconds:g}s:")
+        for backend in backends:
+            mix = results[backend]['mix']
+            print(f"   {backend:<7} {mix['requests_per_s']:>8} req/s  "
+                  f"({mix['reads']} reads, {mix['writes']} writes, {mix['errors']} errors)")
+
+    with open(args.output, 'w') as f:
+        json.dump({'scale': {k: getattr(args, k) for k in ('workers', 'departments', 'days', 'seed')},
+                   'repeat': args.repeat, 'results': results}, f, indent=2)
+    print(f"\n✅ Saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+all_workers / team_view: correlated subqueries vs one grouped join.
+
+Seeds the scratch database at several worker counts and history lengths
+and prints median / p95 for the old and new query of each page.
+
+    python benchmarks/bench_worker_lists.py --workers 500 2000 5000 --days 30 365
+"""
+import argparse
+from datetime import date, timedelta
+from statistics import median
+
+from common import fresh_database, percentile, seed, time_query
+
+ALL_WORKERS_BEFORE = """
+    SELECT w.*,
+           (SELECT COUNT(*) FROM ATTENDANCE a WHERE a.worker_id = w.worker_id AND MONTH(a.date) = MONTH(CURDATE())) as attendance_days,
+           (SELECT SUM(a.working_hours) FROM ATTENDANCE a WHERE a.worker_id = w.worker_id AND MONTH(a.date) = MONTH(CURDATE())) as total_hours
+    FROM WORKER w
+    WHERE w.role IN ('worker', 'manager')
+    ORDER BY w.department, w.name
+"""
+
+ALL_WORKERS_AFTER = """
+    SELECT w.*, COALESCE(m.attendance_days, 0) as attendance_days, m.total_hours
+    FROM WORKER w
+    LEFT JOIN (
+        SELECT worker_id, COUNT(*) as attendance_days, SUM(working_hours) as total_hours
+        FROM ATTENDANCE
+        WHERE date >= %s AND date < %s
+        GROUP BY worker_id
+    ) m ON m.worker_id = w.worker_id
+    WHERE w.role IN ('worker', 'manager')
+    ORDER BY w.department, w.name
+"""
+
+TEAM_VIEW_BEFORE = """
+    SELECT w.*,
+           (SELECT COUNT(*) FROM TASK t WHERE t.worker_id = w.worker_id AND t.status != 'Completed') as pending_tasks,
+           (SELECT COUNT(*) FROM ATTENDANCE a WHERE a.worker_id = w.worker_id AND a.date = CURDATE() AND a.attendance_value >= 0.5) as today_attended
+    FROM WORKER w
+    WHERE w.department = %s AND w.role = 'worker' AND w.status = 'Active'
+    ORDER BY w.name
+"""
+
+TEAM_VIEW_AFTER = """
+    SELECT w.*, COALESCE(t.pending_tasks, 0) as pending_tasks, COALESCE(a.today_attended, 0) as today_attended
+    FROM WORKER w
+    LEFT JOIN (
+        SELECT t.worker_id, COUNT(*) as pending_tasks
+        FROM TASK t JOIN WORKER tw ON t.worker_id = tw.worker_id
+        WHERE tw.department = %s AND t.status != 'Completed'
+        GROUP BY t.worker_id
+    ) t ON t.worker_id = w.worker_id
+    LEFT JOIN (
+        SELECT worker_id, COUNT(*) as today_attended
+        FROM ATTENDANCE
+        WHERE date = %s AND attendance_value >= 0.5
+        GROUP BY worker_id
+    ) a ON a.worker_id = w.worker_id
+    WHERE w.department = %s AND w.role = 'worker' AND w.status = 'Active'
+    ORDER BY w.name
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[500, 2000, 5000])
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 365])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    today = date.today()
+    month_start = today.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    cases = [
+        ('all_workers', ALL_WORKERS_BEFORE, (), ALL_WORKERS_AFTER, (month_start, next_month)),
+        ('team_view', TEAM_VIEW_BEFORE, ('Construction',), TEAM_VIEW_AFTER,
+         ('Construction', today.strftime('%Y-%m-%d'), 'Construction')),
+    ]
+
+    print(f"{'page':<12} {'workers':>8} {'days':>6} {'before p50':>11} {'before p95':>11} "
+          f"{'after p50':>10} {'after p95':>10} {'speedup':>8}")
+    for workers in args.workers:
+        for days in args.days:
+            db = fresh_database()
+            seed(db, workers, days)
+            for name, before_sql, before_params, after_sql, after_params in cases:
+                before = time_query(db, before_sql, before_params, args.repeat)
+                after = time_query(db, after_sql, after_params, args.repeat)
+                print(f"{name:<12} {workers:>8} {days:>6} {median(before):>9.1f}ms {percentile(before, 95):>9.1f}ms "
+                      f"{median(after):>8.1f}ms {percentile(after, 95):>8.1f}ms {median(before) / median(after):>7.1f}x")
+            db.close()
+
+
+if __name__ == '__main__':
+    main()
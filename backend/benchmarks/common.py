@@ -0,0 +1,162 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks never touch the real database: they work in a scratch
+database named after DB_CONFIG['database'] with a `_bench` suffix,
+created from migrations.py so it has the same schema and indexes. The
+SQLite backend gets a scratch file next to it (fresh_sqlite).
+Run the scripts from the backend folder, e.g.
+
+    python benchmarks/bench_worker_lists.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import mysql.connector
+
+import migrations
+import storage
+from config import DB_CONFIG
+
+BENCH_DATABASE = DB_CONFIG['database'] + '_bench'
+BENCH_SQLITE_PATH = os.path.join(BACKEND_DIR, BENCH_DATABASE + '.db')
+DEPARTMENTS = ['Construction', 'Electrical', 'Plumbing', 'Painting', 'Logistics',
+               'Maintenance', 'Welding', 'Carpentry']
+
+
+def connect(database=BENCH_DATABASE):
+    config = dict(DB_CONFIG, database=database)
+    return mysql.connector.connect(**config)
+
+
+def fresh_database():
+    """Drop and recreate the scratch database, return a connection to it"""
+    server = mysql.connector.connect(**{k: v for k, v in DB_CONFIG.items() if k != 'database'})
+    cursor = server.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+    cursor.execute(f"CREATE DATABASE {BENCH_DATABASE}")
+    cursor.close()
+    server.close()
+
+    db = connect()
+    migrations.upgrade(db)
+    return db
+
+
+def fresh_sqlite(path=BENCH_SQLITE_PATH):
+    """Delete and recreate the scratch SQLite file, return a connection to it"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    db = storage.SQLiteConnection(path)
+    migrations.upgrade(db)
+    return db
+
+
+def insert_many(cursor, sql, rows, batch=2000):
+    for i in range(0, len(rows), batch):
+        cursor.executemany(sql, rows[i:i + batch])
+
+
+def seed(db, workers, days, seed=42, departments=len(DEPARTMENTS), tasks=3,
+         leaves=0, salary_months=0):
+    """Deterministic dataset: `workers` people in `departments` departments,
+    `days` of attendance history, `tasks` tasks and `leaves` leave requests
+    per worker, and `salary_months` months of SALARY rows. Worker 0 of each
+    department (and every 50th) is a manager; one admin is added on top.
+    """
+    rng = random.Random(seed)
+    cursor = db.cursor()
+    today = date.today()
+    names = [DEPARTMENTS[i % len(DEPARTMENTS)] + ('' if i < len(DEPARTMENTS) else f" {i}")
+             for i in range(departments)]
+
+    insert_many(cursor, """
+        INSERT INTO WORKER (name, email, password, department, role, status, joining_date)
+        VALUES (%s, %s, 'bench', %s, %s, 'Active', %s)
+    """, [(f"Worker {i}", f"worker{i}@bench.local", names[i % departments],
+           'manager' if i % 50 == 0 or i < departments else 'worker', today - timedelta(days=days))
+          for i in range(workers)])
+    cursor.execute("""
+        INSERT INTO WORKER (name, email, password, department, role, status, joining_date)
+        VALUES ('Bench Admin', 'admin@bench.local', 'bench', 'Administration', 'admin', 'Active', %s)
+    """, (today,))
+
+    cursor.execute("SELECT worker_id FROM WORKER WHERE role != 'admin' ORDER BY worker_id")
+    ids = [row[0] for row in cursor.fetchall()]
+
+    attendance = []
+    for worker_id in ids:
+        for d in range(days):
+            if rng.random() < 0.9:
+                hours = round(rng.uniform(6, 10), 2)
+                attendance.append((worker_id, today - timedelta(days=d), '08:00:00',
+                                   f"{8 + int(hours):02d}:00:00", 1.0, hours))
+    insert_many(cursor, """
+        INSERT INTO ATTENDANCE (worker_id, date, check_in, check_out, attendance_value, working_hours)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, attendance)
+
+    insert_many(cursor, """
+        INSERT INTO TASK (worker_id, task_details, deadline, status, assigned_date)
+        VALUES (%s, 'Bench task', %s, %s, %s)
+    """, [(worker_id, today + timedelta(days=rng.randint(-10, 20)),
+           rng.choice(['Pending', 'In Progress', 'Completed', 'Delayed']), today)
+          for worker_id in ids for _ in range(tasks)])
+
+    leave_rows = []
+    for worker_id in ids:
+        for _ in range(leaves):
+            start = today + timedelta(days=rng.randint(-days, 30))
+            leave_rows.append((worker_id, rng.choice(['Sick', 'Casual', 'Annual']), start,
+                               start + timedelta(days=rng.randint(0, 4)),
+                               rng.choice(['Pending', 'Approved', 'Approved', 'Rejected']),
+                               start - timedelta(days=rng.randint(1, 14))))
+    insert_many(cursor, """
+        INSERT INTO LEAVE_REQUEST (worker_id, leave_type, start_date, end_date, reason, status, applied_date)
+        VALUES (%s, %s, %s, %s, 'Bench leave', %s, %s)
+    """, leave_rows)
+
+    salary_rows = []
+    for m in range(1, salary_months + 1):
+        year, month_index = divmod(today.year * 12 + today.month - 1 - m, 12)
+        month = f"{year}-{month_index + 1:02d}"
+        for worker_id in ids:
+            extra = rng.randint(0, 30)
+            salary_rows.append((worker_id, month, 25000, extra, extra * 50, 25000 + extra * 50))
+    insert_many(cursor, """
+        INSERT INTO SALARY (worker_id, month, base_salary, extra_hours, bonus_amount, total_salary, status)
+        VALUES (%s, %s, %s, %s, %s, %s, 'Paid')
+    """, salary_rows)
+
+    db.commit()
+    cursor.close()
+    return ids
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def time_query(db, sql, params=(), repeat=10):
+    """Run a query `repeat` times, return the durations in milliseconds"""
+    cursor = db.cursor()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    cursor.close()
+    return samples
@@ -0,0 +1,75 @@
+"""
+Small in-process caches.
+
+Each server process has its own copy, so invalidate() only reaches
+the process that made the write. An entry can be stored with a version
+(the data version of the scope it was built from, see versions.py); a
+lookup with a newer version is a miss, which is how every process sees
+the write. Entries also expire after a TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUTTLCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()    # key -> (expires_at, version, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, version=None):
+        """Return the cached value or None (counts a hit or a miss)
+
+        An entry set with a different `version` is a miss.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, stored_version, value = item
+                if expires_at > time.monotonic() and stored_version == version:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value, version=None):
+        """Store `value`; pass the version read *before* the value was built"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, version, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
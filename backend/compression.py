@@ -0,0 +1,199 @@
+"""
+gzip / brotli compression of responses.
+
+The dashboards and list pages are 20-80 KB of HTML and compress 5-10x,
+which is most of the load time on the crews' mobile links. app.py runs
+every response through ResponseCompressor.compress() in after_request:
+
+- the encoding is negotiated from Accept-Encoding: br (when the brotli
+  package is installed) or gzip, by the client's q-values, br on a tie;
+- only COMPRESSION_MIMETYPES are compressed, and never a response that
+  already has a Content-Encoding (/assets/ variants, ?gzip=1 exports), a
+  file response (send_file) or a body under COMPRESSION_MIN_SIZE bytes;
+- streamed responses (the attendance export) are compressed chunk by
+  chunk and flushed after each one, so they still arrive incrementally;
+- Vary: Accept-Encoding is set on every compressible response, and a
+  strong ETag is made weak (as nginx does), since the bytes differ but
+  the content doesn't - a conditional GET matches either way.
+
+Per route it counts bytes in and out and the CPU time spent compressing
+(thread CPU time, so other requests don't inflate it). render_prometheus()
+adds them to /metrics.
+"""
+import gzip
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+import sqlstats
+
+try:
+    import brotli
+except ImportError:          # optional: gzip only
+    brotli = None
+
+DEFAULT_MIMETYPES = ('text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+                     'application/javascript', 'application/json', 'application/x-ndjson',
+                     'application/xml', 'image/svg+xml')
+
+
+class RouteStats:
+    __slots__ = ('responses', 'streamed', 'bytes_in', 'bytes_out', 'cpu_seconds')
+
+    def __init__(self):
+        self.responses = 0
+        self.streamed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+
+class ResponseCompressor:
+    def __init__(self, enabled=True, min_size=1024, gzip_level=6, brotli_quality=4,
+                 mimetypes=DEFAULT_MIMETYPES):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = frozenset(mimetypes)
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+        self.routes = defaultdict(RouteStats)
+        self.skipped = defaultdict(int)       # (route, reason) -> responses
+        self._lock = threading.Lock()
+
+    # ----- Negotiation -----
+    def choose(self, accept_encodings):
+        """'br', 'gzip' or None for werkzeug's request.accept_encodings"""
+        best, best_quality = None, 0
+        for encoding in self.encodings:
+            quality = accept_encodings.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def _compressible(self, response):
+        return (self.enabled
+                and 200 <= response.status_code < 300 and response.status_code != 204
+                and response.mimetype in self.mimetypes
+                and 'Content-Encoding' not in response.headers
+                and not response.direct_passthrough)
+
+    # ----- Compressing -----
+    def _compressor(self, encoding):
+        """(compress, finish, sync flush) functions for one body"""
+        if encoding == 'br':
+            c = brotli.Compressor(quality=self.brotli_quality)
+            return c.process, c.finish, c.flush
+        c = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return c.compress, c.flush, lambda: c.flush(zlib.Z_SYNC_FLUSH)
+
+    def compress(self, response, accept_encodings, route):
+        """Compress `response` in place if it qualifies; returns it"""
+        if not self._compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose(accept_encodings)
+        if encoding is None:
+            self._skip(route, 'not_accepted')
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding, route)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                self._skip(route, 'too_small')
+                return response
+            started = time.thread_time()
+            if encoding == 'br':
+                data = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                data = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            self._record(route, len(body), len(data), time.thread_time() - started)
+            response.set_data(data)
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _stream(self, chunks, encoding, route):
+        """Compress a chunk iterator, flushing after every chunk"""
+        compress, finish, flush = self._compressor(encoding)
+        size_in = size_out = 0
+        cpu = 0.0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                started = time.thread_time()
+                data = compress(chunk) + flush()
+                cpu += time.thread_time() - started
+                size_in += len(chunk)
+                size_out += len(data)
+                if data:
+                    yield data
+            started = time.thread_time()
+            data = finish()
+            cpu += time.thread_time() - started
+            size_out += len(data)
+            yield data
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+            self._record(route, size_in, size_out, cpu, streamed=True)
+
+    # ----- Stats -----
+    def _record(self, route, size_in, size_out, cpu, streamed=False):
+        with self._lock:
+            stats = self.routes[route]
+            stats.responses += 1
+            stats.streamed += streamed
+            stats.bytes_in += size_in
+            stats.bytes_out += size_out
+            stats.cpu_seconds += cpu
+
+    def _skip(self, route, reason):
+        with self._lock:
+            self.skipped[route, reason] += 1
+
+    def summary(self):
+        with self._lock:
+            return {
+                'encodings': list(self.encodings),
+                'routes': {route: {'responses': s.responses, 'streamed': s.streamed,
+                                   'bytes_in': s.bytes_in, 'bytes_out': s.bytes_out,
+                                   'ratio': round(s.bytes_in / s.bytes_out, 2) if s.bytes_out else None,
+                                   'cpu_ms': round(s.cpu_seconds * 1000, 2)}
+                           for route, s in sorted(self.routes.items())},
+                'skipped': {f"{route} {reason}": count for (route, reason), count in sorted(self.skipped.items())},
+            }
+
+    def render_prometheus(self):
+        with self._lock:
+            routes = sorted(self.routes.items())
+            skipped = sorted(self.skipped.items())
+            out = []
+            sqlstats.series(out, 'app_compression_responses_total', 'counter',
+                            "Compressed responses, by route",
+                            [({'route': r}, s.responses) for r, s in routes])
+            sqlstats.series(out, 'app_compression_bytes_in_total', 'counter',
+                            "Response bytes before compression, by route",
+                            [({'route': r}, s.bytes_in) for r, s in routes])
+            sqlstats.series(out, 'app_compression_bytes_out_total', 'counter',
+                            "Response bytes after compression, by route",
+                            [({'route': r}, s.bytes_out) for r, s in routes])
+            sqlstats.series(out, 'app_compression_ratio', 'gauge',
+                            "Bytes in / bytes out so far, by route",
+                            [({'route': r}, round(s.bytes_in / s.bytes_out, 3)) for r, s in routes if s.bytes_out])
+            sqlstats.series(out, 'app_compression_cpu_seconds_total', 'counter',
+                            "Thread CPU time spent compressing, by route",
+                            [({'route': r}, round(s.cpu_seconds, 6)) for r, s in routes])
+            sqlstats.series(out, 'app_compression_skipped_total', 'counter',
+                            "Compressible responses sent uncompressed, by route and reason",
+                            [({'route': r, 'reason': reason}, n) for (r, reason), n in skipped])
+        return "\n".join(out) + "\n"
@@ -7,4 +7,87 @@ DB_CONFIG = {
     'database': 'smart_labour_management'  #   database name
 }
 
-SECRET_KEY = 'smart-labour-2024-secret-key'  
\ No newline at end of file
+SECRET_KEY = 'smart-labour-2024-secret-key'  
+
+# Connection pool (see db_pool.py)
+DB_POOL_SIZE = 10          # connections kept open between requests, per process
+DB_POOL_MAX_OVERFLOW = 20  # extra connections allowed during bursts
+DB_POOL_TIMEOUT = 5        # seconds to wait for a free connection
+DB_POOL_PRE_PING = True    # ping idle connections before handing them out
+DB_POOL_RECYCLE = 3600     # reopen connections older than this (seconds)
+
+# Cache of WORKER rows for the logged-in user (see cache.py)
+WORKER_CACHE_SIZE = 2048   # max rows kept per process
+WORKER_CACHE_TTL = 60      # seconds before a cached row is re-read
+
+# Keyset pagination for list pages (see pagination.py)
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 200
+
+# Monthly payroll runs (see payroll.py)
+PAYROLL_STANDARD_HOURS = 8           # daily hours before overtime starts
+PAYROLL_OVERTIME_RATE = 50           # bonus per overtime hour (৳)
+PAYROLL_DEFAULT_BASE_SALARY = 25000  # used when a worker has no earlier salary
+
+# Dashboard counter cache (see dashboard_data.py)
+COUNTER_CACHE_SIZE = 256   # global + one entry per department per day
+COUNTER_CACHE_TTL = 30     # seconds before counters are recomputed
+
+# Write-behind attendance ingestion (see ingest.py)
+INGEST_ENABLED = False           # queue check-in/check-out instead of writing inline
+INGEST_QUEUE_SIZE = 10000        # events waiting to be flushed before submits block
+INGEST_FLUSH_SIZE = 500          # max events per flush (one multi-row statement each)
+INGEST_FLUSH_INTERVAL = 0.5      # seconds between flushes when the queue is not full
+INGEST_SUBMIT_TIMEOUT = 2        # seconds a submit waits for room before giving up
+INGEST_JOURNAL_DIR = 'journal'   # relative to backend/, one ingesting process per dir
+
+# Offline kiosk batch sync (see kiosk.py)
+KIOSK_API_TOKENS = {}            # token -> kiosk name, e.g. {'change-me': 'gate-1'}
+KIOSK_SYNC_MAX_EVENTS = 1000     # events accepted per sync request
+
+# Storage backend (see storage.py)
+DB_BACKEND = 'mysql'             # 'mysql' (DB_CONFIG) or 'sqlite' (SQLITE_PATH)
+SQLITE_PATH = 'smart_labour.db'  # relative to backend/, opened in WAL mode
+
+# SQL instrumentation and /metrics (see sqlstats.py)
+SQL_STATS_ENABLED = True         # wrap every pooled cursor and record its statements
+SQL_SLOW_QUERY_MS = 200          # print statements slower than this
+SQL_N_PLUS_ONE_THRESHOLD = 10    # same statement shape this many times in one request
+METRICS_TOKEN = None             # bearer token for Prometheus; admins can always read /metrics
+
+# On-demand request profiling (see profiler.py)
+PROFILER_ENABLED = False         # profile a sample of PROFILE_ROUTES requests
+PROFILE_ROUTES = []              # endpoints, e.g. ['attendance_reports', 'view_worker_details']; [] = all
+PROFILE_SAMPLE_RATE = 0.05       # fraction of matching requests to profile
+PROFILE_INTERVAL_MS = 5          # stack sampling interval
+PROFILE_DIR = 'profiles'         # relative to backend/
+PROFILE_KEEP = 50                # newest profiled requests kept in PROFILE_DIR
+PROFILE_HEADER = 'X-Profile'     # admins can profile one request by sending this header
+
+# Templates and production mode (see template_cache.py)
+PRODUCTION_MODE = False          # no debugger/reloader; templates compiled at startup, never re-checked
+TEMPLATE_CACHE_DIR = 'template_cache'  # Jinja bytecode shared by all processes, relative to backend/; None = off
+
+# Fingerprinted static assets (see assets.py)
+ASSET_BUILD_DIR = 'build'        # relative to static/, written by `python assets.py build`
+
+# Response compression (see compression.py)
+COMPRESSION_ENABLED = True       # gzip/brotli pages, JSON and exports for clients that accept it
+COMPRESSION_MIN_SIZE = 1024      # bytes; smaller bodies are sent as they are
+COMPRESSION_GZIP_LEVEL = 6       # 1 (fastest) - 9 (smallest)
+COMPRESSION_BROTLI_QUALITY = 4   # 0 - 11; needs the brotli package
+
+# Conditional GETs on the dashboards (see versions.py)
+DATA_VERSION_FILE = 'data_versions.bin'  # shared counters, relative to backend/
+ETAG_MAX_AGE = 300               # seconds; bounds staleness from writes made outside the app
+
+# Preforking production server (see server.py)
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 5000
+SERVER_WORKERS = 0               # worker processes; 0 = one per CPU core
+SERVER_THREADS = 4               # request threads per worker, keep <= DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW
+SERVER_MAX_REQUESTS = 10000      # a worker is replaced after this many requests; 0 = never
+SERVER_MAX_REQUESTS_JITTER = 1000  # plus up to this many, so workers don't all restart together
+SERVER_GRACEFUL_TIMEOUT = 30     # seconds a stopping worker gets to finish its requests
+SERVER_KEEPALIVE = 5             # seconds an idle keep-alive connection holds a thread
+SERVER_BACKLOG = 2048            # listen queue shared by all workers
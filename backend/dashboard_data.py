@@ -0,0 +1,177 @@
+"""
+Data for the three dashboards, fetched in a single round trip each.
+
+Every dashboard used to run one query per card (8 for managers, 7 for
+admins, 4 for workers), each paying a full network round trip. Here the
+scalar counters of a dashboard are folded into one SELECT of subqueries,
+and that SELECT is sent together with the list queries as one
+multi-statement batch. The user row itself comes from the worker cache
+(see current_user in app.py), so a warm dashboard costs one round trip.
+
+The admin and manager counters can also be served from a short-TTL cache
+keyed by scope - the whole company or one department - and day. Write
+routes that move a counter invalidate its scope, the TTL covers the rest.
+
+Every function takes a cursor and returns a dict that can be passed
+straight to render_template; rows are records.Row objects.
+"""
+import records
+
+
+def run_batch(cursor, statements):
+    """Run several SELECTs in one round trip, return one row list per statement
+
+    statements are (sql, params) pairs; the SQL must not end with ';'.
+    """
+    sql = ";\n".join(s for s, _ in statements)
+    params = tuple(p for _, stmt_params in statements for p in stmt_params)
+    results = []
+    for result in cursor.execute(sql, params, multi=True):
+        if result.with_rows:
+            results.append(records.fetchall(result))
+    return results
+
+
+def counter_key(today, department=None):
+    """Cache key for the global counters, or for one department's"""
+    if department is None:
+        return ('global', today)
+    return ('department', department, today)
+
+
+def _with_counters(cursor, counts_statement, statements, cache, key, version=None):
+    """run_batch, with the counters statement only sent on a cache miss
+
+    `version` is the data version the cached counters must match.
+    Returns (counters, list_results).
+    """
+    counts = cache.get(key, version) if cache is not None else None
+    if counts is not None:
+        return counts, run_batch(cursor, statements)
+    results = run_batch(cursor, [counts_statement] + statements)
+    counts = {column: value or 0 for column, value in results[0][0].items()}
+    if cache is not None:
+        cache.set(key, counts, version)
+    return counts, results[1:]
+
+
+WORKER_ATTENDANCE_SQL = """
+    SELECT attendance_id, worker_id, date, check_in, check_out, attendance_value, working_hours
+    FROM ATTENDANCE
+    WHERE worker_id = %s AND date = %s
+"""
+
+WORKER_TASKS_SQL = """
+    SELECT task_id, worker_id, task_details, deadline, status, assigned_date
+    FROM TASK
+    WHERE worker_id = %s
+    ORDER BY deadline LIMIT 5
+"""
+
+WORKER_LATEST_SALARY_SQL = """
+    SELECT salary_id, worker_id, month, base_salary, extra_hours, bonus_amount, total_salary,
+           status
+    FROM SALARY
+    WHERE worker_id = %s
+    ORDER BY month DESC LIMIT 1
+"""
+
+
+def worker_dashboard(cursor, worker_id, today):
+    attendance, tasks, salary = run_batch(cursor, [
+        (WORKER_ATTENDANCE_SQL, (worker_id, today)),
+        (WORKER_TASKS_SQL, (worker_id,)),
+        (WORKER_LATEST_SALARY_SQL, (worker_id,)),
+    ])
+    return {
+        'attendance': attendance[0] if attendance else None,
+        'tasks': tasks,
+        'latest_salary': salary[0] if salary else None,
+    }
+
+
+MANAGER_COUNTS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM WORKER
+         WHERE department = %s AND role = 'worker' AND status = 'Active') as team_count,
+        (SELECT COUNT(*) FROM TASK t JOIN WORKER w ON t.worker_id = w.worker_id
+         WHERE w.department = %s AND t.status IN ('Pending', 'In Progress')) as pending_tasks,
+        (SELECT COUNT(DISTINCT w.worker_id) FROM ATTENDANCE a JOIN WORKER w ON a.worker_id = w.worker_id
+         WHERE w.department = %s AND a.date = %s AND a.attendance_value >= 0.5) as today_present,
+        (SELECT COUNT(*) FROM LEAVE_REQUEST lr JOIN WORKER w ON lr.worker_id = w.worker_id
+         WHERE w.department = %s AND lr.status = 'Pending') as pending_leaves
+"""
+
+MANAGER_RECENT_TASKS_SQL = """
+    SELECT w.name, t.task_details, t.status, t.deadline
+    FROM TASK t
+    JOIN WORKER w ON t.worker_id = w.worker_id
+    WHERE w.department = %s
+    ORDER BY t.deadline ASC
+    LIMIT 5
+"""
+
+MANAGER_TODAY_ATTENDANCE_SQL = """
+    SELECT w.name, a.date, a.check_in, a.check_out
+    FROM ATTENDANCE a
+    JOIN WORKER w ON a.worker_id = w.worker_id
+    WHERE w.department = %s AND a.date = %s
+    ORDER BY a.check_in DESC
+    LIMIT 5
+"""
+
+MANAGER_RECENT_LEAVES_SQL = """
+    SELECT lr.leave_id, lr.worker_id, lr.leave_type, lr.start_date, lr.end_date, lr.reason,
+           lr.status, lr.applied_date, lr.approved_by, lr.approval_date, w.name as worker_name
+    FROM LEAVE_REQUEST lr
+    JOIN WORKER w ON lr.worker_id = w.worker_id
+    WHERE w.department = %s
+    ORDER BY lr.applied_date DESC
+    LIMIT 5
+"""
+
+
+def manager_dashboard(cursor, department, today, cache=None, version=None):
+    counts, (recent_tasks, today_attendance, recent_leaves) = _with_counters(
+        cursor,
+        (MANAGER_COUNTS_SQL, (department, department, department, today, department)),
+        [(MANAGER_RECENT_TASKS_SQL, (department,)),
+         (MANAGER_TODAY_ATTENDANCE_SQL, (department, today)),
+         (MANAGER_RECENT_LEAVES_SQL, (department,))],
+        cache, counter_key(today, department), version)
+    data = dict(counts)
+    data.update(recent_tasks=recent_tasks,
+                today_attendance=today_attendance,
+                recent_leaves=recent_leaves)
+    return data
+
+
+ADMIN_COUNTS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM WORKER WHERE role = 'worker') as total_workers,
+        (SELECT COUNT(*) FROM WORKER WHERE role = 'manager') as total_managers,
+        (SELECT COUNT(*) FROM ATTENDANCE WHERE date = %s) as today_attendance,
+        (SELECT COUNT(*) FROM SUBSTITUTE_REQUEST
+         WHERE admin_approved = FALSE AND status = 'Accepted') as pending_substitutes,
+        (SELECT COUNT(*) FROM SALARY WHERE status = 'Pending') as pending_salaries
+"""
+
+ADMIN_RECENT_ATTENDANCE_SQL = """
+    SELECT w.name, a.date, a.check_in, a.check_out
+    FROM ATTENDANCE a
+    JOIN WORKER w ON a.worker_id = w.worker_id
+    WHERE a.date = %s
+    ORDER BY a.check_in DESC
+    LIMIT 5
+"""
+
+
+def admin_dashboard(cursor, today, cache=None, version=None):
+    counts, (recent_attendance,) = _with_counters(
+        cursor,
+        (ADMIN_COUNTS_SQL, (today,)),
+        [(ADMIN_RECENT_ATTENDANCE_SQL, (today,))],
+        cache, counter_key(today), version)
+    data = dict(counts)
+    data['recent_attendance'] = recent_attendance
+    return data
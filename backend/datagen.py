@@ -0,0 +1,336 @@
+"""
+Synthetic data for scale testing.
+
+Generates a plausible workforce and its history and bulk-loads it:
+
+    WORKER              --workers people over --departments departments,
+                        ~1 manager per 25 workers, a few On Leave/Inactive
+    ATTENDANCE          every working day (Fridays off) since joining, ~92%
+                        turnout, check-in around 08:00, 6-11 hours, a few
+                        half days without a check-out
+    LEAVE_REQUEST       ~1 per worker every two months, mostly Approved
+                        (no attendance on approved leave days)
+    TASK                ~3 per worker per month, status by deadline
+    SUBSTITUTE_REQUEST  occasional swaps inside a department
+    SALARY              one per finished month since joining, overtime
+                        from that month's attendance, Paid except the
+                        last month
+    PERFORMANCE         one per finished month, some with feedback
+
+Output is deterministic for a given --seed and starting database. Every
+worker gets their own random stream, so batch size and loading method do
+not change the data. Rows are added on top of whatever is already there
+(emails carry the seed and the first new worker_id, so runs never clash);
+use --reset to empty the tables first.
+
+    python datagen.py --workers 10000 --years 3
+    python datagen.py --workers 500 --years 1 --seed 7 --method load-data
+
+--method load-data streams CSV files through LOAD DATA LOCAL INFILE,
+which needs local_infile=1 on the server. The attendance rollup triggers
+fire for both methods.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import mysql.connector
+
+DEPARTMENTS = [('Construction', 30), ('Electrical', 12), ('Plumbing', 10), ('Painting', 8),
+               ('Logistics', 14), ('Maintenance', 10), ('Welding', 8), ('Carpentry', 8)]
+LEAVE_TYPES = [('Sick', 40), ('Casual', 35), ('Annual', 20), ('Emergency', 5)]
+TASKS = ['Pour foundation for block {n}', 'Wire floor {n} distribution board', 'Fix leak in unit {n}',
+         'Paint corridor {n}', 'Unload delivery {n}', 'Inspect scaffold {n}', 'Weld frame section {n}',
+         'Fit doors on floor {n}', 'Clean site area {n}', 'Service generator {n}']
+FEEDBACK = ['Reliable and on time.', 'Good work this month.', 'Needs to improve punctuality.',
+            'Excellent quality of work.', 'Helped train new workers.']
+
+TABLE_COLUMNS = {
+    'WORKER': ('name', 'email', 'password', 'contact', 'address', 'department', 'role',
+               'payment_method', 'status', 'joining_date'),
+    'ATTENDANCE': ('worker_id', 'date', 'check_in', 'check_out', 'attendance_value', 'working_hours'),
+    'LEAVE_REQUEST': ('worker_id', 'leave_type', 'start_date', 'end_date', 'reason', 'status',
+                      'applied_date', 'approved_by', 'approval_date'),
+    'TASK': ('worker_id', 'task_details', 'deadline', 'status', 'assigned_date'),
+    'SUBSTITUTE_REQUEST': ('requester_id', 'substitute_id', 'date', 'hours', 'reason', 'status',
+                           'admin_approved'),
+    'SALARY': ('worker_id', 'month', 'base_salary', 'extra_hours', 'bonus_amount', 'total_salary', 'status'),
+    'PERFORMANCE': ('worker_id', 'month', 'attendance_percentage', 'total_hours', 'manager_feedback'),
+}
+
+# Child tables first so --reset never trips a foreign key
+RESET_ORDER = ['PERFORMANCE', 'SALARY', 'SUBSTITUTE_REQUEST', 'TASK', 'LEAVE_REQUEST', 'ATTENDANCE',
+               'ATTENDANCE_WORKER_DAY', 'ATTENDANCE_DEPT_DAY', 'KIOSK_EVENT', 'WORKER']
+
+
+def weighted(rng, choices):
+    return rng.choices([c for c, _ in choices], weights=[w for _, w in choices])[0]
+
+
+def month_starts(first, last):
+    """First day of every month from `first`'s month up to (not incl.) `last`'s month"""
+    current = first.replace(day=1)
+    while current < last.replace(day=1):
+        yield current
+        current = (current + timedelta(days=32)).replace(day=1)
+
+
+# ============ LOADING ============
+
+class Loader:
+    """Buffers rows per table and writes them in batches"""
+
+    def __init__(self, db, method='insert', batch=5000):
+        self.db = db
+        self.method = method
+        self.batch = batch
+        self.buffers = {table: [] for table in TABLE_COLUMNS}
+        self.counts = {table: 0 for table in TABLE_COLUMNS}
+
+    def add(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in ([table] if table else TABLE_COLUMNS):
+            rows = self.buffers[name]
+            if not rows:
+                continue
+            if self.method == 'load-data':
+                self._load_data(name, rows)
+            else:
+                self._insert(name, rows)
+            self.counts[name] += len(rows)
+            self.buffers[name] = []
+        self.db.commit()
+
+    def _insert(self, table, rows):
+        columns = TABLE_COLUMNS[table]
+        cursor = self.db.cursor()
+        # executemany turns this into one multi-row INSERT per call
+        cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) "
+                           f"VALUES ({', '.join(['%s'] * len(columns))})", rows)
+        cursor.close()
+
+    def _load_data(self, table, rows):
+        columns = TABLE_COLUMNS[table]
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as f:
+            writer = csv.writer(f, lineterminator='\n')
+            for row in rows:
+                # With ESCAPED BY '' only the bare word NULL loads as NULL
+                # (\N would arrive as a literal two-character string)
+                writer.writerow(['NULL' if v is None else v for v in row])
+            path = f.name
+        try:
+            cursor = self.db.cursor()
+            cursor.execute(f"""
+                LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+                LINES TERMINATED BY '\\n'
+                ({', '.join(columns)})
+            """, (path,))
+            cursor.close()
+        finally:
+            os.remove(path)
+
+
+# ============ GENERATION ============
+
+def generate_workers(loader, rng, count, departments, first_id, seed, start, today):
+    names = [d for d, _ in DEPARTMENTS][:departments] or ['General']
+    weights = [w for _, w in DEPARTMENTS][:departments] or [1]
+    # Department managers first so every department has one
+    for i in range(count):
+        department = names[i] if i < len(names) else rng.choices(names, weights=weights)[0]
+        role = 'manager' if i < len(names) or rng.random() < 0.04 else 'worker'
+        joined = start + timedelta(days=int(rng.random() ** 2 * (today - start).days))
+        loader.add('WORKER', (
+            f"Worker {first_id + i}", f"w{first_id + i}.s{seed}@synthetic.local", 'password123',
+            f"01{rng.randint(300000000, 999999999)}", f"House {rng.randint(1, 200)}, Dhaka",
+            department, role, rng.choice(['Cash', 'Bank', 'bKash']),
+            weighted(rng, [('Active', 92), ('On Leave', 5), ('Inactive', 3)]), joined))
+    loader.flush('WORKER')
+
+
+def generate_history(loader, seed, worker, team, today, admin_id):
+    """Everything that hangs off one worker, from their own random stream"""
+    worker_id, joined, department = worker
+    rng = random.Random(f"{seed}-{worker_id}")
+
+    # Leave first, so attendance can skip approved leave days
+    on_leave = set()
+    day = joined + timedelta(days=rng.randint(10, 60))
+    while day < today + timedelta(days=30):
+        length = rng.randint(1, 4)
+        status = weighted(rng, [('Approved', 75), ('Rejected', 10), ('Pending', 15)])
+        if day < today - timedelta(days=14) and status == 'Pending':
+            status = 'Approved'
+        applied = day - timedelta(days=rng.randint(1, 14))
+        approved = status != 'Pending'
+        loader.add('LEAVE_REQUEST', (
+            worker_id, weighted(rng, LEAVE_TYPES), day, day + timedelta(days=length - 1), 'Personal reasons',
+            status, applied, admin_id if approved else None,
+            applied + timedelta(days=rng.randint(0, 3)) if approved else None))
+        if status == 'Approved':
+            on_leave.update(day + timedelta(days=d) for d in range(length))
+        day += timedelta(days=rng.randint(30, 90))
+
+    # Attendance, remembering per-month totals for salary and performance
+    monthly = {}
+    day = joined
+    while day <= today:
+        if day.weekday() != 4 and day not in on_leave and rng.random() < 0.92:
+            check_in = 7 * 3600 + 30 * 60 + int(rng.gauss(30, 15) * 60)
+            month = monthly.setdefault(day.strftime('%Y-%m'), [0, 0.0, 0.0])
+            if day == today or rng.random() < 0.03:
+                loader.add('ATTENDANCE', (worker_id, day, f"{check_in // 3600:02d}:{check_in % 3600 // 60:02d}:00",
+                                          None, 0.5, None))
+                month[0] += 1
+            else:
+                hours = round(min(11.0, max(6.0, rng.gauss(8.5, 1.2))), 2)
+                check_out = check_in + int(hours * 3600)
+                loader.add('ATTENDANCE', (worker_id, day, f"{check_in // 3600:02d}:{check_in % 3600 // 60:02d}:00",
+                                          f"{check_out // 3600:02d}:{check_out % 3600 // 60:02d}:00", 1.0, hours))
+                month[0] += 1
+                month[1] += hours
+                month[2] += max(0.0, hours - 8)
+        day += timedelta(days=1)
+
+    # Tasks
+    day = joined
+    while day <= today:
+        deadline = day + timedelta(days=rng.randint(2, 21))
+        if deadline < today:
+            status = weighted(rng, [('Completed', 85), ('Delayed', 10), ('In Progress', 5)])
+        else:
+            status = weighted(rng, [('Pending', 50), ('In Progress', 40), ('Completed', 10)])
+        loader.add('TASK', (worker_id, rng.choice(TASKS).format(n=rng.randint(1, 40)), deadline, status, day))
+        day += timedelta(days=rng.randint(5, 15))
+
+    # Substitute requests to a colleague
+    if len(team) > 1:
+        day = joined + timedelta(days=rng.randint(20, 120))
+        while day < today + timedelta(days=14):
+            substitute = rng.choice([w for w in team if w != worker_id][:50])
+            status = weighted(rng, [('Accepted', 60), ('Pending', 25), ('Rejected', 15)])
+            loader.add('SUBSTITUTE_REQUEST', (worker_id, substitute, day, rng.choice([2, 4, 8]),
+                                              'Family matter', status,
+                                              int(status == 'Accepted' and day < today - timedelta(days=7))))
+            day += timedelta(days=rng.randint(60, 180))
+
+    # Salary and performance for every finished month
+    base = rng.choice([18000, 20000, 22000, 25000, 28000, 32000])
+    months = list(month_starts(joined, today))
+    for i, month_start in enumerate(months):
+        key = month_start.strftime('%Y-%m')
+        days_present, total_hours, overtime = monthly.get(key, [0, 0.0, 0.0])
+        extra = round(overtime)
+        status = 'Paid' if i < len(months) - 1 else weighted(rng, [('Finalized', 50), ('Draft', 50)])
+        loader.add('SALARY', (worker_id, key, base, extra, extra * 50, base + extra * 50, status))
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        workdays = sum(1 for d in range((next_month - month_start).days)
+                       if (month_start + timedelta(days=d)).weekday() != 4)
+        loader.add('PERFORMANCE', (worker_id, key, round(100 * days_present / workdays, 2),
+                                   round(total_hours, 2),
+                                   rng.choice(FEEDBACK) if rng.random() < 0.3 else None))
+        if i > 0 and i % 12 == 0:
+            base = int(base * 1.05)
+
+
+def generate(db, workers, years, departments=8, seed=42, method='insert', batch=5000, reset=False):
+    rng = random.Random(seed)
+    today = date.today()
+    start = today - timedelta(days=int(years * 365))
+    loader = Loader(db, method, batch)
+    cursor = db.cursor()
+
+    if reset:
+        for table in RESET_ORDER:
+            cursor.execute(f"DELETE FROM {table}")
+        db.commit()
+
+    cursor.execute("SELECT COALESCE(MAX(worker_id), 0) FROM WORKER")
+    first_id = cursor.fetchone()[0] + 1
+    cursor.execute("SELECT worker_id FROM WORKER WHERE role = 'admin' ORDER BY worker_id LIMIT 1")
+    admin = cursor.fetchone()
+    if admin is None:
+        cursor.execute("""
+            INSERT INTO WORKER (name, email, password, department, role, status, joining_date)
+            VALUES ('Synthetic Admin', %s, 'password123', 'Administration', 'admin', 'Active', %s)
+        """, (f"admin.s{seed}@synthetic.local", start))
+        admin_id = cursor.lastrowid
+        first_id = admin_id + 1
+    else:
+        admin_id = admin[0]
+    db.commit()
+
+    generate_workers(loader, rng, workers, departments, first_id, seed, start, today)
+    cursor.execute("""
+        SELECT worker_id, joining_date, department FROM WORKER
+        WHERE email LIKE %s AND worker_id >= %s ORDER BY worker_id
+    """, (f"%.s{seed}@synthetic.local", first_id))
+    people = cursor.fetchall()
+    cursor.close()
+
+    teams = {}
+    for worker_id, _, department in people:
+        teams.setdefault(department, []).append(worker_id)
+
+    started = time.perf_counter()
+    for n, person in enumerate(people, 1):
+        generate_history(loader, seed, person, teams[person[2]], today, admin_id)
+        if n % 500 == 0:
+            print(f"   • {n}/{len(people)} workers ({time.perf_counter() - started:.0f}s)")
+    loader.flush()
+    return loader.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic labour data")
+    parser.add_argument('--workers', type=int, default=10000)
+    parser.add_argument('--years', type=float, default=3)
+    parser.add_argument('--departments', type=int, default=len(DEPARTMENTS))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--method', choices=['insert', 'load-data'], default='insert')
+    parser.add_argument('--batch', type=int, default=5000, help="rows per statement / file")
+    parser.add_argument('--database', help="database to load into (default: DB_CONFIG)")
+    parser.add_argument('--reset', action='store_true', help="delete existing rows first")
+    args = parser.parse_args(argv)
+
+    from config import DB_CONFIG
+    config = dict(DB_CONFIG)
+    if args.database:
+        config['database'] = args.database
+    if args.method == 'load-data':
+        config['allow_local_infile'] = True
+    try:
+        db = mysql.connector.connect(**config)
+    except mysql.connector.Error as err:
+        print(f"❌ Database Connection Error: {err}")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        counts = generate(db, args.workers, args.years, args.departments, args.seed,
+                          args.method, args.batch, args.reset)
+    except mysql.connector.Error as err:
+        print(f"❌ Load failed: {err}")
+        return 1
+    finally:
+        db.close()
+
+    print(f"✅ Loaded in {time.perf_counter() - started:.0f}s:")
+    for table, count in counts.items():
+        print(f"   • {table:<20} {count:>10,}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
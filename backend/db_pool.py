@@ -0,0 +1,219 @@
+"""
+Connection pool for the XAMPP MySQL database (or the SQLite file, see
+storage.py - pass `connect` to open something other than DB_CONFIG).
+
+Keeps a fixed number of open connections around so requests do not pay
+the TCP + auth handshake every time, lets a few extra "overflow"
+connections be opened under bursts (shift change check-ins), and makes
+callers wait up to a timeout when everything is busy.
+"""
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+
+from storage import DatabaseError
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became free within the pool timeout"""
+
+
+class PooledConnection:
+    """Wraps a real connection; close() hands it back to the pool"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._released = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._conn.cursor(*args, **kwargs)
+        return self._pool.instrument(cursor) if self._pool.instrument else cursor
+
+    @property
+    def released(self):
+        return self._released
+
+    def close(self, discard=False):
+        """Return the connection to the pool (safe to call twice)
+
+        discard=True closes it instead, for a connection left in an
+        unknown state (e.g. a result set abandoned half-read).
+        """
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self._conn, discard=discard)
+
+
+class ConnectionPool:
+    """Thread-safe connection pool with overflow, checkout timeout and stats"""
+
+    def __init__(self, db_config, size=10, max_overflow=10, timeout=5.0,
+                 pre_ping=True, recycle=3600, connect=None, instrument=None):
+        self.db_config = db_config
+        self.connect = connect or (lambda: mysql.connector.connect(**self.db_config))
+        self.instrument = instrument    # wraps every cursor handed out (sqlstats.py)
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self.recycle = recycle
+
+        self._idle = deque()          # idle connections, newest last (reused LIFO)
+        self._opened_at = {}          # id(conn) -> time the conn was opened
+        self._open_count = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+        # Stats for tuning
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._timeouts = 0
+        self._failed_pings = 0
+        self._peak_in_use = 0
+
+    # ----- Opening / closing real connections -----
+    def _open(self):
+        conn = self.connect()
+        self._opened_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._opened_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except DatabaseError:
+            pass
+
+    def _is_healthy(self, conn):
+        """Health-check a connection taken from the idle list"""
+        opened = self._opened_at.get(id(conn), 0)
+        if self.recycle and time.monotonic() - opened > self.recycle:
+            return False
+        if not self.pre_ping:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except DatabaseError:
+            self._failed_pings += 1
+            return False
+
+    # ----- Checkout / release -----
+    def get(self):
+        """Check out a connection, waiting up to `timeout` seconds"""
+        deadline = None
+        waited_since = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._open_count < self.size + self.max_overflow:
+                    # Reserve the slot now, connect outside the lock
+                    self._open_count += 1
+                    self._in_use += 1
+                    conn = None
+                    break
+
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    deadline = waited_since + self.timeout
+                    self._waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._wait_time += time.monotonic() - waited_since
+                    raise PoolTimeout(
+                        f"No database connection free after {self.timeout}s "
+                        f"(size={self.size}, overflow={self.max_overflow})")
+                self._cond.wait(remaining)
+
+            if waited_since is not None:
+                self._wait_time += time.monotonic() - waited_since
+            self._checkouts += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+
+        try:
+            if conn is not None and not self._is_healthy(conn):
+                self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = self._open()
+        except Exception:
+            with self._cond:
+                self._open_count -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return PooledConnection(self, conn)
+
+    def release(self, conn, discard=False):
+        """Give a connection back; overflow and discarded connections are closed"""
+        healthy = not discard
+        try:
+            if healthy and conn.in_transaction:
+                conn.rollback()
+        except DatabaseError:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy and len(self._idle) < self.size:
+                self._idle.append(conn)
+                conn = None
+            else:
+                self._open_count -= 1
+            self._cond.notify()
+
+        if conn is not None:
+            self._discard(conn)
+
+    def dispose(self):
+        """Close every idle connection (used on shutdown)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open_count -= len(idle)
+        for conn in idle:
+            self._discard(conn)
+
+    def forget(self):
+        """Drop every connection without closing it, in a forked child
+
+        The connections belong to the parent process; closing them here
+        would end the parent's sessions on the shared sockets.
+        """
+        self._cond = threading.Condition()
+        self._idle.clear()
+        self._opened_at.clear()
+        self._open_count = 0
+        self._in_use = 0
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'timeout': self.timeout,
+                'open': self._open_count,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'peak_in_use': self._peak_in_use,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'wait_time_total': round(self._wait_time, 4),
+                'wait_time_avg': round(self._wait_time / self._waits, 4) if self._waits else 0.0,
+                'timeouts': self._timeouts,
+                'failed_pings': self._failed_pings,
+            }
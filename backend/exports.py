@@ -0,0 +1,88 @@
+"""
+Streaming exports of raw ATTENDANCE rows (joined with WORKER).
+
+Rows are read from an unbuffered cursor in batches and turned into CSV or
+JSONL chunks by generators, so memory stays flat however long the date
+range is, and the header goes out before MySQL has finished the scan.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import timedelta
+from decimal import Decimal
+
+FETCH_BATCH = 1000
+
+ATTENDANCE_COLUMNS = ['date', 'worker_id', 'name', 'department', 'role',
+                      'check_in', 'check_out', 'attendance_value', 'working_hours']
+
+ATTENDANCE_EXPORT_SQL = """
+    SELECT a.date, a.worker_id, w.name, w.department, w.role,
+           a.check_in, a.check_out, a.attendance_value, a.working_hours
+    FROM ATTENDANCE a
+    JOIN WORKER w ON a.worker_id = w.worker_id
+    WHERE a.date BETWEEN %s AND %s
+    ORDER BY a.date
+"""
+
+
+def _plain(value):
+    """MySQL TIME comes back as timedelta; show it as HH:MM:SS"""
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def attendance_batches(cursor, start_date, end_date):
+    """Yield lists of plain-value row tuples from an unbuffered cursor"""
+    cursor.execute(ATTENDANCE_EXPORT_SQL, (start_date, end_date))
+    while True:
+        rows = cursor.fetchmany(FETCH_BATCH)
+        if not rows:
+            break
+        yield [tuple(_plain(v) for v in row) for row in rows]
+
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ATTENDANCE_COLUMNS)
+    yield buffer.getvalue().encode()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+
+
+def jsonl_chunks(batches):
+    # Nothing to send before the first row, but an empty chunk still
+    # gets the response headers out straight away
+    yield b''
+    for rows in batches:
+        yield ''.join(json.dumps(dict(zip(ATTENDANCE_COLUMNS, row)), separators=(',', ':')) + '\n'
+                      for row in rows).encode()
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a chunk stream incrementally, flushing after every chunk"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+EXPORT_FORMATS = {
+    'csv': (csv_chunks, 'text/csv'),
+    'jsonl': (jsonl_chunks, 'application/x-ndjson'),
+}
@@ -0,0 +1,260 @@
+"""
+Write-behind ingestion for check-in / check-out bursts.
+
+With INGEST_ENABLED the attendance routes do not write ATTENDANCE
+themselves. They hand the event to an Ingestor, which:
+
+1. appends it to a local journal file and fsyncs it - only then is the
+   submit acknowledged, so an accepted event survives a crash;
+2. queues it in memory; the queue is bounded, and when it is full a
+   submit waits up to INGEST_SUBMIT_TIMEOUT and then fails with
+   IngestBusy (the route answers 503) instead of letting memory grow;
+3. a background flusher takes up to INGEST_FLUSH_SIZE events at least
+   every INGEST_FLUSH_INTERVAL seconds and writes them with one
+   multi-row statement per kind (attendance.check_in_many /
+   check_out_many) in one transaction.
+
+After each committed flush the journal checkpoint moves forward, and the
+journal is truncated once everything in it has been flushed. On start
+every journaled event past the checkpoint is queued again. The writes are
+idempotent, so an event that was flushed but not yet checkpointed when
+the process died is harmless to replay.
+
+One ingesting process per journal directory.
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+import attendance
+
+KINDS = ('check_in', 'check_out')
+
+
+class IngestBusy(Exception):
+    """Raised when the queue stayed full for the whole submit timeout"""
+
+
+class Ingestor:
+    """Journaled, bounded write-behind queue for attendance events"""
+
+    def __init__(self, pool, journal_dir, queue_size=10000, flush_size=500,
+                 flush_interval=0.5, submit_timeout=2.0, on_flush=None):
+        self.pool = pool
+        self.journal_dir = journal_dir
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.submit_timeout = submit_timeout
+        self.on_flush = on_flush
+
+        self._journal_path = os.path.join(journal_dir, 'attendance.journal')
+        self._checkpoint_path = os.path.join(journal_dir, 'attendance.checkpoint')
+        self._journal = None
+        self._journal_lock = threading.Lock()
+        self._seq = 0
+        self._checkpoint = 0
+
+        self._queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._queue_size = queue_size
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Stats
+        self.submitted = 0
+        self.rejected = 0
+        self.replayed = 0
+        self.flushes = 0
+        self.flushed_events = 0
+        self.flush_errors = 0
+        self.last_flush_ms = 0.0
+
+    # ----- Journal -----
+    def _read_checkpoint(self):
+        try:
+            with open(self._checkpoint_path) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_checkpoint(self, seq):
+        tmp = self._checkpoint_path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(str(seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._checkpoint_path)
+        self._checkpoint = seq
+
+    def _replay(self):
+        """Queue every journaled event past the checkpoint; returns how many"""
+        pending = []
+        if os.path.exists(self._journal_path):
+            good = 0    # bytes up to the end of the last whole event
+            with open(self._journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise ValueError
+                        event = json.loads(line)
+                    except ValueError:
+                        break    # torn last line of a crash - never acknowledged
+                    good += len(line)
+                    self._seq = max(self._seq, event['seq'])
+                    if event['seq'] > self._checkpoint:
+                        event['replayed'] = True    # queued without taking a slot
+                        pending.append(event)
+            # Cut the torn tail off, or the next append would be glued to
+            # it and lost, with everything after it, on the next replay
+            if good < os.path.getsize(self._journal_path):
+                os.truncate(self._journal_path, good)
+        for event in pending:
+            self._queue.put(event)
+        return len(pending)
+
+    def _append(self, event):
+        # Queued under the journal lock so queue order always matches
+        # journal order - the checkpoint is the highest flushed seq
+        with self._journal_lock:
+            self._seq += 1
+            event['seq'] = self._seq
+            self._journal.write(json.dumps(event, separators=(',', ':')) + '\n')
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._queue.put(event)
+        return event
+
+    def _compact(self):
+        """Empty the journal once every event in it is flushed"""
+        with self._journal_lock:
+            if self._checkpoint == self._seq:
+                self._journal.truncate(0)
+                self._journal.seek(0)
+
+    # ----- Lifecycle -----
+    def start(self):
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._checkpoint = self._read_checkpoint()
+        self._seq = self._checkpoint
+        self.replayed = self._replay()
+        self._journal = open(self._journal_path, 'a')
+        self._thread = threading.Thread(target=self._run, name='attendance-ingest', daemon=True)
+        self._thread.start()
+        if self.replayed:
+            print(f"⏪ Replaying {self.replayed} journaled attendance events")
+        return self
+
+    def stop(self, timeout=10):
+        """Flush what is queued and stop the flusher"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._journal is not None:
+            self._journal.close()
+
+    # ----- Producer side -----
+    def submit(self, kind, worker_id, day, time_of_day):
+        """Journal and queue one event; raises IngestBusy under backpressure"""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown attendance event {kind!r}")
+        if not self._slots.acquire(timeout=self.submit_timeout):
+            self.rejected += 1
+            raise IngestBusy("Attendance queue is full")
+        event = self._append({'kind': kind, 'worker_id': int(worker_id),
+                              'date': str(day), 'time': str(time_of_day)})
+        self.submitted += 1
+        return event['seq']
+
+    # ----- Flusher -----
+    def _take_batch(self):
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        conn = self.pool.get()
+        try:
+            cursor = conn.cursor()
+            for kind, apply in (('check_in', attendance.check_in_many),
+                                ('check_out', attendance.check_out_many)):
+                apply(cursor, [(e['worker_id'], e['date'], e['time'])
+                               for e in batch if e['kind'] == kind])
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+
+    def _run(self):
+        batch = []
+        while True:
+            if not batch:
+                if self._stop.is_set() and self._queue.empty():
+                    return
+                batch = self._take_batch()
+                if not batch:
+                    continue
+            started = time.perf_counter()
+            try:
+                self._write(batch)
+            except Exception as err:
+                # Keep the batch and retry; it is still in the journal.
+                # Not just database errors: nothing may end this thread,
+                # or submits would be journaled and never written
+                self.flush_errors += 1
+                print(f"❌ Attendance flush failed ({len(batch)} events): {type(err).__name__}: {err}")
+                if self._stop.is_set():
+                    return    # still journaled, replayed on the next start
+                time.sleep(min(5.0, self.flush_interval * 4))
+                continue
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.flushes += 1
+            self.flushed_events += len(batch)
+            for event in batch:
+                if not event.get('replayed'):
+                    self._slots.release()
+            try:
+                # The rows are committed: if the checkpoint can't be saved
+                # they are only replayed (harmlessly) on the next start
+                self._write_checkpoint(max(e['seq'] for e in batch))
+                self._compact()
+            except Exception as err:
+                self.flush_errors += 1
+                print(f"❌ Attendance checkpoint after flush failed: {type(err).__name__}: {err}")
+            if self.on_flush:
+                try:
+                    self.on_flush()
+                except Exception as err:
+                    self.flush_errors += 1
+                    print(f"❌ Attendance on_flush hook failed: {type(err).__name__}: {err}")
+            batch = []
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'queue_size': self._queue_size,
+            'flush_size': self.flush_size,
+            'flush_interval': self.flush_interval,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'replayed': self.replayed,
+            'flushes': self.flushes,
+            'flushed_events': self.flushed_events,
+            'flush_errors': self.flush_errors,
+            'flusher_alive': self._thread is not None and self._thread.is_alive(),
+            'last_flush_ms': self.last_flush_ms,
+            'journal_seq': self._seq,
+            'checkpoint': self._checkpoint,
+        }
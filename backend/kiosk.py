@@ -0,0 +1,180 @@
+"""
+Batch attendance sync for the offline gate kiosks.
+
+A kiosk keeps check-in/check-out taps while it is offline and uploads
+them in one JSON request when it reconnects:
+
+    POST /api/kiosk/attendance/sync
+    X-Kiosk-Token: <one of KIOSK_API_TOKENS>
+
+    {"events": [{"event_id": "gate2-000123", "type": "check_in",
+                 "worker_id": 17, "timestamp": "2024-05-02T07:58:12"}, ...]}
+
+A timestamp without an offset is taken as the server's local time; one
+with an offset (e.g. ...T07:58:12+06:00 or Z) is converted to it.
+
+Every event gets a result, in request order:
+
+    applied              written to ATTENDANCE
+    already_checked_in   check-in for a day that already has one
+    not_checked_in       check-out without a check-in that day
+    already_checked_out  check-out for a day that already has one
+    unknown_worker       no such worker_id
+    invalid              malformed event (see "error")
+    duplicate            event_id seen before (in this batch or an earlier
+                         sync); "original" holds the first result
+
+A sync runs in one transaction: the ATTENDANCE rows it touches are
+locked, the outcome of every event is worked out in timestamp order, and
+the accepted events are written with one multi-row statement per kind
+(attendance.check_in_many / check_out_many). Event ids are recorded in
+KIOSK_EVENT (migration 0005) so a kiosk can safely resend a batch whose
+response it never got.
+"""
+from datetime import datetime
+
+import attendance
+from storage import dialect_of, skip_duplicates
+
+CREATE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS KIOSK_EVENT (
+        event_id VARCHAR(64) NOT NULL PRIMARY KEY,
+        kiosk VARCHAR(64) NOT NULL,
+        worker_id INT NULL,
+        kind VARCHAR(10) NOT NULL,
+        occurred_at DATETIME NULL,
+        result VARCHAR(20) NOT NULL,
+        received_at DATETIME NOT NULL,
+        KEY idx_kiosk_event_received (kiosk, received_at)
+    )
+    """,
+]
+
+KINDS = ('check_in', 'check_out')
+
+
+def _parse(raw):
+    """(event_id, kind, worker_id, datetime) or raise ValueError"""
+    if not isinstance(raw, dict):
+        raise ValueError("event must be an object")
+    event_id = raw.get('event_id')
+    if not isinstance(event_id, str) or not 0 < len(event_id) <= 64:
+        raise ValueError("event_id must be a string of 1-64 characters")
+    kind = raw.get('type')
+    if kind not in KINDS:
+        raise ValueError(f"type must be one of {list(KINDS)}")
+    worker_id = raw.get('worker_id')
+    if not isinstance(worker_id, int) or isinstance(worker_id, bool):
+        raise ValueError("worker_id must be an integer")
+    try:
+        occurred_at = datetime.fromisoformat(str(raw.get('timestamp')))
+    except ValueError:
+        raise ValueError("timestamp must be ISO 8601, e.g. 2024-05-02T07:58:12")
+    if occurred_at.tzinfo is not None:
+        # ATTENDANCE holds server-local wall time
+        occurred_at = occurred_at.astimezone().replace(tzinfo=None)
+    return event_id, kind, worker_id, occurred_at.replace(microsecond=0)
+
+
+def _in_list(count):
+    return ", ".join(["%s"] * count)
+
+
+def sync(db, kiosk, raw_events):
+    """Apply a batch of kiosk events in one transaction; returns per-event results"""
+    results = [None] * len(raw_events)
+    parsed = []        # (index, event_id, kind, worker_id, occurred_at)
+    seen = {}          # event_id -> (index of first occurrence, [indexes of repeats])
+    for i, raw in enumerate(raw_events):
+        try:
+            event_id, kind, worker_id, occurred_at = _parse(raw)
+        except ValueError as err:
+            event_id = raw.get('event_id') if isinstance(raw, dict) else None
+            results[i] = {'event_id': event_id, 'status': 'invalid', 'error': str(err)}
+            continue
+        if event_id in seen:
+            results[i] = {'event_id': event_id, 'status': 'duplicate', 'original': None}
+            seen[event_id][1].append(i)
+            continue
+        seen[event_id] = (i, [])
+        parsed.append((i, event_id, kind, worker_id, occurred_at))
+
+    received_at = datetime.now().replace(microsecond=0)
+    cursor = db.cursor()
+    try:
+        if parsed:
+            # Event ids already recorded by an earlier sync
+            cursor.execute(f"SELECT event_id, result FROM KIOSK_EVENT WHERE event_id IN ({_in_list(len(parsed))})",
+                           tuple(p[1] for p in parsed))
+            earlier = dict(cursor.fetchall())
+            fresh = []
+            for event in parsed:
+                if event[1] in earlier:
+                    results[event[0]] = {'event_id': event[1], 'status': 'duplicate',
+                                         'original': earlier[event[1]]}
+                else:
+                    fresh.append(event)
+            parsed = fresh
+
+        if parsed:
+            worker_ids = sorted({p[3] for p in parsed})
+            cursor.execute(f"SELECT worker_id FROM WORKER WHERE worker_id IN ({_in_list(len(worker_ids))})",
+                           tuple(worker_ids))
+            known = {row[0] for row in cursor.fetchall()}
+
+            # Lock the attendance days this batch touches
+            days = sorted({(p[3], p[4].date()) for p in parsed if p[3] in known})
+            state = {}
+            if days:
+                cursor.execute(f"""
+                    SELECT worker_id, date, check_out FROM ATTENDANCE
+                    WHERE {" OR ".join(["(worker_id = %s AND date = %s)"] * len(days))}
+                    FOR UPDATE
+                """, tuple(value for day in days for value in day))
+                for worker_id, day, check_out in cursor.fetchall():
+                    state[(worker_id, day)] = 'checked_in' if check_out is None else 'checked_out'
+
+            check_ins, check_outs = [], []
+            for i, event_id, kind, worker_id, occurred_at in sorted(parsed, key=lambda p: (p[4], p[0])):
+                key = (worker_id, occurred_at.date())
+                current = state.get(key, 'absent')
+                if worker_id not in known:
+                    status = 'unknown_worker'
+                elif kind == 'check_in':
+                    status = 'applied' if current == 'absent' else 'already_checked_in'
+                    if status == 'applied':
+                        state[key] = 'checked_in'
+                        check_ins.append((worker_id, key[1], occurred_at.time()))
+                else:
+                    status = {'absent': 'not_checked_in', 'checked_in': 'applied',
+                              'checked_out': 'already_checked_out'}[current]
+                    if status == 'applied':
+                        state[key] = 'checked_out'
+                        check_outs.append((worker_id, key[1], occurred_at.time()))
+                results[i] = {'event_id': event_id, 'status': status}
+
+            attendance.check_in_many(cursor, check_ins)
+            attendance.check_out_many(cursor, check_outs)
+
+            cursor.execute(
+                "INSERT INTO KIOSK_EVENT "
+                "(event_id, kiosk, worker_id, kind, occurred_at, result, received_at) VALUES "
+                + ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(parsed))
+                + " " + skip_duplicates(dialect_of(cursor), ['event_id']),
+                tuple(value for i, event_id, kind, worker_id, occurred_at in parsed
+                      for value in (event_id, kiosk, worker_id, kind, occurred_at,
+                                    results[i]['status'], received_at)))
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    # In-batch repeats point at the result of their first occurrence
+    for first, repeats in seen.values():
+        for i in repeats:
+            results[i]['original'] = results[first].get('original') or results[first]['status']
+    return results
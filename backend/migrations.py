@@ -0,0 +1,431 @@
+"""
+Versioned schema for the smart_labour_management database.
+
+    python migrations.py status          # which versions are applied
+    python migrations.py upgrade         # apply everything that is missing
+    python migrations.py check-queries   # EXPLAIN the registered queries
+
+Every step is written so it can run against an existing XAMPP database:
+tables use CREATE TABLE IF NOT EXISTS and indexes are only added when no
+index with the same columns exists yet. Applied versions are recorded in
+SCHEMA_MIGRATIONS.
+
+The same migrations build the SQLite backend (DB_BACKEND = 'sqlite', see
+storage.py): CREATE TABLE steps go through storage.sqlite_ddl() and steps
+that cannot be shared (the rollup triggers) are PerDialect.
+"""
+import argparse
+import sys
+from datetime import datetime
+
+import kiosk
+import rollups
+from storage import DatabaseError, connect, dialect_of, sqlite_ddl
+
+
+class AddIndex:
+    """Migration step: add an index unless an equivalent one already exists"""
+
+    def __init__(self, table, name, columns, unique=False):
+        self.table = table
+        self.name = name
+        self.columns = columns
+        self.unique = unique
+
+    def __str__(self):
+        kind = "UNIQUE INDEX" if self.unique else "INDEX"
+        return f"CREATE {kind} {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+    def existing_indexes(self, cursor):
+        """{index name: (non_unique, [columns])} for the table"""
+        if dialect_of(cursor) == 'sqlite':
+            cursor.execute(f"PRAGMA index_list({self.table})")
+            indexes = {}
+            for _, index_name, unique, *_ in cursor.fetchall():
+                cursor.execute(f"PRAGMA index_info({index_name})")
+                indexes[index_name] = (not unique, [row[2].lower() for row in cursor.fetchall()])
+            return indexes
+        cursor.execute("""
+            SELECT index_name, non_unique, column_name
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s
+            ORDER BY index_name, seq_in_index
+        """, (self.table,))
+        indexes = {}
+        for index_name, non_unique, column_name in cursor.fetchall():
+            indexes.setdefault(index_name, (non_unique, []))[1].append(column_name.lower())
+        return indexes
+
+    def duplicates(self, cursor):
+        cols = ', '.join(self.columns)
+        cursor.execute(f"""
+            SELECT {cols}, COUNT(*) FROM {self.table}
+            GROUP BY {cols} HAVING COUNT(*) > 1 LIMIT 5
+        """)
+        return cursor.fetchall()
+
+    def apply(self, cursor):
+        wanted = [c.lower() for c in self.columns]
+        for name, (non_unique, columns) in self.existing_indexes(cursor).items():
+            if columns == wanted and (not self.unique or not non_unique):
+                return f"   • {self.table}({', '.join(self.columns)}) already indexed as {name}"
+
+        if self.unique:
+            dupes = self.duplicates(cursor)
+            if dupes:
+                raise MigrationError(
+                    f"{self.table} has duplicate ({', '.join(self.columns)}) rows, "
+                    f"e.g. {dupes} - clean them up before adding {self.name}")
+
+        cursor.execute(str(self))
+        return f"   • added {self.name}"
+
+
+class DropIndex:
+    """Migration step: drop an index if it exists"""
+
+    def __init__(self, table, name):
+        self.table = table
+        self.name = name
+
+    def __str__(self):
+        return f"DROP INDEX {self.name} ON {self.table}"
+
+    def apply(self, cursor):
+        if dialect_of(cursor) == 'sqlite':
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name = %s",
+                           (self.name,))
+            if not cursor.fetchone()[0]:
+                return f"   • {self.table}.{self.name} not present"
+            cursor.execute(f"DROP INDEX {self.name}")
+            return f"   • dropped {self.name}"
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (self.table, self.name))
+        if not cursor.fetchone()[0]:
+            return f"   • {self.table}.{self.name} not present"
+        cursor.execute(str(self))
+        return f"   • dropped {self.name}"
+
+
+class PerDialect:
+    """Migration step: SQL that has to be written per storage backend"""
+
+    def __init__(self, **statements):
+        self.statements = statements
+
+    def apply(self, cursor):
+        dialect = dialect_of(cursor)
+        for sql in self.statements[dialect]:
+            cursor.execute(sql)
+        return f"   • {len(self.statements[dialect])} {dialect} statement(s)"
+
+
+class MigrationError(Exception):
+    pass
+
+
+# ============ SCHEMA ============
+
+BASE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS WORKER (
+        worker_id INT AUTO_INCREMENT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        email VARCHAR(100) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        contact VARCHAR(20),
+        address VARCHAR(255),
+        department VARCHAR(100) DEFAULT 'General',
+        role VARCHAR(20) NOT NULL DEFAULT 'worker',
+        payment_method VARCHAR(50) DEFAULT 'Cash',
+        status VARCHAR(20) NOT NULL DEFAULT 'Active',
+        joining_date DATE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ATTENDANCE (
+        attendance_id INT AUTO_INCREMENT PRIMARY KEY,
+        worker_id INT NOT NULL,
+        date DATE NOT NULL,
+        check_in TIME,
+        check_out TIME,
+        attendance_value DECIMAL(3,1) DEFAULT 0,
+        working_hours DECIMAL(5,2),
+        FOREIGN KEY (worker_id) REFERENCES WORKER(worker_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS TASK (
+        task_id INT AUTO_INCREMENT PRIMARY KEY,
+        worker_id INT NOT NULL,
+        task_details TEXT,
+        deadline DATE,
+        status VARCHAR(20) NOT NULL DEFAULT 'Pending',
+        assigned_date DATE,
+        FOREIGN KEY (worker_id) REFERENCES WORKER(worker_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS LEAVE_REQUEST (
+        leave_id INT AUTO_INCREMENT PRIMARY KEY,
+        worker_id INT NOT NULL,
+        leave_type VARCHAR(50),
+        start_date DATE,
+        end_date DATE,
+        reason TEXT,
+        status VARCHAR(20) NOT NULL DEFAULT 'Pending',
+        applied_date DATE,
+        approved_by INT NULL,
+        approval_date DATE NULL,
+        FOREIGN KEY (worker_id) REFERENCES WORKER(worker_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS SALARY (
+        salary_id INT AUTO_INCREMENT PRIMARY KEY,
+        worker_id INT NOT NULL,
+        month VARCHAR(7) NOT NULL,
+        base_salary DECIMAL(10,2) DEFAULT 0,
+        extra_hours INT DEFAULT 0,
+        bonus_amount DECIMAL(10,2) DEFAULT 0,
+        total_salary DECIMAL(10,2) DEFAULT 0,
+        status VARCHAR(20) NOT NULL DEFAULT 'Draft',
+        FOREIGN KEY (worker_id) REFERENCES WORKER(worker_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS SUBSTITUTE_REQUEST (
+        sub_id INT AUTO_INCREMENT PRIMARY KEY,
+        requester_id INT NOT NULL,
+        substitute_id INT NOT NULL,
+        date DATE,
+        hours DECIMAL(4,1),
+        reason TEXT,
+        status VARCHAR(20) NOT NULL DEFAULT 'Pending',
+        admin_approved BOOLEAN NOT NULL DEFAULT FALSE,
+        FOREIGN KEY (requester_id) REFERENCES WORKER(worker_id),
+        FOREIGN KEY (substitute_id) REFERENCES WORKER(worker_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS PERFORMANCE (
+        performance_id INT AUTO_INCREMENT PRIMARY KEY,
+        worker_id INT NOT NULL,
+        month VARCHAR(7) NOT NULL,
+        attendance_percentage DECIMAL(5,2) DEFAULT 0,
+        total_hours DECIMAL(7,2) DEFAULT 0,
+        manager_feedback TEXT,
+        FOREIGN KEY (worker_id) REFERENCES WORKER(worker_id)
+    )
+    """,
+]
+
+# Indexes the queries in app.py rely on
+QUERY_INDEXES = [
+    # Login
+    AddIndex('WORKER', 'uq_worker_email', ['email'], unique=True),
+    # Every manager page filters its team this way
+    AddIndex('WORKER', 'idx_worker_dept_role_status', ['department', 'role', 'status']),
+    # check-in / check-out, history pages
+    AddIndex('ATTENDANCE', 'idx_attendance_worker_date', ['worker_id', 'date']),
+    # "today" counters and date-range reports
+    AddIndex('ATTENDANCE', 'idx_attendance_date', ['date']),
+    AddIndex('TASK', 'idx_task_worker_status', ['worker_id', 'status']),
+    AddIndex('TASK', 'idx_task_worker_deadline', ['worker_id', 'deadline']),
+    AddIndex('LEAVE_REQUEST', 'idx_leave_worker_status_start', ['worker_id', 'status', 'start_date']),
+    AddIndex('LEAVE_REQUEST', 'idx_leave_status_applied', ['status', 'applied_date']),
+    AddIndex('SALARY', 'uq_salary_worker_month', ['worker_id', 'month'], unique=True),
+    AddIndex('SALARY', 'idx_salary_month_status', ['month', 'status']),
+    AddIndex('PERFORMANCE', 'uq_performance_worker_month', ['worker_id', 'month'], unique=True),
+    AddIndex('SUBSTITUTE_REQUEST', 'idx_sub_requester_date', ['requester_id', 'date']),
+    AddIndex('SUBSTITUTE_REQUEST', 'idx_sub_substitute_date', ['substitute_id', 'date']),
+    AddIndex('SUBSTITUTE_REQUEST', 'idx_sub_status_approved', ['status', 'admin_approved']),
+]
+
+# (version, name, steps) - steps are SQL strings or objects with apply(cursor)
+MIGRATIONS = [
+    (1, 'base schema', BASE_SCHEMA),
+    (2, 'indexes for app queries', QUERY_INDEXES),
+    (3, 'attendance rollup tables', rollups.CREATE_TABLES),
+    (4, 'one attendance row per worker per day', [
+        AddIndex('ATTENDANCE', 'uq_attendance_worker_date', ['worker_id', 'date'], unique=True),
+        DropIndex('ATTENDANCE', 'idx_attendance_worker_date'),
+        PerDialect(mysql=rollups.CREATE_TRIGGERS, sqlite=rollups.SQLITE_TRIGGERS),
+    ]),
+    (5, 'kiosk sync event log', kiosk.CREATE_TABLES),
+]
+
+
+# ============ QUERIES TO CHECK ============
+# Representative queries from app.py with sample parameters. `check-queries`
+# EXPLAINs each one and reports the ones that still scan a whole table.
+# They are the statements the routes run, column lists included; paginated
+# ones as their first page (keyset 1=1, LIMIT PAGE_SIZE_DEFAULT + 1).
+REGISTERED_QUERIES = [
+    ('login',
+     "SELECT worker_id, name, role FROM WORKER WHERE email = %s AND password = %s", ('a@b.c', 'x')),
+    ('current_user',
+     """SELECT worker_id, name, email, contact, address, department, role, payment_method, status,
+        joining_date FROM WORKER WHERE worker_id=%s""", (1,)),
+    ('attendance.day_status',
+     "SELECT check_out FROM ATTENDANCE WHERE worker_id = %s AND date = %s", (1, '2024-01-01')),
+    ('worker_tasks',
+     """SELECT task_id, worker_id, task_details, deadline, status, assigned_date
+        FROM TASK WHERE worker_id=%s AND 1=1 ORDER BY deadline ASC, task_id ASC LIMIT %s""", (1, 51)),
+    ('worker_leave.taken',
+     """SELECT COUNT(*) as taken FROM LEAVE_REQUEST WHERE worker_id = %s AND status = 'Approved'
+        AND start_date >= %s AND start_date < %s""", (1, '2024-01-01', '2025-01-01')),
+    ('worker_salary',
+     """SELECT salary_id, worker_id, month, base_salary, extra_hours, bonus_amount, total_salary, status
+        FROM SALARY WHERE worker_id=%s AND 1=1 ORDER BY month DESC, salary_id DESC LIMIT %s""", (1, 51)),
+    ('worker_substitute.mine',
+     """SELECT sr.sub_id, sr.requester_id, sr.substitute_id, sr.date, sr.hours, sr.reason,
+               sr.status, sr.admin_approved, w.name as substitute_name, w.department
+        FROM SUBSTITUTE_REQUEST sr LEFT JOIN WORKER w ON sr.substitute_id = w.worker_id
+        WHERE sr.requester_id = %s ORDER BY date DESC""", (1,)),
+    ('admin_dashboard.today',
+     "SELECT COUNT(*) FROM ATTENDANCE WHERE date = %s", ('2024-01-01',)),
+    ('admin_approve_leave.pending',
+     """SELECT lr.leave_id, lr.worker_id, lr.leave_type, lr.start_date, lr.end_date, lr.reason,
+               lr.status, lr.applied_date, w.name as worker_name, w.department, a.name as approved_by_name
+        FROM LEAVE_REQUEST lr JOIN WORKER w ON lr.worker_id = w.worker_id
+        LEFT JOIN WORKER a ON lr.approved_by = a.worker_id
+        WHERE lr.status = 'Pending' AND 1=1 ORDER BY lr.applied_date DESC, lr.leave_id DESC LIMIT %s""",
+     (51,)),
+    ('salary_management',
+     """SELECT s.salary_id, s.worker_id, s.month, s.base_salary, s.extra_hours, s.bonus_amount,
+               s.total_salary, s.status, w.name, w.department, w.contact
+        FROM SALARY s JOIN WORKER w ON s.worker_id = w.worker_id
+        WHERE s.month = %s AND 1=1 ORDER BY w.department ASC, w.name ASC, s.salary_id ASC LIMIT %s""",
+     ('2024-01', 51)),
+    ('manager.team',
+     """SELECT worker_id, name, department FROM WORKER WHERE department = %s AND role = 'worker'
+        AND status = 'Active' ORDER BY name""", ('General',)),
+    ('manager.pending_tasks',
+     """SELECT COUNT(*) FROM TASK t JOIN WORKER w ON t.worker_id = w.worker_id
+        WHERE w.department = %s AND t.status IN ('Pending', 'In Progress')""", ('General',)),
+    ('attendance_reports.daily',
+     """SELECT date, SUM(checkins) as total_checkins, SUM(attendance_total) as total_attendance,
+               SUM(hours_total) / NULLIF(SUM(hours_count), 0) as avg_hours
+        FROM ATTENDANCE_DEPT_DAY WHERE date BETWEEN %s AND %s
+        GROUP BY date ORDER BY date DESC""", ('2024-01-01', '2024-01-31')),
+    ('worker_attendance.monthly',
+     """SELECT month, COUNT(*) as total_days, SUM(attendance_value) as attendance_days,
+               AVG(working_hours) as avg_hours
+        FROM ATTENDANCE_WORKER_DAY WHERE worker_id = %s
+        GROUP BY month ORDER BY month DESC LIMIT 6""", (1,)),
+]
+
+
+# ============ RUNNER ============
+
+def ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SCHEMA_MIGRATIONS (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+
+
+def applied_versions(cursor):
+    ensure_version_table(cursor)
+    cursor.execute("SELECT version FROM SCHEMA_MIGRATIONS")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def upgrade(db, target=None):
+    """Apply every migration not yet recorded, in version order"""
+    cursor = db.cursor(buffered=True)
+    done = applied_versions(cursor)
+    applied = []
+
+    for version, name, steps in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        print(f"⏫ {version:04d} {name}")
+        for step in steps:
+            if hasattr(step, 'apply'):
+                print(step.apply(cursor))
+            elif dialect_of(cursor) == 'sqlite':
+                for sql in sqlite_ddl(step):
+                    cursor.execute(sql)
+            else:
+                cursor.execute(step)
+        cursor.execute("INSERT INTO SCHEMA_MIGRATIONS (version, name, applied_at) VALUES (%s, %s, %s)",
+                       (version, name, datetime.now().replace(microsecond=0)))
+        db.commit()
+        applied.append(version)
+
+    cursor.close()
+    return applied
+
+
+def status(db):
+    cursor = db.cursor(buffered=True)
+    done = applied_versions(cursor)
+    cursor.close()
+    return [(version, name, version in done) for version, name, _ in MIGRATIONS]
+
+
+def check_queries(db):
+    """EXPLAIN every registered query; return [(name, table, rows)] full scans"""
+    cursor = db.cursor(dictionary=True, buffered=True)
+    full_scans = []
+    sqlite = dialect_of(cursor) == 'sqlite'
+    for name, sql, params in REGISTERED_QUERIES:
+        if sqlite:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            for row in cursor.fetchall():
+                # "SCAN WORKER" is a full scan, "SCAN t USING INDEX ..." is not
+                if row['detail'].startswith('SCAN ') and ' USING ' not in row['detail']:
+                    full_scans.append((name, row['detail'].split()[1], '?'))
+            continue
+        cursor.execute("EXPLAIN " + sql, params)
+        for row in cursor.fetchall():
+            if row['type'] == 'ALL':
+                full_scans.append((name, row['table'], row['rows']))
+    cursor.close()
+    return full_scans
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Schema migrations for the labour database")
+    sub = parser.add_subparsers(dest='command', required=True)
+    up = sub.add_parser('upgrade', help="apply pending migrations")
+    up.add_argument('--to', type=int, help="stop after this version")
+    sub.add_parser('status', help="list migrations and whether they are applied")
+    sub.add_parser('check-queries', help="report registered queries that do full table scans")
+    args = parser.parse_args(argv)
+
+    try:
+        db = connect()
+    except DatabaseError as err:
+        print(f"❌ Database Connection Error: {err}")
+        return 1
+
+    try:
+        if args.command == 'upgrade':
+            applied = upgrade(db, args.to)
+            print(f"✅ Applied {len(applied)} migration(s)" if applied else "✅ Schema is up to date")
+        elif args.command == 'status':
+            for version, name, is_applied in status(db):
+                print(f"   {'✅' if is_applied else '⬜'} {version:04d} {name}")
+        else:
+            full_scans = check_queries(db)
+            for name, table, rows in full_scans:
+                print(f"   ⚠️  {name}: full scan of {table} (~{rows} rows)")
+            print(f"{len(full_scans)} full scan(s) in {len(REGISTERED_QUERIES)} registered queries")
+    except (*DatabaseError, MigrationError) as err:
+        print(f"❌ Migration failed: {err}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Keyset (cursor) pagination for the list pages.
+
+A page is fetched with `WHERE <filters> AND <keyset> ORDER BY <keys> LIMIT n+1`
+where <keyset> means "strictly after the last row of the previous page".
+The sort keys of that last row travel to the browser as an opaque token
+(`?after=...`), so page N costs the same as page 1 no matter how deep it is.
+
+The last sort key must be unique (a primary key) so ties never skip or
+repeat rows. Other keys may be NULL (TASK.deadline, WORKER.department):
+MySQL and SQLite both sort NULLs first ascending and last descending, and
+the predicate compares them with IS NULL / IS NOT NULL to match.
+"""
+import base64
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import records
+from config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+
+
+class Page:
+    """One page of rows plus the token for the next one (None on the last page)"""
+
+    def __init__(self, items, next_token, limit):
+        self.items = items
+        self.next_token = next_token
+        self.limit = limit
+
+    @property
+    def has_more(self):
+        return self.next_token is not None
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return str(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_token(values):
+    raw = json.dumps([_plain(v) for v in values], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_token(token, key_count):
+    """Sort-key values from a token, or None for a missing/garbled token"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != key_count:
+        return None
+    return values
+
+
+def page_size(value, default=PAGE_SIZE_DEFAULT):
+    """Clamp a ?limit= argument to 1..PAGE_SIZE_MAX"""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, PAGE_SIZE_MAX))
+
+
+def _equal(expr, value):
+    if value is None:
+        return f"{expr} IS NULL", []
+    return f"{expr} = %s", [value]
+
+
+def _after(expr, direction, value):
+    """SQL + params for "expr sorts strictly after value", or None if nothing can"""
+    if direction == 'DESC':
+        if value is None:
+            return None                     # NULLs come last
+        return f"({expr} < %s OR {expr} IS NULL)", [value]
+    if value is None:
+        return f"{expr} IS NOT NULL", []    # NULLs come first
+    return f"{expr} > %s", [value]
+
+
+def keyset_predicate(keys, values):
+    """SQL + params for "row comes after `values`" under the ORDER BY `keys`
+
+    keys are (sql_expression, result_column, 'ASC' | 'DESC'). Expanded to
+    a < x OR (a = x AND b < y) ... which MySQL can run as an index range;
+    a NULL value becomes IS NULL / IS NOT NULL.
+    """
+    clauses = []
+    params = []
+    for i, (expr, _, direction) in enumerate(keys):
+        after = _after(expr, direction, values[i])
+        if after is None:
+            continue
+        parts, clause_params = [], []
+        for (prev_expr, _, _), value in zip(keys[:i], values[:i]):
+            sql, p = _equal(prev_expr, value)
+            parts.append(sql)
+            clause_params.extend(p)
+        parts.append(after[0])
+        clause_params.extend(after[1])
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(clause_params)
+    if not clauses:
+        return "1=0", []
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def paginate(cursor, sql, params, keys, token=None, limit=PAGE_SIZE_DEFAULT):
+    """Run `sql` one page at a time
+
+    `sql` is the query without ORDER BY / LIMIT and contains a `{keyset}`
+    marker inside its WHERE clause; the marker must come after every
+    other %s placeholder. Rows come back as records.Row objects.
+    """
+    values = decode_token(token, len(keys))
+    if values is None:
+        where, keyset_params = "1=1", []
+    else:
+        where, keyset_params = keyset_predicate(keys, values)
+
+    order_by = ", ".join(f"{expr} {direction}" for expr, _, direction in keys)
+    cursor.execute(sql.format(keyset=where) + f" ORDER BY {order_by} LIMIT %s",
+                   tuple(params) + tuple(keyset_params) + (limit + 1,))
+    rows = records.fetchall(cursor)
+
+    next_token = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_token = encode_token([rows[-1][column] for _, column, _ in keys])
+    return Page(rows, next_token, limit)
@@ -0,0 +1,150 @@
+"""
+Monthly payroll runs.
+
+A run creates a Draft SALARY row for every active worker for one month in
+a single INSERT ... SELECT. It computes overtime from that month's ATTENDANCE
+working hours:
+
+    extra_hours  = hours worked beyond PAYROLL_STANDARD_HOURS on each day
+    bonus_amount = extra_hours * PAYROLL_OVERTIME_RATE
+    base_salary  = the worker's base salary from their latest earlier
+                   SALARY row, or PAYROLL_DEFAULT_BASE_SALARY
+
+Re-running a month is safe: the unique (worker_id, month) key turns
+existing rows into updates, and only rows that are still Draft are
+recomputed. Finalized and Paid salaries are never touched.
+
+    python payroll.py run 2024-05
+    python payroll.py status 2024-05 Finalized
+"""
+import argparse
+import re
+import sys
+from datetime import datetime, timedelta
+
+from config import (PAYROLL_STANDARD_HOURS, PAYROLL_OVERTIME_RATE,
+                    PAYROLL_DEFAULT_BASE_SALARY)
+from storage import DatabaseError, connect, dialect_of, upsert
+
+# Allowed whole-run status moves
+NEXT_STATUS = {'Finalized': 'Draft', 'Paid': 'Finalized'}
+
+MONTH_RE = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+# Re-running a month only recomputes the rows that are still Draft
+REFRESH_DRAFT = {
+    column: f"CASE WHEN SALARY.status = 'Draft' THEN NEW({column}) ELSE SALARY.{column} END"
+    for column in ('base_salary', 'extra_hours', 'bonus_amount', 'total_salary')
+}
+
+
+def month_range(month):
+    """'2024-05' -> ('2024-05-01', '2024-06-01')"""
+    if not MONTH_RE.match(month or ''):
+        raise ValueError(f"Month must look like YYYY-MM, got {month!r}")
+    first = datetime.strptime(month, '%Y-%m').date()
+    next_first = (first + timedelta(days=32)).replace(day=1)
+    return first.strftime('%Y-%m-%d'), next_first.strftime('%Y-%m-%d')
+
+
+def run_payroll(db, month):
+    """Create/refresh Draft salaries for every eligible worker; returns counts"""
+    start, end = month_range(month)
+    cursor = db.cursor()
+
+    cursor.execute("SELECT COUNT(*) FROM SALARY WHERE month = %s", (month,))
+    before = cursor.fetchone()[0]
+
+    cursor.execute(f"""
+        INSERT INTO SALARY
+            (worker_id, month, base_salary, extra_hours, bonus_amount, total_salary, status)
+        SELECT w.worker_id,
+               %s,
+               COALESCE(b.base_salary, %s),
+               ROUND(COALESCE(o.extra_hours, 0)),
+               ROUND(COALESCE(o.extra_hours, 0)) * %s,
+               COALESCE(b.base_salary, %s) + ROUND(COALESCE(o.extra_hours, 0)) * %s,
+               'Draft'
+        FROM WORKER w
+        LEFT JOIN (
+            SELECT worker_id,
+                   SUM(CASE WHEN working_hours > %s THEN working_hours - %s ELSE 0 END) as extra_hours
+            FROM ATTENDANCE
+            WHERE date >= %s AND date < %s AND working_hours IS NOT NULL
+            GROUP BY worker_id
+        ) o ON o.worker_id = w.worker_id
+        LEFT JOIN (
+            SELECT s.worker_id, s.base_salary
+            FROM SALARY s
+            JOIN (
+                SELECT worker_id, MAX(month) as month
+                FROM SALARY
+                WHERE month < %s
+                GROUP BY worker_id
+            ) latest ON latest.worker_id = s.worker_id AND latest.month = s.month
+        ) b ON b.worker_id = w.worker_id
+        WHERE w.role = 'worker' AND w.status = 'Active'
+        {upsert(dialect_of(cursor), ['worker_id', 'month'], REFRESH_DRAFT)}
+    """, (month,
+          PAYROLL_DEFAULT_BASE_SALARY, PAYROLL_OVERTIME_RATE,
+          PAYROLL_DEFAULT_BASE_SALARY, PAYROLL_OVERTIME_RATE,
+          PAYROLL_STANDARD_HOURS, PAYROLL_STANDARD_HOURS, start, end,
+          month))
+
+    cursor.execute("SELECT COUNT(*) FROM SALARY WHERE month = %s", (month,))
+    after = cursor.fetchone()[0]
+
+    db.commit()
+    cursor.close()
+    return {'created': after - before, 'existing': before, 'total': after}
+
+
+def set_run_status(db, month, new_status):
+    """Move every salary of `month` one step (Draft -> Finalized -> Paid)"""
+    month_range(month)
+    if new_status not in NEXT_STATUS:
+        raise ValueError(f"Run status must be one of {sorted(NEXT_STATUS)}")
+
+    cursor = db.cursor()
+    cursor.execute("UPDATE SALARY SET status = %s WHERE month = %s AND status = %s",
+                   (new_status, month, NEXT_STATUS[new_status]))
+    updated = cursor.rowcount
+    db.commit()
+    cursor.close()
+    return updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monthly payroll runs")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_cmd = sub.add_parser('run', help="create Draft salaries for a month")
+    run_cmd.add_argument('month', help="YYYY-MM")
+    status_cmd = sub.add_parser('status', help="move a whole month to Finalized or Paid")
+    status_cmd.add_argument('month', help="YYYY-MM")
+    status_cmd.add_argument('status', choices=sorted(NEXT_STATUS))
+    args = parser.parse_args(argv)
+
+    try:
+        db = connect()
+    except DatabaseError as err:
+        print(f"❌ Database Connection Error: {err}")
+        return 1
+
+    try:
+        if args.command == 'run':
+            result = run_payroll(db, args.month)
+            print(f"✅ Payroll {args.month}: {result['created']} new Draft salaries "
+                  f"({result['total']} records for the month)")
+        else:
+            updated = set_run_status(db, args.month, args.status)
+            print(f"✅ Payroll {args.month}: {updated} salaries moved to {args.status}")
+    except (ValueError, *DatabaseError) as err:
+        print(f"❌ Payroll failed: {err}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+On-demand profiling of live requests.
+
+Off by default and close to free when off: one dict lookup per request.
+A request is profiled when
+
+- PROFILER_ENABLED is on, its endpoint is in PROFILE_ROUTES (or the list
+  is empty) and it falls in the PROFILE_SAMPLE_RATE fraction, or
+- a logged-in admin sends the PROFILE_HEADER header (X-Profile: 1), which
+  profiles that one request whatever the settings.
+
+While a request is profiled it runs under cProfile, and a shared sampler
+thread reads its stack every PROFILE_INTERVAL_MS. Each profiled request
+leaves three files in PROFILE_DIR:
+
+    <time>_<endpoint>.prof     cProfile stats: python -m pstats / snakeviz
+    <time>_<endpoint>.folded   sampled stacks, one "a;b;c count" per line:
+                               flamegraph.pl or speedscope
+    <time>_<endpoint>.json     wall time and the sampled split between
+                               SQL (driver code), Jinja (jinja2 and the
+                               compiled templates) and other Python
+
+Only the newest PROFILE_KEEP requests are kept.
+"""
+import cProfile
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# A frame from one of these files counts its sample as SQL / Jinja time;
+# the innermost matching frame wins
+SQL_MARKERS = (os.sep + 'mysql' + os.sep + 'connector' + os.sep, os.sep + 'sqlite3' + os.sep,
+               os.sep + 'storage.py', os.sep + 'sqlstats.py')
+JINJA_MARKERS = (os.sep + 'jinja2' + os.sep, '.html')
+
+
+def classify(frame):
+    """'sql', 'jinja' or 'python' for a sampled stack"""
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if any(marker in filename for marker in SQL_MARKERS):
+            return 'sql'
+        if any(marker in filename for marker in JINJA_MARKERS):
+            return 'jinja'
+        frame = frame.f_back
+    return 'python'
+
+
+def fold(frame):
+    """Stack as 'outer;...;inner' for the folded flamegraph format"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class Session:
+    """One profiled request"""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stacks = Counter()
+        self.split = Counter()
+        self.profile = cProfile.Profile()
+
+
+class Profiler:
+    def __init__(self, output_dir, enabled=False, routes=(), sample_rate=0.05,
+                 interval_ms=5, keep=50, header='X-Profile'):
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.routes = set(routes)
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.keep = keep
+        self.header = header
+
+        self._sessions = {}            # thread id -> Session
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.profiled = 0
+
+    # ----- Deciding -----
+    def wanted(self, endpoint, headers, is_admin):
+        """Should this request be profiled?"""
+        if is_admin and headers.get(self.header):
+            return True
+        if not self.enabled or (self.routes and endpoint not in self.routes):
+            return False
+        return random.random() < self.sample_rate
+
+    # ----- Per request -----
+    def start(self, endpoint):
+        session = Session(endpoint or 'unmatched')
+        with self._lock:
+            self._sessions[threading.get_ident()] = session
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample, name='profiler-sampler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        try:
+            session.profile.enable()
+        except ValueError:
+            session.profile = None    # another profiler owns the interpreter; samples only
+
+    def stop(self):
+        """Finish the current thread's session and write its files"""
+        if not self._sessions:
+            return None
+        with self._lock:
+            session = self._sessions.pop(threading.get_ident(), None)
+        if session is None:
+            return None
+        if session.profile is not None:
+            session.profile.disable()
+        wall_ms = (time.perf_counter() - session.started) * 1000
+        self.profiled += 1
+        return self._write(session, wall_ms)
+
+    # ----- Sampler thread -----
+    def _sample(self):
+        while True:
+            if not self._sessions:
+                self._wake.clear()
+                self._wake.wait()
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, session in self._sessions.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        session.stacks[fold(frame)] += 1
+                        session.split[classify(frame)] += 1
+            del frames
+            time.sleep(self.interval)
+
+    # ----- Output -----
+    def _write(self, session, wall_ms):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        base = os.path.join(self.output_dir, f"{stamp}_{session.endpoint}")
+
+        if session.profile is not None:
+            session.profile.dump_stats(base + '.prof')
+        with open(base + '.folded', 'w') as f:
+            for stack, count in session.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        samples = sum(session.split.values())
+        summary = {
+            'endpoint': session.endpoint,
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'wall_ms': round(wall_ms, 2),
+            'samples': samples,
+            'interval_ms': self.interval * 1000,
+            # share of samples, scaled to the wall time
+            'split_ms': {kind: round(wall_ms * session.split[kind] / samples, 2) if samples else 0.0
+                         for kind in ('sql', 'jinja', 'python')},
+        }
+        with open(base + '.json', 'w') as f:
+            json.dump(summary, f, indent=2)
+        self._rotate()
+        return summary
+
+    def _rotate(self):
+        """Keep the newest `keep` profiled requests"""
+        runs = sorted(name[:-len('.json')] for name in os.listdir(self.output_dir) if name.endswith('.json'))
+        for run in runs[:-self.keep] if self.keep else []:
+            for ext in ('.prof', '.folded', '.json'):
+                try:
+                    os.remove(os.path.join(self.output_dir, run + ext))
+                except OSError:
+                    pass
+
+    def recent(self, limit=20):
+        """Summaries of the newest profiles, newest first"""
+        if not os.path.isdir(self.output_dir):
+            return []
+        names = sorted((n for n in os.listdir(self.output_dir) if n.endswith('.json')), reverse=True)
+        summaries = []
+        for name in names[:limit]:
+            try:
+                with open(os.path.join(self.output_dir, name)) as f:
+                    summaries.append(dict(json.load(f), file=name[:-len('.json')]))
+            except (OSError, ValueError):
+                continue
+        return summaries
+
+    def settings(self):
+        return {
+            'enabled': self.enabled,
+            'routes': sorted(self.routes),
+            'sample_rate': self.sample_rate,
+            'interval_ms': self.interval * 1000,
+            'keep': self.keep,
+            'header': self.header,
+            'output_dir': self.output_dir,
+            'profiled': self.profiled,
+        }
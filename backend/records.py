@@ -0,0 +1,121 @@
+"""
+Compact, read-only rows for query results.
+
+A dictionary cursor builds one dict per row, holding its own hash table
+of column names, and `SELECT *` put every column in it - WORKER's
+password included. The handlers now select explicit column lists and
+read rows from a plain cursor through fetchall()/fetchone() here, which
+wrap each row tuple in a Row class:
+
+- a Row is the tuple the driver returned (no per-row dict); the column
+  names live once on the class, one class per column list;
+- it reads like the dict rows did, so templates and handlers are
+  unchanged: row['name'], row.name (what Jinja tries first), row.get(),
+  'name' in row, dict(row), row.items();
+- it is immutable; build a dict (dict(row)) to change values, and to
+  jsonify one (a tuple serializes as a JSON array).
+
+The tables have named classes with their column lists (Worker,
+Attendance, ...); any other column list (joins, aggregates) gets a class
+on first use. TABLE_COLUMNS is each table's SELECT list - WORKER's leaves
+out password, which only the password checks select, by name.
+"""
+from operator import itemgetter
+
+# Column order of each table as the handlers select it
+TABLE_COLUMNS = {
+    'WORKER': ('worker_id', 'name', 'email', 'contact', 'address', 'department', 'role',
+               'payment_method', 'status', 'joining_date'),
+    'ATTENDANCE': ('attendance_id', 'worker_id', 'date', 'check_in', 'check_out',
+                   'attendance_value', 'working_hours'),
+    'TASK': ('task_id', 'worker_id', 'task_details', 'deadline', 'status', 'assigned_date'),
+    'LEAVE_REQUEST': ('leave_id', 'worker_id', 'leave_type', 'start_date', 'end_date', 'reason',
+                      'status', 'applied_date', 'approved_by', 'approval_date'),
+    'SALARY': ('salary_id', 'worker_id', 'month', 'base_salary', 'extra_hours', 'bonus_amount',
+               'total_salary', 'status'),
+    'SUBSTITUTE_REQUEST': ('sub_id', 'requester_id', 'substitute_id', 'date', 'hours', 'reason',
+                           'status', 'admin_approved'),
+    'PERFORMANCE': ('performance_id', 'worker_id', 'month', 'attendance_percentage', 'total_hours',
+                    'manager_feedback'),
+}
+
+
+class Row(tuple):
+    """Base class: a result row readable by column name or position"""
+
+    __slots__ = ()
+    _fields = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        i = self._index.get(key)
+        return default if i is None else tuple.__getitem__(self, i)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.items())})"
+
+
+_classes = {}      # column tuple -> Row subclass
+_MAPPING_API = ('get', 'keys', 'values', 'items')
+
+
+def row_class(columns, name='Row'):
+    """The Row subclass for a column list (one per distinct list)"""
+    columns = tuple(columns)
+    cls = _classes.get(columns)
+    if cls is None:
+        namespace = {'__slots__': (), '_fields': columns,
+                     '_index': {column: i for i, column in enumerate(columns)}}
+        for i, column in enumerate(columns):
+            # A column named like a mapping method stays item-only (row['items']);
+            # tuple's count/index are shadowed, GROUP BY queries select `count`
+            if column.isidentifier() and not column.startswith('_') and column not in _MAPPING_API:
+                namespace[column] = property(itemgetter(i))
+        cls = _classes[columns] = type(name, (Row,), namespace)
+    return cls
+
+
+Worker = row_class(TABLE_COLUMNS['WORKER'], 'Worker')
+Attendance = row_class(TABLE_COLUMNS['ATTENDANCE'], 'Attendance')
+Task = row_class(TABLE_COLUMNS['TASK'], 'Task')
+LeaveRequest = row_class(TABLE_COLUMNS['LEAVE_REQUEST'], 'LeaveRequest')
+Salary = row_class(TABLE_COLUMNS['SALARY'], 'Salary')
+SubstituteRequest = row_class(TABLE_COLUMNS['SUBSTITUTE_REQUEST'], 'SubstituteRequest')
+Performance = row_class(TABLE_COLUMNS['PERFORMANCE'], 'Performance')
+
+
+def _names(cursor):
+    return tuple(d[0] for d in cursor.description)
+
+
+def fetchall(cursor):
+    """Remaining rows of a plain cursor as Row objects (dict rows pass through)"""
+    rows = cursor.fetchall()
+    if not rows or isinstance(rows[0], dict):
+        return rows
+    return list(map(row_class(_names(cursor)), rows))
+
+
+def fetchone(cursor):
+    """Next row of a plain cursor as a Row, or None"""
+    row = cursor.fetchone()
+    if row is None or isinstance(row, dict):
+        return row
+    return row_class(_names(cursor))(row)
@@ -0,0 +1,235 @@
+"""
+Attendance rollup tables.
+
+ATTENDANCE_WORKER_DAY  - one row per worker per day, with the worker's
+                         department/role and the month key copied in so
+                         monthly summaries don't need DATE_FORMAT.
+ATTENDANCE_DEPT_DAY    - one row per department/role per day with the
+                         running totals the reports need.
+
+Triggers on ATTENDANCE keep both tables up to date in the same statement
+as the ATTENDANCE write. The tables are created by migration 0003 and the
+triggers by migration 0004 (migrations.py; SQLITE_TRIGGERS on the SQLite
+backend). `python rollups.py rebuild` recomputes them from ATTENDANCE
+(run it once after those migrations, or after fixing data by hand).
+
+Rows keep the department the worker had on the day they attended, so a
+worker who moves department does not rewrite history.
+"""
+import argparse
+import sys
+
+from storage import DatabaseError, connect, dialect_of, month_key
+
+CREATE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS ATTENDANCE_WORKER_DAY (
+        worker_id INT NOT NULL,
+        date DATE NOT NULL,
+        month CHAR(7) NOT NULL,
+        department VARCHAR(100) NOT NULL DEFAULT '',
+        role VARCHAR(20) NOT NULL DEFAULT 'worker',
+        attendance_value DECIMAL(3,1) NOT NULL DEFAULT 0,
+        working_hours DECIMAL(5,2) NULL,
+        PRIMARY KEY (worker_id, date),
+        KEY idx_awd_worker_month (worker_id, month),
+        KEY idx_awd_dept_date (department, role, date)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS ATTENDANCE_DEPT_DAY (
+        department VARCHAR(100) NOT NULL DEFAULT '',
+        role VARCHAR(20) NOT NULL DEFAULT 'worker',
+        date DATE NOT NULL,
+        checkins INT NOT NULL DEFAULT 0,
+        attendance_total DECIMAL(10,1) NOT NULL DEFAULT 0,
+        hours_total DECIMAL(12,2) NOT NULL DEFAULT 0,
+        hours_count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (department, role, date),
+        KEY idx_add_date (date)
+    )
+    """,
+]
+
+
+# ============ INCREMENTAL UPDATES ============
+# Triggers on ATTENDANCE keep both rollups in step inside the same
+# statement as the ATTENDANCE write, so they can never drift from a
+# partial write and a check-in/check-out stays one round trip.
+# Installed by migration 0004. Both assume worker_id and date of an
+# ATTENDANCE row never change.
+
+CREATE_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS trg_attendance_rollup_insert",
+    """
+    CREATE TRIGGER trg_attendance_rollup_insert AFTER INSERT ON ATTENDANCE
+    FOR EACH ROW
+    BEGIN
+        DECLARE v_department VARCHAR(100) DEFAULT '';
+        DECLARE v_role VARCHAR(20) DEFAULT 'worker';
+
+        SELECT COALESCE(department, ''), COALESCE(role, 'worker')
+        INTO v_department, v_role
+        FROM WORKER WHERE worker_id = NEW.worker_id;
+
+        INSERT INTO ATTENDANCE_WORKER_DAY
+            (worker_id, date, month, department, role, attendance_value, working_hours)
+        VALUES (NEW.worker_id, NEW.date, DATE_FORMAT(NEW.date, '%Y-%m'), v_department, v_role,
+                COALESCE(NEW.attendance_value, 0), NEW.working_hours)
+        ON DUPLICATE KEY UPDATE attendance_value = VALUES(attendance_value),
+                                working_hours = VALUES(working_hours);
+
+        INSERT INTO ATTENDANCE_DEPT_DAY
+            (department, role, date, checkins, attendance_total, hours_total, hours_count)
+        VALUES (v_department, v_role, NEW.date, 1, COALESCE(NEW.attendance_value, 0),
+                COALESCE(NEW.working_hours, 0), NEW.working_hours IS NOT NULL)
+        ON DUPLICATE KEY UPDATE checkins = checkins + 1,
+                                attendance_total = attendance_total + VALUES(attendance_total),
+                                hours_total = hours_total + VALUES(hours_total),
+                                hours_count = hours_count + VALUES(hours_count);
+    END
+    """,
+    "DROP TRIGGER IF EXISTS trg_attendance_rollup_update",
+    """
+    CREATE TRIGGER trg_attendance_rollup_update AFTER UPDATE ON ATTENDANCE
+    FOR EACH ROW
+    BEGIN
+        UPDATE ATTENDANCE_DEPT_DAY d
+        JOIN ATTENDANCE_WORKER_DAY w
+          ON w.department = d.department AND w.role = d.role AND w.date = d.date
+        SET d.attendance_total = d.attendance_total
+                                 + COALESCE(NEW.attendance_value, 0) - COALESCE(OLD.attendance_value, 0),
+            d.hours_total = d.hours_total
+                            + COALESCE(NEW.working_hours, 0) - COALESCE(OLD.working_hours, 0),
+            d.hours_count = d.hours_count
+                            + (NEW.working_hours IS NOT NULL) - (OLD.working_hours IS NOT NULL)
+        WHERE w.worker_id = NEW.worker_id AND w.date = NEW.date;
+
+        UPDATE ATTENDANCE_WORKER_DAY
+        SET attendance_value = COALESCE(NEW.attendance_value, 0),
+            working_hours = NEW.working_hours
+        WHERE worker_id = NEW.worker_id AND date = NEW.date;
+    END
+    """,
+]
+
+# The same triggers for the SQLite backend (storage.py): no variables or
+# UPDATE ... JOIN there, so the worker's department/role are read with
+# INSERT ... SELECT and the department row is found by a row-value match.
+SQLITE_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS trg_attendance_rollup_insert",
+    """
+    CREATE TRIGGER trg_attendance_rollup_insert AFTER INSERT ON ATTENDANCE
+    FOR EACH ROW
+    BEGIN
+        INSERT INTO ATTENDANCE_WORKER_DAY
+            (worker_id, date, month, department, role, attendance_value, working_hours)
+        SELECT NEW.worker_id, NEW.date, strftime('%Y-%m', NEW.date),
+               COALESCE(department, ''), COALESCE(role, 'worker'),
+               COALESCE(NEW.attendance_value, 0), NEW.working_hours
+        FROM WORKER WHERE worker_id = NEW.worker_id
+        ON CONFLICT (worker_id, date) DO UPDATE SET attendance_value = excluded.attendance_value,
+                                                    working_hours = excluded.working_hours;
+
+        INSERT INTO ATTENDANCE_DEPT_DAY
+            (department, role, date, checkins, attendance_total, hours_total, hours_count)
+        SELECT department, role, date, 1, attendance_value,
+               COALESCE(working_hours, 0), working_hours IS NOT NULL
+        FROM ATTENDANCE_WORKER_DAY WHERE worker_id = NEW.worker_id AND date = NEW.date
+        ON CONFLICT (department, role, date) DO UPDATE SET checkins = checkins + 1,
+                                attendance_total = attendance_total + excluded.attendance_total,
+                                hours_total = hours_total + excluded.hours_total,
+                                hours_count = hours_count + excluded.hours_count;
+    END
+    """,
+    "DROP TRIGGER IF EXISTS trg_attendance_rollup_update",
+    """
+    CREATE TRIGGER trg_attendance_rollup_update AFTER UPDATE ON ATTENDANCE
+    FOR EACH ROW
+    BEGIN
+        UPDATE ATTENDANCE_DEPT_DAY
+        SET attendance_total = attendance_total
+                               + COALESCE(NEW.attendance_value, 0) - COALESCE(OLD.attendance_value, 0),
+            hours_total = hours_total
+                          + COALESCE(NEW.working_hours, 0) - COALESCE(OLD.working_hours, 0),
+            hours_count = hours_count
+                          + (NEW.working_hours IS NOT NULL) - (OLD.working_hours IS NOT NULL)
+        WHERE (department, role, date) = (SELECT department, role, date FROM ATTENDANCE_WORKER_DAY
+                                          WHERE worker_id = NEW.worker_id AND date = NEW.date);
+
+        UPDATE ATTENDANCE_WORKER_DAY
+        SET attendance_value = COALESCE(NEW.attendance_value, 0),
+            working_hours = NEW.working_hours
+        WHERE worker_id = NEW.worker_id AND date = NEW.date;
+    END
+    """,
+]
+
+
+# ============ REBUILD / BACKFILL ============
+
+def rebuild(db, start_date=None, end_date=None):
+    """Recompute both rollups from ATTENDANCE for a date range (or everything)"""
+    where = "1=1"
+    params = []
+    if start_date:
+        where += " AND date >= %s"
+        params.append(start_date)
+    if end_date:
+        where += " AND date <= %s"
+        params.append(end_date)
+
+    cursor = db.cursor()
+    cursor.execute(f"DELETE FROM ATTENDANCE_DEPT_DAY WHERE {where}", params)
+    cursor.execute(f"DELETE FROM ATTENDANCE_WORKER_DAY WHERE {where}", params)
+
+    cursor.execute(f"""
+        INSERT INTO ATTENDANCE_WORKER_DAY
+            (worker_id, date, month, department, role, attendance_value, working_hours)
+        SELECT a.worker_id, a.date, {month_key('a.date', dialect_of(cursor))},
+               COALESCE(w.department, ''), COALESCE(w.role, 'worker'),
+               COALESCE(a.attendance_value, 0), a.working_hours
+        FROM ATTENDANCE a
+        JOIN WORKER w ON a.worker_id = w.worker_id
+        WHERE {where.replace('date', 'a.date')}
+    """, params)
+    worker_rows = cursor.rowcount
+
+    cursor.execute(f"""
+        INSERT INTO ATTENDANCE_DEPT_DAY
+            (department, role, date, checkins, attendance_total, hours_total, hours_count)
+        SELECT department, role, date, COUNT(*), SUM(attendance_value),
+               COALESCE(SUM(working_hours), 0), COUNT(working_hours)
+        FROM ATTENDANCE_WORKER_DAY
+        WHERE {where}
+        GROUP BY department, role, date
+    """, params)
+    dept_rows = cursor.rowcount
+
+    db.commit()
+    cursor.close()
+    return worker_rows, dept_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain attendance rollup tables")
+    sub = parser.add_subparsers(dest='command', required=True)
+    rebuild_cmd = sub.add_parser('rebuild', help="recompute rollups from ATTENDANCE")
+    rebuild_cmd.add_argument('--start', help="first date to rebuild (YYYY-MM-DD)")
+    rebuild_cmd.add_argument('--end', help="last date to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    try:
+        db = connect()
+    except DatabaseError as err:
+        print(f"❌ Database Connection Error: {err}")
+        return 1
+
+    worker_rows, dept_rows = rebuild(db, args.start, args.end)
+    print(f"✅ Rebuilt {worker_rows} worker-day and {dept_rows} department-day rows")
+    db.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,411 @@
+"""
+Preforking production server.
+
+`python app.py` runs Flask's single-process development server. In
+production run this instead, from the backend folder:
+
+    python server.py                                # SERVER_* settings from config.py
+    python server.py --workers 4 --threads 8 --port 8000
+    python server.py --preload --pid-file server.pid
+
+The master process binds the listening socket, forks the workers and
+supervises them; it never serves a request itself. Every worker imports
+the app and calls app.create_app() after the fork, so its connection
+pool, caches and ingest queue are its own, then serves the shared socket
+with --threads request threads. A worker only accepts a connection when
+one of its threads is free, so a busy worker leaves new connections in
+the listen queue for an idle one.
+
+With --preload the master imports the app once before forking: workers
+start faster and share the compiled templates' memory, and
+reset_after_fork() in app.py drops whatever the master had opened.
+
+Signals to the master:
+
+    HUP        graceful reload: the workers are replaced one at a time;
+               each finishes its requests in flight first and the next
+               one is only stopped once its replacement is ready. The
+               socket stays open, so no connection is refused. New
+               workers import app.py and the templates afresh (not with
+               --preload; config.py changes always need a restart)
+    TERM, INT  graceful stop: workers finish their requests in flight,
+               up to --graceful-timeout seconds; a second signal kills them
+
+A worker retires itself after --max-requests requests, plus a random
+0..--max-requests-jitter so workers don't all restart together, and the
+master starts a fresh one in its slot. That bounds slow memory growth.
+
+Each worker keeps its own DB_POOL_SIZE connections, so the database sees
+up to workers x (DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW). With INGEST_ENABLED
+worker N journals to journal/worker-N (worker 0 to journal/), and a
+replacement replays what the worker before it left; keep the worker count
+when restarting with events still queued. POSIX only (fork).
+"""
+import argparse
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from config import (SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_THREADS, SERVER_MAX_REQUESTS,
+                    SERVER_MAX_REQUESTS_JITTER, SERVER_GRACEFUL_TIMEOUT, SERVER_KEEPALIVE,
+                    SERVER_BACKLOG)
+
+BOOT_FAILED = 3      # exit code of a worker whose app could not be loaded
+
+
+# ============ WORKER ============
+
+class RequestHandler(WSGIRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = SERVER_KEEPALIVE      # idle keep-alive connections give their thread back
+
+    def log_request(self, code='-', size='-'):
+        pass                        # no per-request access log line from every worker
+
+
+class Worker(BaseWSGIServer):
+    """One worker process: serves the inherited socket from at most `threads` threads"""
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, app, listener, slot, threads=4, max_requests=0, graceful_timeout=30):
+        host, port = listener.getsockname()[:2]
+        super().__init__(host, port, self._count, handler=RequestHandler, fd=listener.fileno())
+        self.socket.setblocking(False)
+        self.wsgi_app = app
+        self.slot = slot
+        self.threads = threads
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        self.master_pid = os.getppid()
+        self.requests = 0
+        self.alive = True
+        self.reason = None
+        self._free = threading.Semaphore(threads)
+        self._active = []
+        self._lock = threading.Lock()
+
+    def _count(self, environ, start_response):
+        """The WSGI app as served: counts requests, closes connections once retiring"""
+        with self._lock:
+            self.requests += 1
+            if self.max_requests and self.requests == self.max_requests:
+                self.retire(f"recycled after {self.requests} requests")
+        if self.alive:
+            return self.wsgi_app(environ, start_response)
+
+        def closing(status, headers, exc_info=None):
+            return start_response(status, list(headers) + [('Connection', 'close')], exc_info)
+        return self.wsgi_app(environ, closing)
+
+    def retire(self, reason):
+        """Stop accepting; requests in flight get graceful_timeout seconds to finish"""
+        if not self.alive:
+            return
+        self.alive = False
+        self.reason = reason
+        deadline = threading.Timer(self.graceful_timeout, os._exit, (1,))
+        deadline.daemon = True
+        deadline.start()
+
+    def serve(self):
+        while self.alive:
+            # Only accept with a free thread, other workers may be idle
+            if not self._free.acquire(timeout=1.0):
+                continue
+            readable = select.select([self.socket], [], [], 1.0)[0] if self.alive else []
+            if not readable:
+                self._free.release()
+                if os.getppid() != self.master_pid:
+                    self.retire("master is gone")
+                continue
+            try:
+                conn, address = self.get_request()
+            except OSError:          # another worker accepted it first
+                self._free.release()
+                continue
+            thread = threading.Thread(target=self._serve_connection, args=(conn, address), daemon=True)
+            with self._lock:
+                self._active = [t for t in self._active if t.is_alive()] + [thread]
+            thread.start()
+
+        with self._lock:
+            active = list(self._active)
+        for thread in active:
+            thread.join()
+        self.server_close()
+
+    def _serve_connection(self, conn, address):
+        try:
+            self.finish_request(conn, address)
+        except Exception:
+            self.handle_error(conn, address)
+        finally:
+            self.shutdown_request(conn)
+            self._free.release()
+
+
+def run_worker(listener, slot, ready_fd, options):
+    """Body of a forked worker; returns its exit code"""
+    for sig in (signal.SIGCHLD, signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)     # reloads are the master's job
+    try:
+        import app as app_module
+        server = Worker(app_module.create_app(worker_slot=slot), listener, slot,
+                        threads=options['threads'], max_requests=options['max_requests'],
+                        graceful_timeout=options['graceful_timeout'])
+    except Exception:
+        traceback.print_exc()
+        return BOOT_FAILED
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda signum, frame: server.retire("stopped"))
+    os.write(ready_fd, b'.')
+    os.close(ready_fd)
+
+    server.serve()
+    app_module.shutdown()
+    if server.reason != "stopped":
+        print(f"♻️  Worker {slot} (pid {os.getpid()}) {server.reason}")
+    return 0
+
+
+# ============ MASTER ============
+
+class WorkerProcess:
+    __slots__ = ('slot', 'generation', 'ready_fd', 'ready', 'stopping')
+
+    def __init__(self, slot, generation, ready_fd):
+        self.slot = slot
+        self.generation = generation
+        self.ready_fd = ready_fd
+        self.ready = False
+        self.stopping = False
+
+
+class Master:
+    """Forks the workers, replaces the ones that exit, handles reload and stop"""
+
+    def __init__(self, host, port, workers, threads, max_requests=0, max_requests_jitter=0,
+                 graceful_timeout=30, backlog=2048, preload=False, pid_file=None):
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+        self.preload = preload
+        self.pid_file = pid_file
+
+        self.workers = {}            # pid -> WorkerProcess
+        self.generation = 0          # bumped by every reload
+        self.replacing = []          # slots a rolling reload still has to replace
+        self.stopping = False
+        self.stop_deadline = None
+        self.exit_code = 0
+        self._signals = []
+        self.listener = None
+
+    # ----- Workers -----
+    def spawn(self, slot):
+        max_requests = self.max_requests
+        if max_requests and self.max_requests_jitter:
+            max_requests += random.randint(0, self.max_requests_jitter)
+        options = {'threads': self.threads, 'max_requests': max_requests,
+                   'graceful_timeout': self.graceful_timeout}
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid:
+            os.close(ready_w)
+            self.workers[pid] = WorkerProcess(slot, self.generation, ready_r)
+            return pid
+
+        # ----- in the worker -----
+        code = 1
+        try:
+            signal.set_wakeup_fd(-1)
+            os.close(ready_r)
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            for worker in self.workers.values():
+                if worker.ready_fd is not None:
+                    os.close(worker.ready_fd)
+            code = run_worker(self.listener, slot, ready_w, options)
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            if worker.ready_fd is not None:
+                os.close(worker.ready_fd)
+            code = os.waitstatus_to_exitcode(status)
+            if code == BOOT_FAILED:
+                print(f"❌ Worker {worker.slot} failed to load the app, stopping")
+                self.exit_code = 1
+                self.stop()
+            elif code != 0 and not (self.stopping or worker.stopping):
+                print(f"⚠️  Worker {worker.slot} (pid {pid}) exited with code {code}, restarting it")
+            if not self.stopping:
+                self.spawn(worker.slot)
+
+    def check_ready(self, fds):
+        """A worker writes one byte once it can serve; EOF means it died first"""
+        for worker in self.workers.values():
+            if worker.ready_fd is not None and worker.ready_fd in fds:
+                worker.ready = os.read(worker.ready_fd, 1) == b'.'
+                os.close(worker.ready_fd)
+                worker.ready_fd = None
+
+    # ----- Reload / stop -----
+    def reload(self):
+        if self.stopping:
+            return
+        self.generation += 1
+        self.replacing = sorted({worker.slot for worker in self.workers.values()})
+        print(f"🔄 Reloading {len(self.replacing)} workers one at a time")
+
+    def step_reload(self):
+        """Replace the next slot once the previous one's new worker is ready"""
+        while self.replacing:
+            slot = self.replacing[0]
+            in_slot = [(pid, w) for pid, w in self.workers.items() if w.slot == slot]
+            old = [(pid, w) for pid, w in in_slot if w.generation < self.generation]
+            if old:
+                for pid, worker in old:
+                    if not worker.stopping:
+                        worker.stopping = True
+                        os.kill(pid, signal.SIGTERM)
+                return
+            if any(not w.ready for _, w in in_slot):
+                return
+            self.replacing.pop(0)
+            if not self.replacing:
+                print(f"✅ Reloaded, {len(self.workers)} workers running")
+
+    def stop(self):
+        if self.stopping:
+            print("⚠️  Stopping now")
+            for pid in list(self.workers):
+                os.kill(pid, signal.SIGKILL)
+            return
+        self.stopping = True
+        self.replacing = []
+        self.stop_deadline = time.monotonic() + self.graceful_timeout + 5
+        for pid, worker in self.workers.items():
+            worker.stopping = True
+            os.kill(pid, signal.SIGTERM)
+
+    def _signal(self, signum, frame):
+        self._signals.append(signum)
+
+    # ----- Main loop -----
+    def bind(self):
+        listener = socket.create_server((self.host, self.port), backlog=self.backlog)
+        self.port = listener.getsockname()[1]
+        return listener
+
+    def run(self):
+        self.listener = self.bind()
+        if self.preload:
+            import app    # noqa: F401 - loaded once here, forked into every worker
+        if self.pid_file:
+            with open(self.pid_file, 'w') as f:
+                f.write(f"{os.getpid()}\n")
+
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        signal.set_wakeup_fd(self._wake_w)
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, self._signal)
+
+        print(f"🚀 Master pid {os.getpid()}: {self.worker_count} workers x {self.threads} threads "
+              f"on http://{self.host}:{self.port}"
+              + (f", recycled after ~{self.max_requests} requests" if self.max_requests else ""))
+        for slot in range(self.worker_count):
+            self.spawn(slot)
+
+        try:
+            while self.workers or not self.stopping:
+                waiting = [w.ready_fd for w in self.workers.values() if w.ready_fd is not None]
+                try:
+                    readable = select.select([self._wake_r] + waiting, [], [], 1.0)[0]
+                except InterruptedError:
+                    readable = []
+                if self._wake_r in readable:
+                    while True:
+                        try:
+                            if not os.read(self._wake_r, 512):
+                                break
+                        except BlockingIOError:
+                            break
+                self.check_ready(readable)
+
+                signals, self._signals = self._signals, []
+                for signum in signals:
+                    if signum == signal.SIGHUP:
+                        self.reload()
+                    elif signum in (signal.SIGTERM, signal.SIGINT):
+                        self.stop()
+                self.reap()
+                self.step_reload()
+                if self.stopping and self.workers and time.monotonic() > self.stop_deadline:
+                    for pid in list(self.workers):
+                        os.kill(pid, signal.SIGKILL)
+        finally:
+            self.listener.close()
+            if self.pid_file and os.path.exists(self.pid_file):
+                os.remove(self.pid_file)
+        print("✅ Server stopped")
+        return self.exit_code
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preforking production server for the app")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help="0 = one per CPU core")
+    parser.add_argument('--threads', type=int, default=SERVER_THREADS)
+    parser.add_argument('--max-requests', type=int, default=SERVER_MAX_REQUESTS, help="0 = never recycle")
+    parser.add_argument('--max-requests-jitter', type=int, default=SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument('--graceful-timeout', type=float, default=SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument('--backlog', type=int, default=SERVER_BACKLOG)
+    parser.add_argument('--preload', action='store_true', help="import the app in the master, before forking")
+    parser.add_argument('--pid-file', help="write the master's pid here (for kill -HUP)")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count() or 1
+    master = Master(args.host, args.port, workers, args.threads,
+                    max_requests=args.max_requests, max_requests_jitter=args.max_requests_jitter,
+                    graceful_timeout=args.graceful_timeout, backlog=args.backlog,
+                    preload=args.preload, pid_file=args.pid_file)
+    return master.run()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
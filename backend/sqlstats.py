@@ -0,0 +1,362 @@
+"""
+Per-request SQL instrumentation.
+
+Every cursor handed out by the connection pool is wrapped in an
+InstrumentedCursor (ConnectionPool(instrument=stats.wrap)), which records
+for each statement:
+
+    query     normalized text - literals and %s become ?, IN lists and
+              repeated VALUES / OR / UNION ALL groups are collapsed, so
+              every call of the same code has the same shape
+    duration  execute plus fetching, in seconds
+    rows      rows fetched, or rows changed for writes
+    route     the Flask URL rule of the request that ran it
+
+QueryStats.begin()/end() bracket a request (app.py calls them from
+before_request / teardown_request). At the end of a request:
+
+- statements slower than SQL_SLOW_QUERY_MS are printed as slow queries;
+- a statement shape run SQL_N_PLUS_ONE_THRESHOLD times or more in the
+  one request is reported as a likely N+1;
+- everything is added to the histograms exported by /metrics in the
+  Prometheus text format (render_prometheus).
+
+Statements outside a request (the ingest flusher thread) are counted
+under the route "background".
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+
+# Histogram buckets
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+_request = ContextVar('sqlstats_request', default=None)
+
+
+# ============ NORMALIZATION ============
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_REPEATS = [
+    re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+"),                         # VALUES (..), (..)
+    re.compile(r"(\([^()]*\))(?:\s+OR\s+\1)+", re.IGNORECASE),          # (a = ? AND b = ?) OR ...
+    re.compile(r"(SELECT\b.*?)(?:\s+UNION ALL\s+\1)+", re.IGNORECASE),  # SELECT ? ... UNION ALL ...
+]
+
+
+@lru_cache(maxsize=4096)
+def normalize(sql):
+    """Statement text with the values taken out"""
+    sql = " ".join(sql.split())
+    sql = _STRING_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    for pattern in _REPEATS:
+        sql = pattern.sub(r"\1 ...", sql)
+    return sql
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(query):
+    """Short stable id for a normalized statement (the `query` label)"""
+    return hashlib.sha1(query.encode()).hexdigest()[:12]
+
+
+# ============ RECORDING ============
+
+class Statement:
+    __slots__ = ('query', 'duration', 'rows')
+
+    def __init__(self, query):
+        self.query = query
+        self.duration = 0.0
+        self.rows = 0
+
+
+class RequestTrace:
+    """Statements run while handling one request"""
+
+    def __init__(self, route):
+        self.route = route
+        self.statements = []
+
+
+class InstrumentedCursor:
+    """Times execute/fetch calls of a DB-API cursor into the current request"""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self._last = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _start(self, sql):
+        self._last = Statement(normalize(sql))
+        return time.perf_counter()
+
+    def _finish(self, started):
+        statement = self._last
+        statement.duration += time.perf_counter() - started
+        if self._cursor.description is None:
+            statement.rows = max(self._cursor.rowcount or 0, 0)    # write: rows changed
+        self._stats.record(statement)
+
+    def execute(self, sql, params=None, multi=False):
+        if multi:
+            return self._execute_multi(sql, params)
+        started = self._start(sql)
+        try:
+            return self._cursor.execute(sql, params)
+        finally:
+            self._finish(started)
+
+    def _execute_multi(self, sql, params):
+        # The whole batch counts as one statement; the driver yields the
+        # cursor itself for every result, so yield the wrapper instead
+        started = self._start(sql)
+        statement = self._last
+        try:
+            for _ in self._cursor.execute(sql, params, multi=True):
+                yield self
+        finally:
+            statement.duration += time.perf_counter() - started
+            self._stats.record(statement)
+
+    def executemany(self, sql, seq_params):
+        started = self._start(sql)
+        try:
+            return self._cursor.executemany(sql, seq_params)
+        finally:
+            self._finish(started)
+
+    def _fetched(self, started, rows):
+        if self._last is not None:
+            self._last.duration += time.perf_counter() - started
+            self._last.rows += rows
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(started, row is not None)
+        return row
+
+    def fetchmany(self, size=1):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        return self._cursor.close()
+
+
+# ============ AGGREGATION ============
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class QueryStats:
+    """Thread-safe per-route / per-query aggregates, slow-query and N+1 reports"""
+
+    def __init__(self, slow_query_ms=200, n_plus_one_threshold=10, max_queries=500):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_queries = max_queries
+        self._lock = threading.Lock()
+
+        self.queries = {}            # fingerprint -> normalized text
+        self.query_seconds = {}      # fingerprint -> Histogram
+        self.query_rows = Counter()  # fingerprint -> rows
+        self.route_queries = Counter()     # (route, fingerprint) -> statements
+        self.route_seconds = {}      # route -> Histogram of SQL seconds per request
+        self.route_counts = {}       # route -> Histogram of statements per request
+        self.slow = Counter()        # (route, fingerprint) -> slow statements
+        self.n_plus_one = Counter()  # (route, fingerprint) -> requests flagged
+
+    def wrap(self, cursor):
+        """ConnectionPool `instrument` hook"""
+        return InstrumentedCursor(cursor, self)
+
+    # ----- Request lifecycle -----
+    def begin(self, route):
+        _request.set(RequestTrace(route))
+
+    def end(self):
+        trace = _request.get()
+        if trace is None:
+            return
+        _request.set(None)
+        self._aggregate(trace.route, trace.statements)
+
+        shapes = Counter(s.query for s in trace.statements)
+        for query, count in shapes.items():
+            if count >= self.n_plus_one_threshold:
+                with self._lock:
+                    self.n_plus_one[(trace.route, fingerprint(query))] += 1
+                print(f"⚠️  Possible N+1 on {trace.route}: {count}x {query[:200]}")
+
+    def record(self, statement):
+        """Called by the cursor wrapper when a statement has been executed"""
+        trace = _request.get()
+        if trace is not None:
+            trace.statements.append(statement)    # rows still counting until end()
+        else:
+            self._aggregate('background', [statement])
+
+    def _aggregate(self, route, statements):
+        slow = []
+        with self._lock:
+            total = 0.0
+            for s in statements:
+                key = fingerprint(s.query)
+                if key not in self.queries:
+                    if len(self.queries) >= self.max_queries:
+                        key, s.query = 'other', '(other statements)'
+                    self.queries[key] = s.query
+                    self.query_seconds.setdefault(key, Histogram(SECONDS_BUCKETS))
+                self.query_seconds[key].observe(s.duration)
+                self.query_rows[key] += s.rows
+                self.route_queries[(route, key)] += 1
+                total += s.duration
+                if s.duration * 1000 >= self.slow_query_ms:
+                    self.slow[(route, key)] += 1
+                    slow.append(s)
+            if route != 'background':
+                self.route_seconds.setdefault(route, Histogram(SECONDS_BUCKETS)).observe(total)
+                self.route_counts.setdefault(route, Histogram(COUNT_BUCKETS)).observe(len(statements))
+        for s in slow:
+            print(f"🐢 Slow query on {route}: {s.duration * 1000:.1f}ms, {s.rows} rows: {s.query[:500]}")
+
+    # ----- Reports -----
+    def summary(self, top=20):
+        """Heaviest statements by total time, for /admin/sql-stats"""
+        with self._lock:
+            rows = [{'query': key, 'statement': self.queries[key],
+                     'count': h.count, 'total_ms': round(h.sum * 1000, 2),
+                     'avg_ms': round(h.sum * 1000 / h.count, 3) if h.count else 0.0,
+                     'rows': self.query_rows[key]}
+                    for key, h in self.query_seconds.items()]
+            routes = {route: {'requests': h.count,
+                              'avg_sql_ms': round(h.sum * 1000 / h.count, 3) if h.count else 0.0,
+                              'avg_statements': round(self.route_counts[route].sum / h.count, 2)
+                              if h.count else 0.0}
+                      for route, h in self.route_seconds.items()}
+            n_plus_one = [{'route': route, 'query': key, 'requests': count}
+                          for (route, key), count in self.n_plus_one.most_common(top)]
+        rows.sort(key=lambda r: r['total_ms'], reverse=True)
+        return {'queries': rows[:top], 'routes': routes, 'n_plus_one': n_plus_one}
+
+    def render_prometheus(self):
+        """All aggregates in the Prometheus text exposition format"""
+        out = []
+        with self._lock:
+            _family(out, 'app_sql_query_duration_seconds', 'histogram',
+                    "Duration of each SQL statement, by statement shape")
+            for key, h in sorted(self.query_seconds.items()):
+                _histogram(out, 'app_sql_query_duration_seconds', {'query': key}, h)
+
+            _family(out, 'app_sql_query_rows_total', 'counter', "Rows fetched or changed, by statement shape")
+            for key, rows in sorted(self.query_rows.items()):
+                out.append(_sample('app_sql_query_rows_total', {'query': key}, rows))
+
+            _family(out, 'app_sql_query_info', 'gauge', "Normalized text of each statement shape")
+            for key, query in sorted(self.queries.items()):
+                out.append(_sample('app_sql_query_info', {'query': key, 'statement': query[:300]}, 1))
+
+            _family(out, 'app_sql_statements_total', 'counter', "Statements run, by route and shape")
+            for (route, key), count in sorted(self.route_queries.items()):
+                out.append(_sample('app_sql_statements_total', {'route': route, 'query': key}, count))
+
+            _family(out, 'app_request_sql_seconds', 'histogram', "Total SQL time per request, by route")
+            for route, h in sorted(self.route_seconds.items()):
+                _histogram(out, 'app_request_sql_seconds', {'route': route}, h)
+
+            _family(out, 'app_request_sql_statements', 'histogram', "SQL statements per request, by route")
+            for route, h in sorted(self.route_counts.items()):
+                _histogram(out, 'app_request_sql_statements', {'route': route}, h)
+
+            _family(out, 'app_sql_slow_queries_total', 'counter',
+                    f"Statements slower than {self.slow_query_ms}ms")
+            for (route, key), count in sorted(self.slow.items()):
+                out.append(_sample('app_sql_slow_queries_total', {'route': route, 'query': key}, count))
+
+            _family(out, 'app_sql_n_plus_one_total', 'counter',
+                    f"Requests that ran one statement shape {self.n_plus_one_threshold}+ times")
+            for (route, key), count in sorted(self.n_plus_one.items()):
+                out.append(_sample('app_sql_n_plus_one_total', {'route': route, 'query': key}, count))
+        return "\n".join(out) + "\n"
+
+
+# ============ PROMETHEUS TEXT FORMAT ============
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _sample(name, labels, value):
+    label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+    return f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}"
+
+
+def _family(out, name, kind, help_text):
+    out.append(f"# HELP {name} {help_text}")
+    out.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(out, name, labels, h):
+    cumulative = 0
+    for bound, count in zip(h.buckets + ('+Inf',), h.counts):
+        cumulative += count
+        out.append(_sample(f"{name}_bucket", dict(labels, le=bound), cumulative))
+    out.append(_sample(f"{name}_sum", labels, round(h.sum, 6)))
+    out.append(_sample(f"{name}_count", labels, h.count))
+
+
+def series(out, name, kind, help_text, samples):
+    """Append one metric family; `samples` are (labels, value) pairs"""
+    _family(out, name, kind, help_text)
+    out.extend(_sample(name, labels, value) for labels, value in samples)
+    return out
+
+
+def gauges(out, prefix, values, help_text):
+    """Append numeric values of a stats dict (e.g. db_pool.stats()) as gauges"""
+    for key, value in sorted(values.items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            _family(out, f"{prefix}_{key}", 'gauge', f"{help_text}: {key}")
+            out.append(_sample(f"{prefix}_{key}", {}, value))
+    return out
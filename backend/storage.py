@@ -0,0 +1,279 @@
+"""
+Storage backends: the XAMPP MySQL server or a local SQLite file.
+
+    DB_BACKEND = 'mysql'    # default, mysql.connector with DB_CONFIG
+    DB_BACKEND = 'sqlite'   # one file at SQLITE_PATH, WAL journal
+
+The app, the pool and the modules only talk DB-API, so the SQLite side
+is a thin wrapper that looks like a mysql.connector connection:
+
+- cursor(dictionary=True) returns dict rows, buffered= is accepted;
+- %s placeholders and INSERT IGNORE are rewritten to their SQLite
+  spelling; SELECT ... FOR UPDATE becomes a plain SELECT that first
+  starts a write transaction (BEGIN IMMEDIATE), which locks the whole
+  database the way FOR UPDATE locks the rows;
+- execute(multi=True) runs each statement and yields one result per
+  statement, like mysql.connector does for the dashboard batches;
+- ping() / in_transaction for the pool.
+
+SQL that has no common spelling (upserts, time arithmetic, the month
+key) is built with the helpers below, which take the dialect of the
+cursor (dialect_of). Everything else in the app is written in the
+portable subset: dates come in as parameters instead of CURDATE()/NOW(),
+and no DATE_FORMAT/YEAR/MONTH in queries.
+
+The SQLite schema comes from the same migrations (migrations.py), with
+CREATE TABLE statements translated by sqlite_ddl():
+
+    python migrations.py upgrade     # with DB_BACKEND = 'sqlite'
+
+WAL lets readers run while one writer commits, which is what a single
+site with a handful of managers and one gate burst needs. busy_timeout
+makes concurrent writers queue instead of failing straight away.
+"""
+import os
+import re
+import sqlite3
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+import mysql.connector
+
+# Catch this instead of mysql.connector.Error so both backends are handled
+DatabaseError = (mysql.connector.Error, sqlite3.Error)
+
+BACKENDS = ('mysql', 'sqlite')
+
+
+def dialect_of(conn_or_cursor):
+    """'mysql' or 'sqlite' for a connection or cursor from either backend"""
+    return getattr(conn_or_cursor, 'dialect', 'mysql')
+
+
+# ============ PORTABLE SQL HELPERS ============
+
+def month_key(expr, dialect):
+    """SQL for the 'YYYY-MM' month of a DATE expression"""
+    if dialect == 'sqlite':
+        return f"strftime('%Y-%m', {expr})"
+    return f"DATE_FORMAT({expr}, '%Y-%m')"
+
+
+def hours_between(later, earlier, dialect):
+    """SQL for the hours from TIME `earlier` to `later`, wrapping midnight"""
+    if dialect == 'sqlite':
+        seconds = f"CAST(ROUND((julianday({later}) - julianday({earlier})) * 86400) AS INTEGER)"
+        return f"ROUND((({seconds} + 86400) % 86400) / 3600.0, 2)"
+    return f"ROUND(MOD(TIME_TO_SEC(TIMEDIFF({later}, {earlier})) + 86400, 86400) / 3600, 2)"
+
+
+_NEW_RE = re.compile(r"NEW\((\w+)\)")
+
+
+def upsert(dialect, conflict_columns, assignments):
+    """ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE tail for an INSERT
+
+    `assignments` maps column -> expression; write NEW(column) for the value
+    the INSERT tried to write. SQLite needs `conflict_columns` (the unique
+    key) and, for INSERT ... SELECT, a WHERE clause in the SELECT.
+    """
+    if dialect == 'sqlite':
+        new = r"excluded.\1"
+        head = f"ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET "
+    else:
+        new = r"VALUES(\1)"
+        head = "ON DUPLICATE KEY UPDATE "
+    return head + ",\n    ".join(
+        f"{column} = {_NEW_RE.sub(new, expr)}" for column, expr in assignments.items())
+
+
+def skip_duplicates(dialect, key_columns):
+    """Tail for an INSERT that skips rows already present under the unique key
+
+    Unlike INSERT IGNORE only the key conflict is absorbed: a foreign key
+    failure, a bad or truncated value still raises. A skipped row does not
+    count in rowcount on either backend.
+    """
+    if dialect == 'sqlite':
+        return f"ON CONFLICT ({', '.join(key_columns)}) DO NOTHING"
+    return f"ON DUPLICATE KEY UPDATE {key_columns[0]} = {key_columns[0]}"
+
+
+# ============ SQLITE DDL ============
+
+_KEY_RE = re.compile(r",\s*(UNIQUE\s+)?KEY\s+(\w+)\s*\(([^)]*)\)", re.IGNORECASE)
+_TABLE_RE = re.compile(r"CREATE TABLE IF NOT EXISTS (\w+)", re.IGNORECASE)
+
+
+def sqlite_ddl(sql):
+    """Translate a MySQL CREATE TABLE into SQLite statements
+
+    AUTO_INCREMENT keys become INTEGER PRIMARY KEY AUTOINCREMENT and inline
+    KEY clauses become separate CREATE INDEX statements.
+    """
+    sql = re.sub(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", "INTEGER PRIMARY KEY AUTOINCREMENT",
+                 sql, flags=re.IGNORECASE)
+    table = _TABLE_RE.search(sql)
+    indexes = []
+    if table:
+        for unique, name, columns in _KEY_RE.findall(sql):
+            indexes.append(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+                           f"ON {table.group(1)} ({columns})")
+        sql = _KEY_RE.sub("", sql)
+    return [sql] + indexes
+
+
+# ============ SQLITE CONNECTION ============
+
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(time, time.isoformat)
+sqlite3.register_adapter(timedelta, lambda value: str(value))
+sqlite3.register_converter('DATE', lambda raw: date.fromisoformat(raw.decode()))
+sqlite3.register_converter('DATETIME', lambda raw: datetime.fromisoformat(raw.decode()))
+
+_INSERT_IGNORE_RE = re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE)
+_FOR_UPDATE_RE = re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def translate(sql):
+    """MySQL-flavoured statement -> (SQLite statement, needs a write lock)"""
+    sql, locking = _FOR_UPDATE_RE.subn("", sql)
+    sql = _INSERT_IGNORE_RE.sub("INSERT OR IGNORE", sql)
+    return sql.replace('%s', '?'), bool(locking)
+
+
+class SQLiteCursor:
+    """DB-API cursor with the mysql.connector extras the app uses"""
+
+    dialect = 'sqlite'
+
+    def __init__(self, conn, dictionary=False):
+        self._conn = conn
+        self._cursor = conn.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(col[0] for col in self._cursor.description or ())
+
+    @property
+    def with_rows(self):
+        return self._cursor.description is not None
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def _run(self, sql, params):
+        sql, locking = translate(sql)
+        if locking and not self._conn.in_transaction:
+            self._cursor.execute("BEGIN IMMEDIATE")
+        self._cursor.execute(sql, tuple(params or ()))
+
+    def execute(self, sql, params=(), multi=False):
+        if multi:
+            return self._execute_multi(sql, params)
+        self._run(sql, params)
+        return None
+
+    def _execute_multi(self, sql, params):
+        """Run `;`-separated statements one by one, yielding self after each"""
+        params = list(params or ())
+        for statement in sql.split(';'):
+            if not statement.strip():
+                continue
+            count = statement.count('%s')
+            self._run(statement, params[:count])
+            params = params[count:]
+            yield self
+
+    def executemany(self, sql, seq_params):
+        self._cursor.executemany(translate(sql)[0], [tuple(p) for p in seq_params])
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """sqlite3 connection that quacks like a mysql.connector one"""
+
+    dialect = 'sqlite'
+
+    def __init__(self, path, busy_timeout=5.0):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False,
+                                     detect_types=sqlite3.PARSE_DECLTYPES)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("PRAGMA foreign_keys = ON")
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return SQLiteCursor(self._conn, dictionary=dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def ping(self, reconnect=False):
+        self._conn.execute("SELECT 1").fetchone()
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+# ============ FACTORY ============
+
+def connector(backend, db_config, sqlite_path=None):
+    """Zero-argument function that opens a new connection for `backend`"""
+    if backend == 'mysql':
+        return lambda: mysql.connector.connect(**db_config)
+    if backend == 'sqlite':
+        return lambda: SQLiteConnection(sqlite_path)
+    raise ValueError(f"DB_BACKEND must be one of {BACKENDS}, got {backend!r}")
+
+
+def connect():
+    """Open one connection to the configured backend (for the CLIs)"""
+    from config import DB_BACKEND, DB_CONFIG, SQLITE_PATH
+    return connector(DB_BACKEND, DB_CONFIG, sqlite_path(SQLITE_PATH))()
+
+
+def sqlite_path(path):
+    """SQLITE_PATH is relative to backend/"""
+    return path if os.path.isabs(path) or path == ':memory:' else \
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
@@ -0,0 +1,134 @@
+"""
+Template compilation up front, a shared bytecode cache and render timings.
+
+Every page is a 200-700 line Jinja template, and compiling one to Python
+takes 10-35 ms. Left alone, each process compiles a template the first
+time it is rendered, so the first visitor to each page after a start or
+a reload pays for it, and app.run(debug=True) keeps re-checking the files.
+
+- configure() points Jinja at an on-disk bytecode cache in
+  TEMPLATE_CACHE_DIR. Every process reads and writes the same directory;
+  Jinja writes each entry to a temporary file and renames it into place,
+  and an entry is ignored once its template changes, so nothing needs
+  clearing by hand. In production mode auto-reload is off as well.
+- precompile() loads every template at startup, from the bytecode cache
+  when it has the entry, and records how long each one took.
+- TemplateTimings counts renders per template through Flask's
+  before_render_template / template_rendered signals.
+
+/admin/template-stats shows both.
+"""
+import os
+import threading
+import time
+
+from flask import before_render_template, template_rendered
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+
+class SharedBytecodeCache(FileSystemBytecodeCache):
+    """FileSystemBytecodeCache that counts its hits and writes"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(directory)
+        self.hits = 0
+        self.writes = 0
+
+    def load_bytecode(self, bucket):
+        super().load_bytecode(bucket)
+        if bucket.code is not None:
+            self.hits += 1
+
+    def dump_bytecode(self, bucket):
+        super().dump_bytecode(bucket)
+        self.writes += 1
+
+
+def configure(app, cache_dir=None, production=False):
+    """Install the bytecode cache (if cache_dir) and production settings"""
+    if production:
+        # Setting app.debug only changes jinja_env.auto_reload while this
+        # is None, so a later app.debug = True can't turn reloading back on
+        app.config['TEMPLATES_AUTO_RELOAD'] = False
+    if cache_dir:
+        app.jinja_env.bytecode_cache = SharedBytecodeCache(cache_dir)
+    if production:
+        # The template filters in app.py have created jinja_env already
+        app.jinja_env.auto_reload = False
+
+
+class TemplateTimings:
+    """Compile time per template and render count/total/max per template"""
+
+    def __init__(self):
+        self.compiled = {}       # name -> {'ms': ..., 'from': 'source' | 'bytecode cache'}
+        self.renders = {}        # name -> [count, total ms, max ms]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def connect(self, app):
+        before_render_template.connect(self._before, app)
+        template_rendered.connect(self._after, app)
+
+    # ----- Compile -----
+    def precompile(self, env):
+        """Load every template into env's cache; returns the names that failed"""
+        cache = env.bytecode_cache
+        failed = []
+        for name in env.list_templates():
+            writes = getattr(cache, 'writes', 0)
+            started = time.perf_counter()
+            try:
+                env.get_template(name)
+            except TemplateError as e:
+                print(f"❌ Template {name} does not compile: {e}")
+                failed.append(name)
+                continue
+            source = 'source' if cache is None or cache.writes > writes else 'bytecode cache'
+            self.compiled[name] = {'ms': round((time.perf_counter() - started) * 1000, 2),
+                                   'from': source}
+        return failed
+
+    # ----- Render -----
+    def _before(self, sender, template, context, **extra):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(time.perf_counter())
+
+    def _after(self, sender, template, context, **extra):
+        stack = getattr(self._local, 'stack', None)
+        if not stack:
+            return
+        elapsed = (time.perf_counter() - stack.pop()) * 1000
+        name = template.name or '<string>'
+        with self._lock:
+            entry = self.renders.get(name)
+            if entry is None:
+                self.renders[name] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+
+    def summary(self, env=None):
+        with self._lock:
+            renders = {name: list(entry) for name, entry in self.renders.items()}
+        templates = {}
+        for name in sorted(set(self.compiled) | set(renders)):
+            count, total, worst = renders.get(name, (0, 0.0, 0.0))
+            templates[name] = {
+                'compile': self.compiled.get(name),
+                'renders': count,
+                'render_avg_ms': round(total / count, 3) if count else None,
+                'render_max_ms': round(worst, 3) if count else None,
+            }
+        cache = env.bytecode_cache if env is not None else None
+        return {
+            'templates': templates,
+            'compile_total_ms': round(sum(c['ms'] for c in self.compiled.values()), 2),
+            'bytecode_cache': {'directory': cache.directory, 'hits': cache.hits, 'writes': cache.writes}
+                              if isinstance(cache, SharedBytecodeCache) else None,
+            'auto_reload': env.auto_reload if env is not None else None,
+        }
@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from ingest import Ingestor
+
+
+def start(journal_dir):
+    """An Ingestor without its flusher, so every event stays journaled"""
+    ingestor = Ingestor(pool=None, journal_dir=str(journal_dir))
+    ingestor._run = lambda: None
+    return ingestor.start()
+
+
+def queued_workers(ingestor):
+    return [ingestor._queue.get_nowait()['worker_id'] for _ in range(ingestor._queue.qsize())]
+
+
+@pytest.mark.parametrize('torn', ['{"kind":"check_in","wor',
+                                  '{"kind":"check_in","worker_id":9,"date":"2024-05-02",'
+                                  '"time":"08:00:00","seq":2}'])
+def test_replay_after_torn_tail_keeps_later_events(tmp_path, torn):
+    ingestor = start(tmp_path)
+    ingestor.submit('check_in', 1, '2024-05-02', '08:00:00')
+    ingestor.stop()
+    # A crash in the middle of the next append
+    with open(ingestor._journal_path, 'a') as f:
+        f.write(torn)
+
+    ingestor = start(tmp_path)
+    assert ingestor.replayed == 1
+    ingestor.submit('check_in', 2, '2024-05-02', '08:01:00')
+    ingestor.submit('check_out', 1, '2024-05-02', '17:00:00')
+    ingestor.stop()
+
+    ingestor = start(tmp_path)
+    ingestor.stop()
+    assert ingestor.replayed == 3
+    assert queued_workers(ingestor) == [1, 2, 1]
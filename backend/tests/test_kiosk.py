@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import kiosk
+import migrations
+import storage
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = storage.SQLiteConnection(str(tmp_path / 'kiosk.db'))
+    migrations.upgrade(db)
+    cursor = db.cursor()
+    cursor.executemany("INSERT INTO WORKER (worker_id, name, email, password) VALUES (%s, %s, %s, 'x')",
+                       [(1, 'Ayesha', 'ayesha@example.com'), (2, 'Rahim', 'rahim@example.com')])
+    db.commit()
+    cursor.close()
+    yield db
+    db.close()
+
+
+def event(event_id, kind, worker_id, timestamp):
+    return {'event_id': event_id, 'type': kind, 'worker_id': worker_id, 'timestamp': timestamp}
+
+
+def statuses(results):
+    return [r['status'] for r in results]
+
+
+def attendance(db, worker_id):
+    cursor = db.cursor()
+    cursor.execute("SELECT date, check_in, check_out FROM ATTENDANCE WHERE worker_id = %s ORDER BY date",
+                   (worker_id,))
+    rows = [tuple(str(value) if value is not None else None for value in row) for row in cursor.fetchall()]
+    cursor.close()
+    return rows
+
+
+def test_applies_in_timestamp_order(db):
+    # Uploaded out of order: the check-out comes first in the request
+    results = kiosk.sync(db, 'gate1', [
+        event('g1-2', 'check_out', 1, '2024-05-02T17:00:00'),
+        event('g1-1', 'check_in', 1, '2024-05-02T08:00:00'),
+    ])
+    assert statuses(results) == ['applied', 'applied']
+    assert attendance(db, 1) == [('2024-05-02', '08:00:00', '17:00:00')]
+
+
+def test_day_state_outcomes(db):
+    results = kiosk.sync(db, 'gate1', [
+        event('a', 'check_out', 1, '2024-05-02T07:00:00'),
+        event('b', 'check_in', 1, '2024-05-02T08:00:00'),
+        event('c', 'check_in', 1, '2024-05-02T08:05:00'),
+        event('d', 'check_out', 1, '2024-05-02T17:00:00'),
+        event('e', 'check_out', 1, '2024-05-02T17:05:00'),
+        event('f', 'check_in', 99, '2024-05-02T08:00:00'),
+    ])
+    assert statuses(results) == ['not_checked_in', 'applied', 'already_checked_in', 'applied',
+                                 'already_checked_out', 'unknown_worker']
+    assert attendance(db, 1) == [('2024-05-02', '08:00:00', '17:00:00')]
+
+
+def test_state_carries_over_from_earlier_syncs(db):
+    kiosk.sync(db, 'gate1', [event('a', 'check_in', 1, '2024-05-02T08:00:00')])
+    results = kiosk.sync(db, 'gate2', [event('b', 'check_in', 1, '2024-05-02T08:10:00'),
+                                       event('c', 'check_out', 1, '2024-05-02T17:00:00')])
+    assert statuses(results) == ['already_checked_in', 'applied']
+
+
+def test_duplicates_in_batch_and_across_syncs(db):
+    batch = [event('g1-1', 'check_in', 1, '2024-05-02T08:00:00'),
+             event('g1-1', 'check_in', 1, '2024-05-02T08:00:00'),
+             event('g1-2', 'check_in', 2, '2024-05-02T08:00:00')]
+    first = kiosk.sync(db, 'gate1', batch)
+    assert statuses(first) == ['applied', 'duplicate', 'applied']
+    assert first[1]['original'] == 'applied'
+
+    # The kiosk never got the response and resends the whole batch
+    again = kiosk.sync(db, 'gate1', batch)
+    assert statuses(again) == ['duplicate'] * 3
+    assert [r['original'] for r in again] == ['applied'] * 3
+    assert attendance(db, 1) == [('2024-05-02', '08:00:00', None)]
+
+
+def test_invalid_events_do_not_stop_the_batch(db):
+    results = kiosk.sync(db, 'gate1', [
+        event('a', 'check_in', '1', '2024-05-02T08:00:00'),
+        event('b', 'lunch', 1, '2024-05-02T12:00:00'),
+        event('c', 'check_in', 1, 'yesterday'),
+        event('d', 'check_in', 1, '2024-05-02T08:00:00'),
+    ])
+    assert statuses(results) == ['invalid', 'invalid', 'invalid', 'applied']
+    assert 'error' in results[0]
+
+
+@pytest.mark.skipif(not hasattr(time, 'tzset'), reason="needs time.tzset")
+def test_timestamps_with_an_offset_become_local_time(db, monkeypatch):
+    monkeypatch.setenv('TZ', 'Asia/Dhaka')    # UTC+6, no DST
+    time.tzset()
+    try:
+        results = kiosk.sync(db, 'gate1', [
+            event('a', 'check_in', 1, '2024-05-02T02:00:00Z'),
+            event('b', 'check_out', 1, '2024-05-02T17:00:00+06:00'),
+            # 23:30 UTC is already the next morning in Dhaka
+            event('c', 'check_in', 2, '2024-05-02T23:30:00+00:00'),
+        ])
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    assert statuses(results) == ['applied', 'applied', 'applied']
+    assert attendance(db, 1) == [('2024-05-02', '08:00:00', '17:00:00')]
+    assert attendance(db, 2) == [('2024-05-03', '05:30:00', None)]
@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import storage
+from pagination import paginate
+
+ROWS = [(1, '2024-05-03'), (2, None), (3, '2024-05-01'), (4, None), (5, '2024-05-03'),
+        (6, '2024-05-02'), (7, None), (8, '2024-05-01'), (9, None)]
+
+
+@pytest.fixture
+def cursor(tmp_path):
+    db = storage.SQLiteConnection(str(tmp_path / 'pages.db'))
+    cursor = db.cursor()
+    cursor.execute("CREATE TABLE TASK (task_id INTEGER PRIMARY KEY, deadline TEXT)")
+    cursor.executemany("INSERT INTO TASK (task_id, deadline) VALUES (%s, %s)", ROWS)
+    db.commit()
+    yield cursor
+    db.close()
+
+
+@pytest.mark.parametrize('direction', ['ASC', 'DESC'])
+@pytest.mark.parametrize('limit', [1, 2, 4])
+def test_pages_across_null_keys(cursor, direction, limit):
+    keys = [('deadline', 'deadline', direction), ('task_id', 'task_id', direction)]
+    cursor.execute(f"SELECT task_id FROM TASK ORDER BY deadline {direction}, task_id {direction}")
+    expected = [row[0] for row in cursor.fetchall()]
+
+    seen, token = [], None
+    while True:
+        page = paginate(cursor, "SELECT task_id, deadline FROM TASK WHERE {keyset}", (), keys,
+                        token=token, limit=limit)
+        seen.extend(row['task_id'] for row in page.items)
+        if not page.has_more:
+            break
+        token = page.next_token
+    assert seen == expected
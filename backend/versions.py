@@ -0,0 +1,102 @@
+"""
+Data version counters for conditional GETs on the dashboards.
+
+Managers keep manager/dashboard and team_view open and refresh all day;
+most refreshes find nothing changed. Every write route bumps a version
+counter for the scopes it touched:
+
+    worker:<id>     that worker's own rows (attendance, tasks, salary, profile)
+    dept:<name>     anything a department's pages show
+    global          any write at all (the admin pages)
+    all             bulk changes with no single scope (kiosk syncs, ingest
+                    flushes, payroll runs); part of every ETag
+
+A page's ETag is a hash of the versions of its scopes, the user, the URL,
+the day and the release (see release_token). When the browser's
+If-None-Match still matches, the route answers 304 before checking out a
+connection or rendering anything.
+
+The counters live in a small memory-mapped file (DATA_VERSION_FILE), so
+every process on the host sees every bump - a per-process counter would
+let a process that missed a write keep answering 304 for stale data.
+Scopes hash into a fixed number of slots; two scopes sharing a slot only
+means a few extra full responses. A bump is made after the write commits.
+Writes made outside the app (the CLIs, manual SQL) are not seen, so the
+ETag also changes every ETAG_MAX_AGE seconds.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:          # Windows: one process, the thread lock is enough
+    fcntl = None
+
+_SLOT = struct.Struct('<Q')
+
+
+class DataVersions:
+    def __init__(self, path, slots=4096, max_age=300):
+        self.path = path
+        self.slots = slots
+        self.max_age = max_age
+        size = slots * _SLOT.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self._file = open(path, 'rb+') if fcntl else None
+        self._lock = threading.Lock()
+        self.bumps = 0
+
+    def _offset(self, scope):
+        return (zlib.crc32(scope.encode()) % self.slots) * _SLOT.size
+
+    def get(self, scope):
+        return _SLOT.unpack_from(self._map, self._offset(scope))[0]
+
+    def bump(self, *scopes):
+        """Increment each scope's counter (call after the write has committed)"""
+        offsets = {self._offset(scope) for scope in scopes if scope}
+        with self._lock:
+            if self._file:
+                fcntl.lockf(self._file, fcntl.LOCK_EX)
+            try:
+                for offset in offsets:
+                    _SLOT.pack_into(self._map, offset, _SLOT.unpack_from(self._map, offset)[0] + 1)
+            finally:
+                if self._file:
+                    fcntl.lockf(self._file, fcntl.LOCK_UN)
+            self.bumps += 1
+
+    def etag(self, scopes, *parts):
+        """ETag for a page built from `scopes` (plus 'all'), varying by `parts`"""
+        versions = [self.get(scope) for scope in ('all',) + tuple(scopes)]
+        stamp = int(time.time() // self.max_age) if self.max_age else 0
+        key = repr((tuple(scopes), versions, stamp, parts)).encode()
+        return hashlib.sha1(key).hexdigest()[:20]
+
+    def stats(self):
+        return {'file': self.path, 'slots': self.slots, 'max_age': self.max_age,
+                'bumps': self.bumps, 'all': self.get('all'), 'global': self.get('global')}
+
+
+def release_token(paths):
+    """Changes whenever a file under `paths` changes, so a deploy changes every ETag"""
+    latest = 0.0
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                for name in files:
+                    latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+        elif os.path.exists(path):
+            latest = max(latest, os.path.getmtime(path))
+    return f"{latest:.0f}"